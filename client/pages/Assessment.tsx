@@ -1,8 +1,14 @@
-import { useEffect, useMemo, useState } from "react";
+import { useCallback, useEffect, useMemo, useState } from "react";
 import { useLocation } from "react-router-dom";
 import Header from "@/components/layout/Header";
 import { Plus, X, ChevronLeft, ChevronRight } from "lucide-react";
-import { apiGetUserData, apiPutUserData, getAuthToken } from "@/services/api";
+import {
+  type ApiAssessment,
+  apiCreateAssessment,
+  apiListAssessments,
+  apiSubscribeUserData,
+  getAuthToken,
+} from "@/services/api";
 
 interface Assessment {
   id: string;
@@ -15,6 +21,17 @@ interface Assessment {
   alert: boolean;
 }
 
+const fromApi = (a: ApiAssessment): Assessment => ({
+  id: String(a.id),
+  topic: a.topic,
+  subjects: a.subjects,
+  date: a.date,
+  startTime: a.start_time ?? "",
+  endTime: a.end_time ?? "",
+  priority: a.priority,
+  alert: a.alert,
+});
+
 export default function Assessment() {
   const location = useLocation();
   const [assessments, setAssessments] = useState<Assessment[]>([]);
@@ -44,38 +61,45 @@ export default function Assessment() {
 
   const availableSubjects = ["Maths", "Science", "English", "History", "Geography"];
 
-  useEffect(() => {
-    const load = async () => {
-      const token = getAuthToken();
-      if (token) {
-        try {
-          const remote = await apiGetUserData<Assessment[]>("assessments");
-          if (Array.isArray(remote)) {
-            setAssessments(remote);
-            setAssessmentsLoaded(true);
-            return;
-          }
-        } catch {
-          // fall back
-        }
-      }
+  // Signed-in users' assessments live on the server; guests keep them in localStorage.
+  const [signedIn] = useState(() => Boolean(getAuthToken()));
+
+  const loadAssessments = useCallback(async () => {
+    try {
+      const remote = await apiListAssessments();
+      setAssessments(remote.map(fromApi));
+      setAssessmentsLoaded(true);
+    } catch {
+      // ignore
+    }
+  }, []);
 
-      try {
-        const raw = localStorage.getItem("assessments");
-        if (raw) {
-          const parsed = JSON.parse(raw) as Assessment[];
-          setAssessments(parsed);
-        }
-      } catch {
-        // ignore
-      } finally {
-        setAssessmentsLoaded(true);
+  useEffect(() => {
+    if (signedIn) {
+      loadAssessments();
+      return;
+    }
+    try {
+      const raw = localStorage.getItem("assessments");
+      if (raw) {
+        const parsed = JSON.parse(raw) as Assessment[];
+        setAssessments(parsed);
       }
-    };
+    } catch {
+      // ignore
+    } finally {
+      setAssessmentsLoaded(true);
+    }
+  }, [signedIn, loadAssessments]);
 
-    load();
-  }, []);
+  useEffect(() => {
+    if (!signedIn) return;
+    return apiSubscribeUserData((key) => {
+      if (key === null || key === "assessments") loadAssessments();
+    });
+  }, [signedIn, loadAssessments]);
 
+  // localStorage also feeds the header notifications and profile stats.
   useEffect(() => {
     if (!assessmentsLoaded) return;
     try {
@@ -84,12 +108,6 @@ export default function Assessment() {
     } catch {
       // ignore
     }
-
-    const token = getAuthToken();
-    if (!token) return;
-    apiPutUserData("assessments", assessments).catch(() => {
-      // ignore
-    });
   }, [assessments, assessmentsLoaded]);
 
   // Get week days around selected date
@@ -135,7 +153,27 @@ export default function Assessment() {
         priority,
         alert,
       };
-      setAssessments([...assessments, assessment]);
+      if (signedIn) {
+        apiCreateAssessment({
+          topic,
+          subjects: selectedSubjects,
+          date,
+          start_time: startTime,
+          end_time: endTime,
+          priority,
+          alert,
+        })
+          .then((created) => {
+            const saved = fromApi(created);
+            // A refetch triggered by the change event may have added it already.
+            setAssessments((prev) => (prev.some((a) => a.id === saved.id) ? prev : [...prev, saved]));
+          })
+          .catch(() => {
+            // ignore
+          });
+      } else {
+        setAssessments([...assessments, assessment]);
+      }
       // Reset form
       setTopic("");
       setSelectedSubjects([]);
@@ -1,8 +1,16 @@
-import { useEffect, useMemo, useState } from "react";
+import { useCallback, useEffect, useMemo, useRef, useState } from "react";
 import { useLocation } from "react-router-dom";
 import Header from "@/components/layout/Header";
 import { Plus, Trash2, Edit2, ChevronLeft, ChevronRight } from "lucide-react";
-import { apiGetUserData, apiPutUserData, getAuthToken } from "@/services/api";
+import {
+  type ApiTask,
+  apiCreateTask,
+  apiDeleteTask,
+  apiListTasks,
+  apiSubscribeUserData,
+  apiUpdateTask,
+  getAuthToken,
+} from "@/services/api";
 
 interface Task {
   id: string;
@@ -18,6 +26,39 @@ interface Task {
   repeat?: "daily" | "weekly" | "none";
 }
 
+// As kept in localStorage.
+type StoredTask = Omit<Task, "date"> & { date: string };
+
+const toYmd = (d: Date) => {
+  const yyyy = d.getFullYear();
+  const mm = String(d.getMonth() + 1).padStart(2, "0");
+  const dd = String(d.getDate()).padStart(2, "0");
+  return `${yyyy}-${mm}-${dd}`;
+};
+
+const parseYmdToDate = (ymd: string) => new Date(`${ymd}T00:00:00`);
+
+const fromStored = (t: StoredTask): Task => ({
+  ...t,
+  date: t.date.includes("T") ? new Date(t.date) : parseYmdToDate(t.date),
+});
+
+const toStored = (t: Task): StoredTask => ({ ...t, date: toYmd(t.date) });
+
+const fromApi = (t: ApiTask): Task => ({
+  id: String(t.id),
+  title: t.title,
+  description: t.description ?? undefined,
+  date: parseYmdToDate(t.date),
+  startTime: t.start_time ?? undefined,
+  endTime: t.end_time ?? undefined,
+  priority: t.priority,
+  progress: t.progress,
+  completedOn: t.completed_on ?? undefined,
+  category: t.category ?? undefined,
+  repeat: t.repeat ?? undefined,
+});
+
 export default function Dashboard() {
   const location = useLocation();
   const defaultTasks: Task[] = [
@@ -71,18 +112,12 @@ export default function Dashboard() {
     },
   ];
 
-  const [tasks, setTasks] = useState<Task[]>(defaultTasks);
+  // Signed-in users' tasks live on the server and are loaded a week at a time;
+  // guests keep the whole list in localStorage.
+  const [signedIn] = useState(() => Boolean(getAuthToken()));
+  const [tasks, setTasks] = useState<Task[]>(signedIn ? [] : defaultTasks);
   const [tasksLoaded, setTasksLoaded] = useState(false);
 
-  const toYmd = (d: Date) => {
-    const yyyy = d.getFullYear();
-    const mm = String(d.getMonth() + 1).padStart(2, "0");
-    const dd = String(d.getDate()).padStart(2, "0");
-    return `${yyyy}-${mm}-${dd}`;
-  };
-
-  const parseYmdToDate = (ymd: string) => new Date(`${ymd}T00:00:00`);
-
   const [newTaskTitle, setNewTaskTitle] = useState("");
   const [selectedDate, setSelectedDate] = useState(() => {
     const ymd = new URLSearchParams(location.search).get("date");
@@ -101,78 +136,6 @@ export default function Dashboard() {
     // eslint-disable-next-line react-hooks/exhaustive-deps
   }, [location.search]);
 
-  useEffect(() => {
-    const load = async () => {
-      const token = getAuthToken();
-      if (token) {
-        try {
-          const remote = await apiGetUserData<Array<Omit<Task, "date"> & { date: string }>>("tasks");
-          if (Array.isArray(remote)) {
-            setTasks(
-              remote.map((t) => ({
-                ...t,
-                date: t.date.includes("T") ? new Date(t.date) : parseYmdToDate(t.date),
-              }))
-            );
-            setTasksLoaded(true);
-            return;
-          }
-        } catch {
-          // fall back to local
-        }
-      }
-
-      try {
-        const raw = localStorage.getItem("tasks");
-        if (raw) {
-          const parsed = JSON.parse(raw) as Array<Omit<Task, "date"> & { date: string }>;
-          setTasks(
-            parsed.map((t) => ({
-              ...t,
-              date: t.date.includes("T") ? new Date(t.date) : parseYmdToDate(t.date),
-            }))
-          );
-        }
-      } catch {
-        // ignore
-      } finally {
-        setTasksLoaded(true);
-      }
-    };
-
-    load();
-  }, []);
-
-  useEffect(() => {
-    if (!tasksLoaded) return;
-    try {
-      localStorage.setItem(
-        "tasks",
-        JSON.stringify(
-          tasks.map((t) => ({
-            ...t,
-            date: toYmd(t.date),
-          }))
-        )
-      );
-      window.dispatchEvent(new Event("studybuddy:stats-updated"));
-    } catch {
-      // ignore
-    }
-
-    const token = getAuthToken();
-    if (!token) return;
-    apiPutUserData(
-      "tasks",
-      tasks.map((t) => ({
-        ...t,
-        date: toYmd(t.date),
-      }))
-    ).catch(() => {
-      // ignore
-    });
-  }, [tasks, tasksLoaded]);
-
   // Get week days around selected date
   const weekDays = useMemo(() => {
     const days = [];
@@ -191,6 +154,70 @@ export default function Dashboard() {
     return days;
   }, [selectedDate]);
 
+  const weekStart = toYmd(weekDays[0]);
+  const weekEnd = toYmd(weekDays[6]);
+  const shownWeek = useRef({ start: weekStart, end: weekEnd });
+  shownWeek.current = { start: weekStart, end: weekEnd };
+  // The week `tasks` currently holds (signed in only).
+  const loadedWeek = useRef<{ start: string; end: string } | null>(null);
+
+  const loadWeek = useCallback(async () => {
+    const week = shownWeek.current;
+    try {
+      const remote = await apiListTasks(week);
+      // Ignore a response for a week the user has already navigated away from.
+      if (shownWeek.current.start !== week.start) return;
+      loadedWeek.current = week;
+      setTasks(remote.map(fromApi));
+      setTasksLoaded(true);
+    } catch {
+      // ignore
+    }
+  }, []);
+
+  useEffect(() => {
+    if (signedIn) loadWeek();
+  }, [signedIn, weekStart, loadWeek]);
+
+  useEffect(() => {
+    if (signedIn) return;
+    try {
+      const raw = localStorage.getItem("tasks");
+      if (raw) setTasks((JSON.parse(raw) as StoredTask[]).map(fromStored));
+    } catch {
+      // ignore
+    } finally {
+      setTasksLoaded(true);
+    }
+  }, [signedIn]);
+
+  useEffect(() => {
+    if (!signedIn) return;
+    return apiSubscribeUserData((key) => {
+      if (key === null || key === "tasks") loadWeek();
+    });
+  }, [signedIn, loadWeek]);
+
+  // localStorage also feeds the header notifications and profile stats.
+  useEffect(() => {
+    if (!tasksLoaded) return;
+    try {
+      let stored = tasks.map(toStored);
+      const week = loadedWeek.current;
+      if (signedIn && week) {
+        // Only one week is loaded; keep the cached copy of the others.
+        const raw = localStorage.getItem("tasks");
+        const cached = raw ? (JSON.parse(raw) as StoredTask[]) : [];
+        const others = cached.filter((t) => t.date.slice(0, 10) < week.start || t.date.slice(0, 10) > week.end);
+        stored = [...others, ...stored];
+      }
+      localStorage.setItem("tasks", JSON.stringify(stored));
+      window.dispatchEvent(new Event("studybuddy:stats-updated"));
+    } catch {
+      // ignore
+    }
+  }, [tasks, tasksLoaded, signedIn]);
+
   const filteredTasks = useMemo(() => {
     return tasks.filter((task) => {
       const taskDate = new Date(task.date);
@@ -211,7 +238,19 @@ export default function Dashboard() {
         priority: "Medium",
         progress: 0,
       };
-      setTasks([...tasks, newTask]);
+      if (signedIn) {
+        apiCreateTask({ title: newTask.title, date: toYmd(newTask.date), priority: newTask.priority, progress: 0 })
+          .then((created) => {
+            const task = fromApi(created);
+            // A refetch triggered by the change event may have added it already.
+            setTasks((prev) => (prev.some((t) => t.id === task.id) ? prev : [...prev, task]));
+          })
+          .catch(() => {
+            // ignore
+          });
+      } else {
+        setTasks([...tasks, newTask]);
+      }
       setNewTaskTitle("");
       setShowAddTask(false);
     }
@@ -219,6 +258,7 @@ export default function Dashboard() {
 
   const handleDeleteTask = (id: string) => {
     setTasks(tasks.filter((task) => task.id !== id));
+    if (signedIn) apiDeleteTask(Number(id)).catch(() => loadWeek());
   };
 
   const handlePreviousWeek = () => {
@@ -236,18 +276,21 @@ export default function Dashboard() {
   const handleUpdateProgress = (id: string, newProgress: number) => {
     const today = new Date();
     today.setHours(0, 0, 0, 0);
-    const completedOn = toYmd(today);
+    const completedOn = newProgress >= 100 ? toYmd(today) : undefined;
     setTasks(
       tasks.map((task) =>
         task.id === id
           ? {
               ...task,
               progress: newProgress,
-              completedOn: newProgress >= 100 ? completedOn : undefined,
+              completedOn,
             }
           : task
       )
     );
+    if (signedIn) {
+      apiUpdateTask(Number(id), { progress: newProgress, completed_on: completedOn ?? null }).catch(() => loadWeek());
+    }
   };
 
   const getDateString = (date: Date) => {
@@ -1,7 +1,15 @@
 import { useEffect, useMemo, useRef, useState } from "react";
 import Header from "@/components/layout/Header";
 import { Pencil } from "lucide-react";
-import { apiGetMe, apiGetUserData, apiPutUserData, getAuthToken } from "@/services/api";
+import {
+  apiGetMe,
+  apiGetStats,
+  apiGetUserDataBatch,
+  apiPutUserData,
+  apiSubscribeUserData,
+  apiUploadBlob,
+  getAuthToken,
+} from "@/services/api";
 
 type StoredUser = {
   displayName?: string;
@@ -45,6 +53,13 @@ type InterestedBook = {
   title: string;
 };
 
+// The user-data keys this page reads on load.
+type ProfileUserData = {
+  userAvatar: string;
+  interestedBooks: InterestedBook[];
+  userProfile: StoredUserProfile;
+};
+
 export default function Profile() {
   const [name, setName] = useState<string>("Student");
   const [email, setEmail] = useState<string>("");
@@ -108,32 +123,21 @@ export default function Profile() {
 
       if (token) {
         try {
-          const me = await apiGetMe();
+          // The profile keys come back in one request, fetched alongside /auth/me.
+          const [me, stored] = await Promise.all([
+            apiGetMe(),
+            apiGetUserDataBatch<ProfileUserData>(["userAvatar", "interestedBooks", "userProfile"]).catch(
+              (): Partial<ProfileUserData> => ({}),
+            ),
+          ]);
           const nextName = me.name || "Student";
           const nextEmail = me.email || "";
           setName(nextName);
           setEmail(nextEmail);
 
-          try {
-            const avatar = await apiGetUserData<string>("userAvatar");
-            setAvatarDataUrl(typeof avatar === "string" ? avatar : "");
-          } catch {
-            setAvatarDataUrl("");
-          }
-
-          try {
-            const books = await apiGetUserData<InterestedBook[]>("interestedBooks");
-            if (Array.isArray(books)) setInterestedBooks(books);
-          } catch {
-            setInterestedBooks([]);
-          }
-
-          let remoteProfile: StoredUserProfile | null = null;
-          try {
-            remoteProfile = await apiGetUserData<StoredUserProfile>("userProfile");
-          } catch {
-            remoteProfile = null;
-          }
+          setAvatarDataUrl(typeof stored.userAvatar === "string" ? stored.userAvatar : "");
+          setInterestedBooks(Array.isArray(stored.interestedBooks) ? stored.interestedBooks : []);
+          const remoteProfile = stored.userProfile ?? null;
 
           const nextProfile: StoredUserProfile = {
             fullName: remoteProfile?.fullName || nextName || "",
@@ -236,6 +240,26 @@ export default function Profile() {
     const file = e.target.files?.[0];
     if (!file) return;
     if (!file.type.startsWith("image/")) return;
+    e.target.value = "";
+
+    const token = getAuthToken();
+    if (token) {
+      // Signed in: upload the file to the blob store and keep only its URL in user-data.
+      apiUploadBlob(file)
+        .then(({ url }) => {
+          setAvatarDataUrl(url);
+          try {
+            localStorage.setItem("userAvatar", url);
+          } catch {
+            // ignore
+          }
+          return apiPutUserData("userAvatar", url);
+        })
+        .catch(() => {
+          // ignore
+        });
+      return;
+    }
 
     const reader = new FileReader();
     reader.onload = () => {
@@ -247,16 +271,8 @@ export default function Profile() {
       } catch {
         // ignore
       }
-
-      const token = getAuthToken();
-      if (token) {
-        apiPutUserData("userAvatar", next).catch(() => {
-          // ignore
-        });
-      }
     };
     reader.readAsDataURL(file);
-    e.target.value = "";
   };
 
   const toYmd = (d: Date) => {
@@ -318,6 +334,30 @@ export default function Profile() {
     startOfToday.setHours(0, 0, 0, 0);
     const todayYmd = toYmd(startOfToday);
 
+    if (getAuthToken()) {
+      // Signed in: the server keeps these up to date, so nothing is recomputed here.
+      apiGetStats({ today: todayYmd, year: selectedYear })
+        .then((s) => {
+          setStats({
+            todoPercent: s.tasks_total > 0 ? Math.round((s.tasks_completed / s.tasks_total) * 100) : 0,
+            totalTasks: s.tasks_total,
+            completedTasks: s.tasks_completed,
+            assessmentPercent:
+              s.assessments_total > 0 ? Math.round((s.assessments_completed / s.assessments_total) * 100) : 0,
+            totalAssessments: s.assessments_total,
+            completedAssessments: s.assessments_completed,
+            currentStreak: s.current_streak,
+            previousStreak: s.previous_streak,
+            bestStreak: s.best_streak,
+            contributionsByDay: s.completed_by_day,
+          });
+        })
+        .catch(() => {
+          // ignore
+        });
+      return;
+    }
+
     let tasks: StoredTaskForStats[] = [];
     let assessments: StoredAssessmentForStats[] = [];
 
@@ -390,12 +430,17 @@ export default function Profile() {
 
     window.addEventListener("studybuddy:stats-updated", onStatsUpdated);
     window.addEventListener("storage", onStorage);
+    const unsubscribe = apiSubscribeUserData((key) => {
+      if (key === null || key === "tasks" || key === "assessments") refreshStats();
+    });
     return () => {
       window.removeEventListener("studybuddy:stats-updated", onStatsUpdated);
       window.removeEventListener("storage", onStorage);
+      unsubscribe();
     };
+    // Re-run per year: signed-in stats include the selected year's per-day counts.
     // eslint-disable-next-line react-hooks/exhaustive-deps
-  }, []);
+  }, [selectedYear]);
 
   const availableYears = useMemo(() => {
     // Show a full year list on the Profile page (not data-dependent)
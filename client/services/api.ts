@@ -43,6 +43,23 @@ export async function apiGetUserData<T = JsonValue>(key: string): Promise<T> {
   return data.value;
 }
 
+// Reads several keys in one request; keys that aren't stored are left out of the result.
+export async function apiGetUserDataBatch<T extends Record<string, JsonValue> = Record<string, JsonValue>>(
+  keys: (keyof T & string)[],
+): Promise<Partial<T>> {
+  const query = new URLSearchParams();
+  for (const key of keys) query.append("keys", key);
+  const data = await apiJson<{ items: { key: string; found: boolean; value: JsonValue }[] }>(`/user-data?${query}`);
+  const values: Record<string, JsonValue> = {};
+  for (const item of data.items) {
+    if (item.found) values[item.key] = item.value;
+  }
+  return values as Partial<T>;
+}
+
+// Latest version this tab wrote per key, so its own changes aren't reported back.
+const writtenVersions = new Map<string, number>();
+
 export async function apiPutUserData<T = JsonValue>(key: string, value: T): Promise<void> {
   const res = await fetch(`${apiBaseUrl}/api/v1/user-data/${encodeURIComponent(key)}`, {
     method: "PUT",
@@ -53,6 +70,179 @@ export async function apiPutUserData<T = JsonValue>(key: string, value: T): Prom
     body: JSON.stringify({ value }),
   });
   if (!res.ok) throw new Error("Request failed");
+  const data = (await res.json()) as { version?: number | null };
+  if (typeof data.version === "number") {
+    writtenVersions.set(key, Math.max(writtenVersions.get(key) ?? 0, data.version));
+  }
+}
+
+// Calls `onChange(key)` when another tab or device writes a user-data key (or a
+// task or assessment, reported as "tasks" / "assessments"), or
+// `onChange(null)` when anything may have changed (missed events). Returns an
+// unsubscribe function.
+export function apiSubscribeUserData(onChange: (key: string | null) => void): () => void {
+  if (!getAuthToken() || typeof EventSource === "undefined") return () => {};
+
+  let source: EventSource | null = null;
+  let retryTimer: ReturnType<typeof setTimeout> | undefined;
+  let closed = false;
+  let connectedBefore = false;
+
+  const connect = async () => {
+    let ticket: string;
+    try {
+      ({ ticket } = await apiJson<{ ticket: string }>("/user-data/stream-ticket", { method: "POST" }));
+    } catch {
+      if (!closed) retryTimer = setTimeout(connect, 10_000);
+      return;
+    }
+    if (closed) return;
+
+    // EventSource can't send headers, so a short-lived stream-only ticket goes in
+    // the query string rather than the session token.
+    const current = new EventSource(`${apiBaseUrl}/api/v1/user-data/stream?ticket=${encodeURIComponent(ticket)}`);
+    source = current;
+    current.addEventListener("ready", () => {
+      // After a reconnect, changes made while disconnected weren't delivered.
+      if (connectedBefore) onChange(null);
+      connectedBefore = true;
+    });
+    current.addEventListener("change", (event) => {
+      try {
+        const { key, version } = JSON.parse((event as MessageEvent).data) as { key: string; version: number };
+        const written = writtenVersions.get(key);
+        if (written !== undefined && written >= version) return;
+        onChange(key);
+      } catch {
+        // ignore
+      }
+    });
+    current.addEventListener("resync", () => onChange(null));
+    current.addEventListener("error", () => {
+      // The browser retries with the same URL by itself; once the ticket has
+      // expired that is refused and it gives up, so reconnect with a new ticket.
+      if (current.readyState !== EventSource.CLOSED || closed) return;
+      retryTimer = setTimeout(connect, 3_000);
+    });
+  };
+
+  connect();
+  return () => {
+    closed = true;
+    clearTimeout(retryTimer);
+    source?.close();
+  };
+}
+
+export type Priority = "Low" | "Medium" | "High";
+
+export interface ApiTask {
+  id: number;
+  title: string;
+  description?: string | null;
+  date: string;
+  start_time?: string | null;
+  end_time?: string | null;
+  priority: Priority;
+  progress: number;
+  completed_on?: string | null;
+  category?: string | null;
+  repeat?: "daily" | "weekly" | "none" | null;
+}
+
+export interface ApiAssessment {
+  id: number;
+  topic: string;
+  subjects: string[];
+  date: string;
+  start_time?: string | null;
+  end_time?: string | null;
+  priority: Priority;
+  alert: boolean;
+}
+
+// Dates are "YYYY-MM-DD"; both bounds are inclusive and optional.
+export interface DateRange {
+  start?: string;
+  end?: string;
+}
+
+async function apiJson<T>(path: string, init: RequestInit = {}): Promise<T> {
+  const res = await fetch(`${apiBaseUrl}/api/v1${path}`, {
+    ...init,
+    headers: {
+      "Content-Type": "application/json",
+      ...authHeaders(),
+    },
+  });
+  if (res.status === 404) throw new Error("NotFound");
+  if (!res.ok) throw new Error("Request failed");
+  return (res.status === 204 ? undefined : await res.json()) as T;
+}
+
+function rangeQuery(range: DateRange): string {
+  const params = new URLSearchParams();
+  if (range.start) params.set("start", range.start);
+  if (range.end) params.set("end", range.end);
+  const query = params.toString();
+  return query ? `?${query}` : "";
+}
+
+export async function apiListTasks(range: DateRange = {}): Promise<ApiTask[]> {
+  return (await apiJson<{ items: ApiTask[] }>(`/tasks/${rangeQuery(range)}`)).items;
+}
+
+export function apiCreateTask(task: Omit<ApiTask, "id">): Promise<ApiTask> {
+  return apiJson<ApiTask>("/tasks/", { method: "POST", body: JSON.stringify(task) });
+}
+
+export function apiUpdateTask(id: number, changes: Partial<Omit<ApiTask, "id">>): Promise<ApiTask> {
+  return apiJson<ApiTask>(`/tasks/${id}`, { method: "PATCH", body: JSON.stringify(changes) });
+}
+
+export function apiDeleteTask(id: number): Promise<void> {
+  return apiJson<void>(`/tasks/${id}`, { method: "DELETE" });
+}
+
+export async function apiListAssessments(range: DateRange = {}): Promise<ApiAssessment[]> {
+  return (await apiJson<{ items: ApiAssessment[] }>(`/assessments/${rangeQuery(range)}`)).items;
+}
+
+export function apiCreateAssessment(assessment: Omit<ApiAssessment, "id">): Promise<ApiAssessment> {
+  return apiJson<ApiAssessment>("/assessments/", { method: "POST", body: JSON.stringify(assessment) });
+}
+
+export interface ApiStats {
+  tasks_total: number;
+  tasks_completed: number;
+  assessments_total: number;
+  assessments_completed: number;
+  current_streak: number;
+  previous_streak: number;
+  best_streak: number;
+  completed_by_day: Record<string, number>;
+}
+
+// `today` is the user's local date, so streaks and past assessments match their calendar.
+export function apiGetStats(params: { today: string; year: number }): Promise<ApiStats> {
+  const query = new URLSearchParams({ today: params.today, year: String(params.year) });
+  return apiJson<ApiStats>(`/stats?${query}`);
+}
+
+export async function apiUploadBlob(file: File): Promise<{ id: string; url: string; content_type: string; size: number }> {
+  const form = new FormData();
+  form.append("file", file);
+  const res = await fetch(`${apiBaseUrl}/api/v1/blobs`, {
+    method: "POST",
+    headers: {
+      ...authHeaders(),
+    },
+    body: form,
+  });
+  if (!res.ok) throw new Error("Upload failed");
+  const data = (await res.json()) as { id: string; url: string; content_type: string; size: number };
+  // The server returns an API-relative path; make it usable as an <img src>.
+  return { ...data, url: `${apiBaseUrl}${data.url}` };
 }
 
 export async function apiSignupEmail(payload: { name?: string | null; email: string; password: string }) {
@@ -1,30 +1,64 @@
 from __future__ import annotations
 
-from fastapi import Depends, HTTPException
+import hmac
+
+from fastapi import Depends, HTTPException, Query
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from sqlalchemy import select
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.security import decode_access_token
+from app.core.cache import token_cache, user_cache
+from app.core.config import settings
+from app.core.metrics import span
+from app.core.security import decode_access_token, decode_stream_ticket
 from app.db.deps import get_db
+from app.db.session import AsyncSessionLocal
 from app.models.user import User
 
 
 _bearer = HTTPBearer(auto_error=False)
 
 
-def get_current_user(
+async def get_current_user(
     credentials: HTTPAuthorizationCredentials | None = Depends(_bearer),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ) -> User:
     if credentials is None or not credentials.credentials:
         raise HTTPException(status_code=401, detail="Not authenticated")
+    return await _user_for_token(credentials.credentials, db)
+
+
+async def get_stream_user(
+    ticket: str | None = Query(None, description="From `POST /user-data/stream-ticket`"),
+) -> User:
+    """`get_current_user` for the change stream, authenticated by a stream ticket.
 
+    Access tokens aren't accepted here. Uses its own short session so an open
+    stream doesn't hold a pooled connection.
+    """
+    if not ticket:
+        raise HTTPException(status_code=401, detail="Not authenticated")
     try:
-        payload = decode_access_token(credentials.credentials)
+        payload = decode_stream_ticket(ticket)
     except ValueError:
-        raise HTTPException(status_code=401, detail="Invalid token")
+        raise HTTPException(status_code=401, detail="Invalid ticket")
+    async with AsyncSessionLocal() as db:
+        return await _user_for_payload(payload, db)
 
+
+async def _user_for_token(token: str, db: AsyncSession) -> User:
+    payload = token_cache.get(token)
+    if payload is None:
+        with span("jwt"):
+            try:
+                payload = decode_access_token(token)
+            except ValueError:
+                raise HTTPException(status_code=401, detail="Invalid token")
+        token_cache.set(token, payload, expires_at=float(payload["exp"]))
+    return await _user_for_payload(payload, db)
+
+
+async def _user_for_payload(payload: dict, db: AsyncSession) -> User:
     sub = payload.get("sub")
     if not sub:
         raise HTTPException(status_code=401, detail="Invalid token")
@@ -34,8 +68,23 @@ def get_current_user(
     except ValueError:
         raise HTTPException(status_code=401, detail="Invalid token")
 
-    user = db.execute(select(User).where(User.id == user_id)).scalar_one_or_none()
+    user = user_cache.get(user_id)
+    if user is not None:
+        return user
+
+    with span("user"):
+        user = (await db.execute(select(User).where(User.id == user_id))).scalar_one_or_none()
     if user is None:
         raise HTTPException(status_code=401, detail="User not found")
 
+    # Detach so the cached row is never expired or mutated by another request's session.
+    db.expunge(user)
+    user_cache.set(user_id, user)
     return user
+
+
+def require_metrics_token(credentials: HTTPAuthorizationCredentials | None = Depends(_bearer)) -> None:
+    """Guards /metrics and the health counters with `settings.metrics_token`."""
+    expected = settings.metrics_token
+    if not expected or credentials is None or not hmac.compare_digest(credentials.credentials, expected):
+        raise HTTPException(status_code=401, detail="Not authenticated", headers={"WWW-Authenticate": "Bearer"})
@@ -2,11 +2,18 @@ from __future__ import annotations
 
 from fastapi import APIRouter
 
-from app.api.v1.routes import auth, health, notes, user_data
+from app.api.v1.routes import assessments, auth, blobs, health, notes, stats, tasks, user_data
+from app.core.config import settings
 
 api_router = APIRouter()
 
 api_router.include_router(health.router, tags=["health"])
+if settings.metrics_token:
+    api_router.include_router(health.stats_router, tags=["health"])
 api_router.include_router(auth.router, tags=["auth"])
 api_router.include_router(notes.router, prefix="/notes", tags=["notes"])
+api_router.include_router(tasks.router, prefix="/tasks", tags=["tasks"])
+api_router.include_router(assessments.router, prefix="/assessments", tags=["assessments"])
+api_router.include_router(stats.router, tags=["stats"])
 api_router.include_router(user_data.router, tags=["user-data"])
+api_router.include_router(blobs.router, tags=["blobs"])
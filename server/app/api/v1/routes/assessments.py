@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+import datetime as dt
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.deps import get_current_user
+from app.crud.assessments import create_assessment, delete_assessment, list_assessments, update_assessment
+from app.db.deps import get_db
+from app.models.user import User
+from app.schemas.assessment import AssessmentCreate, AssessmentList, AssessmentOut, AssessmentUpdate
+
+router = APIRouter()
+
+
+@router.get("/", response_model=AssessmentList)
+async def get_assessments(
+    start: dt.date | None = Query(None, description="First day to include (YYYY-MM-DD)"),
+    end: dt.date | None = Query(None, description="Last day to include (YYYY-MM-DD)"),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+) -> AssessmentList:
+    if start is not None and end is not None and start > end:
+        raise HTTPException(status_code=400, detail="start must not be after end")
+    assessments = await list_assessments(db, user_id=current_user.id, start=start, end=end)
+    return AssessmentList(items=[AssessmentOut.model_validate(a) for a in assessments])
+
+
+@router.post("/", response_model=AssessmentOut, status_code=201)
+async def post_assessment(
+    payload: AssessmentCreate,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+) -> AssessmentOut:
+    return await create_assessment(db, user_id=current_user.id, payload=payload)
+
+
+@router.patch("/{assessment_id}", response_model=AssessmentOut)
+async def patch_assessment(
+    assessment_id: int,
+    payload: AssessmentUpdate,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+) -> AssessmentOut:
+    changes = payload.model_dump(exclude_unset=True)
+    assessment = await update_assessment(
+        db,
+        user_id=current_user.id,
+        assessment_id=assessment_id,
+        changes=changes,
+    )
+    if assessment is None:
+        raise HTTPException(status_code=404, detail="Not found")
+    return assessment
+
+
+@router.delete("/{assessment_id}", status_code=204)
+async def remove_assessment(
+    assessment_id: int,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+) -> Response:
+    if not await delete_assessment(db, user_id=current_user.id, assessment_id=assessment_id):
+        raise HTTPException(status_code=404, detail="Not found")
+    return Response(status_code=204)
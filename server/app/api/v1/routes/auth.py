@@ -1,22 +1,32 @@
 from __future__ import annotations
 
+import math
+from contextlib import asynccontextmanager
 from datetime import datetime, timedelta, timezone
 
 import jwt
-import requests
-from fastapi import APIRouter, Depends, HTTPException
-from google.auth.transport import requests as google_requests
-from google.oauth2 import id_token
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from pydantic import BaseModel, EmailStr
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.config import settings
 from app.api.deps import get_current_user
-from app.crud.users import upsert_google_user, create_password_user, check_password_user, get_password_user_by_email
-from app.crud.user_data import upsert_value
+from app.core.config import settings
+from app.core.etag import etag_from_parts, if_none_match_hits, not_modified, set_etag
+from app.core.google import GoogleUnavailableError, InvalidGoogleToken, google_verifier
+from app.core.metrics import rejected_requests, span
+from app.core.ratelimit import AdmissionRejected, RateLimited, auth_admission, auth_rate_limiter
+from app.core.security import HashingBusyError, hash_password_async, verify_password_async
+from app.crud.users import (
+    create_password_user,
+    get_by_provider_sub,
+    get_password_user_by_email,
+    record_password_login,
+    upsert_google_user,
+)
 from app.db.deps import get_db
-from app.schemas.user import AuthResponse, GoogleAuthCodeIn, GoogleAuthIn, UserOut
-from pydantic import BaseModel, EmailStr
+from app.db.write_behind import user_data_writer
 from app.models.user import User
+from app.schemas.user import AuthResponse, GoogleAuthCodeIn, GoogleAuthIn, UserOut
 
 
 router = APIRouter(prefix="/auth")
@@ -28,6 +38,35 @@ def google_client_id() -> dict:
     return {"client_id": settings.google_client_id or ""}
 
 
+def _too_many(retry_after: float) -> HTTPException:
+    return HTTPException(
+        status_code=429,
+        detail="Too many requests, please retry later",
+        headers={"Retry-After": str(max(1, math.ceil(retry_after)))},
+    )
+
+
+@asynccontextmanager
+async def _guarded(request: Request, route: str, *, email: str | None = None):
+    """Rate-limit and admit an expensive auth request (PBKDF2, Google round trips).
+
+    Rejections are cheap 429s with Retry-After, issued before any hashing or DB work.
+    """
+    ip = request.client.host if request.client else None
+    try:
+        await auth_rate_limiter.check(route, ip=ip, email=email)
+    except RateLimited as e:
+        rejected_requests.inc(route, e.scope)
+        raise _too_many(e.retry_after)
+    try:
+        slot = auth_admission.enter()
+    except AdmissionRejected as e:
+        rejected_requests.inc(route, "admission")
+        raise _too_many(e.retry_after)
+    with slot:
+        yield
+
+
 def _create_access_token(*, user_id: int) -> str:
     expire = datetime.now(timezone.utc) + timedelta(minutes=settings.access_token_expires_minutes)
     payload = {
@@ -39,129 +78,101 @@ def _create_access_token(*, user_id: int) -> str:
     return jwt.encode(payload, settings.secret_key, algorithm="HS256")
 
 
-def _verify_google_id_token(credential: str) -> dict:
+async def _verify_google_id_token(credential: str) -> dict:
     if not settings.google_client_id:
         raise HTTPException(status_code=500, detail="GOOGLE_CLIENT_ID not configured")
 
+    # Certs come from the verifier's cache; only an expired cache costs a round trip.
     try:
-        info = id_token.verify_oauth2_token(
-            credential,
-            google_requests.Request(),
-            settings.google_client_id,
-        )
-    except Exception:
-        raise HTTPException(status_code=401, detail="Invalid Google credential")
-
-    issuer = info.get("iss")
-    if issuer not in ("accounts.google.com", "https://accounts.google.com"):
-        raise HTTPException(status_code=401, detail="Invalid token issuer")
+        with span("google"):
+            return await google_verifier.verify(credential)
+    except InvalidGoogleToken as e:
+        raise HTTPException(status_code=401, detail=str(e))
+    except GoogleUnavailableError as e:
+        raise HTTPException(status_code=502, detail=str(e))
 
-    sub = info.get("sub")
-    if not sub:
-        raise HTTPException(status_code=401, detail="Invalid token subject")
 
-    return info
+async def _google_write(db: AsyncSession, info: dict) -> User:
+    sub = info.get("sub")
+    profile = {
+        "email": info.get("email"),
+        "email_verified": bool(info.get("email_verified", False)),
+        "name": info.get("name"),
+        "given_name": info.get("given_name"),
+        "family_name": info.get("family_name"),
+        "picture": info.get("picture"),
+        "locale": info.get("locale"),
+    }
+    # The login rewrites the "user" snapshot. For an existing account, buffered
+    # client writes to it go first (so the snapshot wins) and none may take the
+    # version this login commits.
+    existing = None
+    if user_data_writer.enabled:
+        existing = await get_by_provider_sub(db, provider="google", provider_sub=sub)
+    if existing is None:
+        return await upsert_google_user(db, sub=sub, **profile)
+    async with user_data_writer.direct_write(db, existing.id, ["user"]):
+        return await upsert_google_user(db, sub=sub, **profile)
 
 
 @router.post("/google", response_model=AuthResponse)
-def google_login(payload: GoogleAuthIn, db: Session = Depends(get_db)) -> AuthResponse:
-    info = _verify_google_id_token(payload.credential)
-
-    user = upsert_google_user(
-        db,
-        sub=info.get("sub"),
-        email=info.get("email"),
-        email_verified=bool(info.get("email_verified", False)),
-        name=info.get("name"),
-        given_name=info.get("given_name"),
-        family_name=info.get("family_name"),
-        picture=info.get("picture"),
-        locale=info.get("locale"),
-    )
+async def google_login(payload: GoogleAuthIn, request: Request, db: AsyncSession = Depends(get_db)) -> AuthResponse:
+    async with _guarded(request, "google"):
+        return await _google_login(payload, db)
 
-    # Store a copy of the login profile in SQLite (user_data) for app usage.
-    upsert_value(
-        db,
-        user_id=user.id,
-        key="user",
-        value={
-            "id": user.id,
-            "provider": user.provider,
-            "email": user.email,
-            "name": user.name,
-            "picture": user.picture,
-            "last_login_at": user.last_login_at.isoformat() if user.last_login_at else None,
-        },
-    )
+
+async def _google_login(payload: GoogleAuthIn, db: AsyncSession) -> AuthResponse:
+    info = await _verify_google_id_token(payload.credential)
+
+    user = await _google_write(db, info)
 
     token = _create_access_token(user_id=user.id)
     return AuthResponse(access_token=token, user=UserOut.model_validate(user))
 
 
 @router.post("/google/code", response_model=AuthResponse)
-def google_code_login(payload: GoogleAuthCodeIn, db: Session = Depends(get_db)) -> AuthResponse:
+async def google_code_login(
+    payload: GoogleAuthCodeIn, request: Request, db: AsyncSession = Depends(get_db)
+) -> AuthResponse:
+    async with _guarded(request, "google"):
+        return await _google_code_login(payload, db)
+
+
+async def _google_code_login(payload: GoogleAuthCodeIn, db: AsyncSession) -> AuthResponse:
     if not settings.google_client_id:
         raise HTTPException(status_code=500, detail="GOOGLE_CLIENT_ID not configured")
     if not settings.google_client_secret:
         raise HTTPException(status_code=500, detail="GOOGLE_CLIENT_SECRET not configured")
 
     try:
-        token_resp = requests.post(
-            "https://oauth2.googleapis.com/token",
-            data={
-                "code": payload.code,
-                "client_id": settings.google_client_id,
-                "client_secret": settings.google_client_secret,
-                "redirect_uri": payload.redirect_uri,
-                "grant_type": "authorization_code",
-            },
-            timeout=15,
-        )
-    except requests.RequestException:
-        raise HTTPException(status_code=502, detail="Failed to contact Google token endpoint")
-
-    if token_resp.status_code != 200:
-        raise HTTPException(status_code=401, detail="Google code exchange failed")
-
-    token_json = token_resp.json()
-    google_id_token = token_json.get("id_token")
-    if not google_id_token:
-        raise HTTPException(status_code=401, detail="Google response missing id_token")
-
-    info = _verify_google_id_token(google_id_token)
-
-    user = upsert_google_user(
-        db,
-        sub=info.get("sub"),
-        email=info.get("email"),
-        email_verified=bool(info.get("email_verified", False)),
-        name=info.get("name"),
-        given_name=info.get("given_name"),
-        family_name=info.get("family_name"),
-        picture=info.get("picture"),
-        locale=info.get("locale"),
-    )
+        with span("google"):
+            google_id_token = await google_verifier.exchange_code(payload.code, payload.redirect_uri)
+    except InvalidGoogleToken as e:
+        raise HTTPException(status_code=401, detail=str(e))
+    except GoogleUnavailableError as e:
+        raise HTTPException(status_code=502, detail=str(e))
 
-    upsert_value(
-        db,
-        user_id=user.id,
-        key="user",
-        value={
-            "id": user.id,
-            "provider": user.provider,
-            "email": user.email,
-            "name": user.name,
-            "picture": user.picture,
-            "last_login_at": user.last_login_at.isoformat() if user.last_login_at else None,
-        },
-    )
+    info = await _verify_google_id_token(google_id_token)
+
+    user = await _google_write(db, info)
 
     token = _create_access_token(user_id=user.id)
     return AuthResponse(access_token=token, user=UserOut.model_validate(user))
 
 
 @router.get("/me", response_model=UserOut)
-def read_me(current_user: User = Depends(get_current_user)) -> UserOut:
+async def read_me(
+    request: Request,
+    response: Response,
+    current_user: User = Depends(get_current_user),
+) -> UserOut | Response:
+    etag = etag_from_parts(
+        "user",
+        *(getattr(current_user, field) for field in UserOut.model_fields),
+    )
+    if if_none_match_hits(request.headers.get("if-none-match"), etag):
+        return not_modified(etag)
+    set_etag(response, etag)
     return UserOut.model_validate(current_user)
 
 
@@ -176,39 +187,51 @@ class LoginIn(BaseModel):
     password: str
 
 
-@router.post("/signup", response_model=AuthResponse)
-def signup(payload: SignupIn, db: Session = Depends(get_db)) -> AuthResponse:
-    existing = get_password_user_by_email(db, email=payload.email)
-    if existing:
-        raise HTTPException(status_code=400, detail="Account already exists")
+async def _hashing(coro):
+    # PBKDF2 runs in the bounded hashing pool; shed load instead of queueing forever.
     try:
-        user = create_password_user(db, email=payload.email, password=payload.password, name=payload.name)
+        return await coro
+    except HashingBusyError:
+        raise HTTPException(status_code=503, detail="Server busy, please retry", headers={"Retry-After": "1"})
+
+
+async def _lookup_password_user(db: AsyncSession, *, email: str) -> User | None:
+    user = await get_password_user_by_email(db, email=email)
+    # End the read transaction so no pooled connection is held while hashing.
+    await db.commit()
+    return user
+
+
+async def _signup_write(db: AsyncSession, *, payload: SignupIn, password_hash: str) -> User:
+    try:
+        return await create_password_user(db, email=payload.email, password_hash=password_hash, name=payload.name)
     except ValueError:
         raise HTTPException(status_code=400, detail="Account already exists")
 
-    # Store a copy in user_data
-    upsert_value(
-        db,
-        user_id=user.id,
-        key="user",
-        value={
-            "id": user.id,
-            "provider": user.provider,
-            "email": user.email,
-            "name": user.name,
-            "picture": None,
-            "last_login_at": user.last_login_at.isoformat() if user.last_login_at else None,
-        },
-    )
+
+@router.post("/signup", response_model=AuthResponse)
+async def signup(payload: SignupIn, request: Request, db: AsyncSession = Depends(get_db)) -> AuthResponse:
+    async with _guarded(request, "signup", email=payload.email):
+        existing = await _lookup_password_user(db, email=payload.email)
+        if existing:
+            raise HTTPException(status_code=400, detail="Account already exists")
+        if not payload.password:
+            raise HTTPException(status_code=400, detail="Password required")
+
+        password_hash = await _hashing(hash_password_async(payload.password))
+        user = await _signup_write(db, payload=payload, password_hash=password_hash)
 
     token = _create_access_token(user_id=user.id)
     return AuthResponse(access_token=token, user=UserOut.model_validate(user))
 
 
 @router.post("/login", response_model=AuthResponse)
-def login(payload: LoginIn, db: Session = Depends(get_db)) -> AuthResponse:
-    user = check_password_user(db, email=payload.email, password=payload.password)
-    if user is None:
-        raise HTTPException(status_code=401, detail="Invalid email or password")
+async def login(payload: LoginIn, request: Request, db: AsyncSession = Depends(get_db)) -> AuthResponse:
+    async with _guarded(request, "login", email=payload.email):
+        user = await _lookup_password_user(db, email=payload.email)
+        if user is None or not await _hashing(verify_password_async(payload.password, user.password_hash)):
+            raise HTTPException(status_code=401, detail="Invalid email or password")
+        user = await record_password_login(db, user=user)
+
     token = _create_access_token(user_id=user.id)
     return AuthResponse(access_token=token, user=UserOut.model_validate(user))
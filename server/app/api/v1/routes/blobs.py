@@ -0,0 +1,155 @@
+from __future__ import annotations
+
+from contextlib import aclosing
+from typing import AsyncIterator
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import FileResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.datastructures import UploadFile
+from starlette.formparsers import MultiPartException, MultiPartParser
+
+from app.api.deps import get_current_user
+from app.core.blobstore import (
+    BlobTooLarge,
+    ImageTooLarge,
+    blob_store,
+    check_image_pixels,
+    is_blob_id,
+    sniff_image_type,
+)
+from app.core.config import settings
+from app.core.etag import if_none_match_hits
+from app.crud.blobs import create_blob, get_blob
+from app.db.deps import get_db
+from app.models.user import User
+from app.schemas.blob import BlobOut
+
+
+router = APIRouter(prefix="/blobs")
+
+# Content-addressed URLs never change meaning, so caches may keep them forever.
+_IMMUTABLE = "public, max-age=31536000, immutable"
+
+
+# Room for the multipart boundary and part headers around the file itself.
+_MULTIPART_OVERHEAD = 16 * 1024
+
+_UPLOAD_BODY = {
+    "required": True,
+    "content": {
+        "multipart/form-data": {
+            "schema": {
+                "type": "object",
+                "required": ["file"],
+                "properties": {"file": {"type": "string", "format": "binary"}},
+            }
+        }
+    },
+}
+
+
+async def _limited(stream: AsyncIterator[bytes], limit: int) -> AsyncIterator[bytes]:
+    received = 0
+    async for chunk in stream:
+        received += len(chunk)
+        if received > limit:
+            raise BlobTooLarge(f"Request body exceeds {limit} bytes")
+        yield chunk
+
+
+def _too_large() -> HTTPException:
+    return HTTPException(status_code=413, detail=f"File too large (max {settings.blob_max_bytes} bytes)")
+
+
+@router.post("", response_model=BlobOut, status_code=201, openapi_extra={"requestBody": _UPLOAD_BODY})
+async def upload_blob(
+    request: Request,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+) -> BlobOut:
+    # The body is parsed here rather than through `File(...)`, so the size limit applies
+    # while it's read: Starlette would otherwise spool the whole body first.
+    limit = settings.blob_max_bytes + _MULTIPART_OVERHEAD
+    declared = request.headers.get("content-length", "")
+    if declared.isdigit() and int(declared) > limit:
+        raise _too_large()
+    if not request.headers.get("content-type", "").startswith("multipart/form-data"):
+        raise HTTPException(status_code=415, detail="Expected multipart/form-data with a `file` field")
+
+    try:
+        async with aclosing(_limited(request.stream(), limit)) as body:
+            form = await MultiPartParser(request.headers, body, max_files=1, max_fields=10).parse()
+    except BlobTooLarge:
+        raise _too_large()
+    except MultiPartException as exc:
+        raise HTTPException(status_code=400, detail=exc.message)
+
+    try:
+        file = form.get("file")
+        if not isinstance(file, UploadFile):
+            raise HTTPException(status_code=422, detail="Missing `file` field")
+        head = await file.read(16)
+        await file.seek(0)
+        content_type = sniff_image_type(head)
+        if content_type is None:
+            raise HTTPException(status_code=415, detail="Only PNG, JPEG, GIF or WebP images are accepted")
+
+        # Copy the spooled part into the store in chunks on a worker thread
+        # (header parsing, hashing and disk I/O are blocking).
+        try:
+            await run_in_threadpool(check_image_pixels, file.file)
+            blob_id, size = await run_in_threadpool(blob_store.save, file.file, max_bytes=settings.blob_max_bytes)
+        except ImageTooLarge:
+            raise HTTPException(
+                status_code=413, detail=f"Image too large (max {settings.blob_max_image_pixels} pixels)"
+            )
+        except BlobTooLarge:
+            raise _too_large()
+    finally:
+        await form.close()
+
+    await create_blob(db, blob_id=blob_id, content_type=content_type, size=size, created_by=current_user.id)
+    return BlobOut(
+        id=blob_id,
+        url=str(request.app.url_path_for("download_blob", blob_id=blob_id)),
+        content_type=content_type,
+        size=size,
+    )
+
+
+@router.get("/{blob_id}", name="download_blob")
+async def download_blob(
+    blob_id: str,
+    request: Request,
+    w: int | None = Query(None, description="Thumbnail width; one of BLOB_THUMBNAIL_WIDTHS"),
+    db: AsyncSession = Depends(get_db),
+) -> Response:
+    # No auth: ids are unguessable content hashes, and <img src> can't send bearer tokens.
+    if not is_blob_id(blob_id):
+        raise HTTPException(status_code=404, detail="Not found")
+    if w is not None and w not in settings.blob_thumbnail_widths_list:
+        raise HTTPException(status_code=400, detail=f"w must be one of {settings.blob_thumbnail_widths_list}")
+
+    etag = f'"{blob_id}-w{w}"' if w else f'"{blob_id}"'
+    headers = {"Cache-Control": _IMMUTABLE, "ETag": etag, "X-Content-Type-Options": "nosniff"}
+    if if_none_match_hits(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+
+    blob = await get_blob(db, blob_id=blob_id)
+    path = blob_store.path_for(blob_id)
+    if blob is None or not path.exists():
+        raise HTTPException(status_code=404, detail="Not found")
+
+    media_type = blob.content_type
+    if w is not None:
+        try:
+            thumb = await run_in_threadpool(blob_store.thumbnail, blob_id, w)
+        except ImageTooLarge:
+            raise HTTPException(status_code=422, detail="Image too large to thumbnail")
+        if thumb is not None:
+            path, media_type = thumb, "image/webp"
+
+    # FileResponse streams from disk in chunks and answers Range requests (206).
+    return FileResponse(path, media_type=media_type, headers=headers)
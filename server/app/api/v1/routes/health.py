@@ -1,10 +1,36 @@
 from __future__ import annotations
 
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends
+
+from app.api.deps import require_metrics_token
+from app.core.cache import token_cache, user_cache
+from app.core.pubsub import user_data_hub
+from app.db.write_behind import user_data_writer
 
 router = APIRouter()
 
+# Operational counters; only mounted when a metrics token is configured.
+stats_router = APIRouter(dependencies=[Depends(require_metrics_token)])
+
 
 @router.get("/health")
 def health() -> dict:
     return {"status": "ok"}
+
+
+@stats_router.get("/health/cache")
+def cache_stats() -> dict:
+    # Hit/miss counters for the auth caches; a healthy steady state is mostly hits.
+    return {"user": user_cache.stats(), "token": token_cache.stats()}
+
+
+@stats_router.get("/health/write-behind")
+def write_behind_stats() -> dict:
+    # `writes` vs `flushes` shows how many PUTs each commit absorbed.
+    return user_data_writer.stats()
+
+
+@stats_router.get("/health/streams")
+def stream_stats() -> dict:
+    # Open user-data change streams in this process.
+    return user_data_hub.stats()
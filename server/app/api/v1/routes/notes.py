@@ -1,29 +1,116 @@
 from __future__ import annotations
 
-from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
+from collections.abc import AsyncIterator
 
-from app.crud.notes import create_note, list_notes
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.etag import etag_from_parts, if_none_match_hits, not_modified, set_etag
+from app.crud.notes import create_note, create_notes, delete_notes, iter_notes, list_notes, search_notes
 from app.api.deps import get_current_user
 from app.db.deps import get_db
 from app.models.user import User
-from app.schemas.note import NoteCreate, NoteOut
+from app.schemas.note import (
+    MAX_BATCH_NOTES,
+    NoteBatchCreate,
+    NoteBatchDeleteOut,
+    NoteBatchOut,
+    NoteCreate,
+    NoteOut,
+    NotePage,
+    NoteSearchHit,
+    NoteSearchPage,
+)
 
 router = APIRouter()
 
 
-@router.get("/", response_model=list[NoteOut])
-def get_notes(
-    db: Session = Depends(get_db),
+@router.get("/", response_model=NotePage)
+async def get_notes(
+    request: Request,
+    response: Response,
+    limit: int = Query(50, ge=1, le=100),
+    before_id: int | None = Query(None, ge=1, description="Return notes older than this id"),
+    after_id: int | None = Query(None, ge=0, description="Return notes newer than this id"),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+) -> NotePage | Response:
+    if before_id is not None and after_id is not None:
+        raise HTTPException(status_code=400, detail="Use either before_id or after_id, not both")
+    notes, next_cursor = await list_notes(
+        db,
+        user_id=current_user.id,
+        limit=limit,
+        before_id=before_id,
+        after_id=after_id,
+    )
+    # Hash the raw rows so an unchanged page skips validation, encoding and transfer.
+    etag = etag_from_parts(
+        "notes",
+        next_cursor,
+        [(n.id, n.user_id, n.title, n.content, n.created_at) for n in notes],
+    )
+    if if_none_match_hits(request.headers.get("if-none-match"), etag):
+        return not_modified(etag)
+    set_etag(response, etag)
+    return NotePage(items=[NoteOut.model_validate(n) for n in notes], next_cursor=next_cursor)
+
+
+@router.get("/search", response_model=NoteSearchPage)
+async def search(
+    q: str = Query(..., min_length=1, max_length=200),
+    limit: int = Query(20, ge=1, le=50),
+    offset: int = Query(0, ge=0, le=1000),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user),
-) -> list[NoteOut]:
-    return list_notes(db, user_id=current_user.id)
+) -> NoteSearchPage:
+    hits, next_offset = await search_notes(db, user_id=current_user.id, query=q, limit=limit, offset=offset)
+    return NoteSearchPage(items=[NoteSearchHit(**hit) for hit in hits], next_offset=next_offset)
 
 
 @router.post("/", response_model=NoteOut)
-def post_note(
+async def post_note(
     payload: NoteCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ) -> NoteOut:
-    return create_note(db, user_id=current_user.id, payload=payload)
+    return await create_note(db, user_id=current_user.id, payload=payload)
+
+
+@router.post("/batch", response_model=NoteBatchOut)
+async def post_notes_batch(
+    payload: NoteBatchCreate,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+) -> NoteBatchOut:
+    notes = await create_notes(db, user_id=current_user.id, payloads=payload.notes)
+    return NoteBatchOut(items=[NoteOut.model_validate(n) for n in notes])
+
+
+@router.delete("/", response_model=NoteBatchDeleteOut)
+async def delete_notes_batch(
+    ids: list[int] = Query(..., description="Repeat `ids=` once per note"),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+) -> NoteBatchDeleteOut:
+    unique_ids = list(dict.fromkeys(ids))
+    if len(unique_ids) > MAX_BATCH_NOTES:
+        raise HTTPException(status_code=400, detail=f"Too many ids (max {MAX_BATCH_NOTES})")
+    deleted = await delete_notes(db, user_id=current_user.id, ids=unique_ids)
+    return NoteBatchDeleteOut(deleted=deleted)
+
+
+async def _ndjson_lines(user_id: int) -> AsyncIterator[bytes]:
+    async for chunk in iter_notes(user_id=user_id):
+        yield b"".join(NoteOut.model_validate(n).model_dump_json().encode() + b"\n" for n in chunk)
+
+
+@router.get("/export")
+async def export_notes(current_user: User = Depends(get_current_user)) -> StreamingResponse:
+    """All notes as NDJSON (one NoteOut object per line), oldest first, streamed in chunks."""
+    return StreamingResponse(
+        _ndjson_lines(current_user.id),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": 'attachment; filename="notes.ndjson"', "Cache-Control": "no-store"},
+    )
@@ -0,0 +1,26 @@
+from __future__ import annotations
+
+import datetime as dt
+
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.deps import get_current_user
+from app.crud.stats import get_stats
+from app.db.deps import get_db
+from app.models.user import User
+from app.schemas.stats import StatsOut
+
+router = APIRouter()
+
+
+@router.get("/stats", response_model=StatsOut)
+async def read_stats(
+    today: dt.date | None = Query(None, description="The caller's local date (default: today in UTC)"),
+    year: int | None = Query(None, ge=1, le=9999, description="Year for `completed_by_day` (default: today's)"),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+) -> StatsOut:
+    today = today or dt.datetime.now(dt.timezone.utc).date()
+    stats = await get_stats(db, user_id=current_user.id, today=today, year=year or today.year)
+    return StatsOut(**stats)
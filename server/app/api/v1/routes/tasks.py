@@ -0,0 +1,61 @@
+from __future__ import annotations
+
+import datetime as dt
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.deps import get_current_user
+from app.crud.tasks import create_task, delete_task, list_tasks, update_task
+from app.db.deps import get_db
+from app.models.user import User
+from app.schemas.task import TaskCreate, TaskList, TaskOut, TaskUpdate
+
+router = APIRouter()
+
+
+@router.get("/", response_model=TaskList)
+async def get_tasks(
+    start: dt.date | None = Query(None, description="First day to include (YYYY-MM-DD)"),
+    end: dt.date | None = Query(None, description="Last day to include (YYYY-MM-DD)"),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+) -> TaskList:
+    if start is not None and end is not None and start > end:
+        raise HTTPException(status_code=400, detail="start must not be after end")
+    tasks = await list_tasks(db, user_id=current_user.id, start=start, end=end)
+    return TaskList(items=[TaskOut.model_validate(t) for t in tasks])
+
+
+@router.post("/", response_model=TaskOut, status_code=201)
+async def post_task(
+    payload: TaskCreate,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+) -> TaskOut:
+    return await create_task(db, user_id=current_user.id, payload=payload)
+
+
+@router.patch("/{task_id}", response_model=TaskOut)
+async def patch_task(
+    task_id: int,
+    payload: TaskUpdate,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+) -> TaskOut:
+    changes = payload.model_dump(exclude_unset=True)
+    task = await update_task(db, user_id=current_user.id, task_id=task_id, changes=changes)
+    if task is None:
+        raise HTTPException(status_code=404, detail="Not found")
+    return task
+
+
+@router.delete("/{task_id}", status_code=204)
+async def remove_task(
+    task_id: int,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+) -> Response:
+    if not await delete_task(db, user_id=current_user.id, task_id=task_id):
+        raise HTTPException(status_code=404, detail="Not found")
+    return Response(status_code=204)
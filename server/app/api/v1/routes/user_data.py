@@ -1,39 +1,354 @@
 from __future__ import annotations
 
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+import asyncio
+import time
+from collections.abc import AsyncIterator
 
-from app.api.deps import get_current_user
-from app.crud.user_data import get_value, upsert_value
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.deps import get_current_user, get_stream_user
+from app.core import fastjson
+from app.core.config import settings
+from app.core.etag import etag_from_parts, if_match_allows, if_none_match_hits, not_modified, set_etag
+from app.core.patch import PatchError, apply_json_patch, apply_merge_patch
+from app.core.pubsub import RESYNC, Change, StreamLimitError, user_data_hub
+from app.core.security import create_stream_ticket
+from app.crud.user_data import (
+    VersionConflict,
+    get_changes,
+    get_value,
+    get_values,
+    get_version,
+    patch_value,
+    replace_value,
+    upsert_value,
+    upsert_values,
+)
 from app.db.deps import get_db
+from app.db.write_behind import user_data_writer
 from app.models.user import User
-from app.schemas.user_data import UserDataOut, UserDataUpsert
+from app.schemas.user_data import (
+    MAX_BATCH_KEYS,
+    StreamTicketOut,
+    UserDataBatchItem,
+    UserDataBatchOut,
+    UserDataBatchUpsert,
+    UserDataChange,
+    UserDataChangesOut,
+    UserDataOut,
+    UserDataUpsert,
+)
 
 
 router = APIRouter(prefix="/user-data")
 
 
+def _etag(user_id: int, key: str, version: int) -> str:
+    # (user, key, version) identifies a value exactly, every write bumps version, and
+    # it is known before a buffered write reaches the database.
+    return etag_from_parts("user_data", user_id, key, version)
+
+
+def _precondition_failed(current_etag: str | None) -> HTTPException:
+    headers = {"ETag": current_etag} if current_etag else None
+    return HTTPException(status_code=412, detail="Precondition failed", headers=headers)
+
+
+async def _require_if_match(db: AsyncSession, *, user_id: int, key: str, if_match: str) -> tuple[int, int]:
+    """Check If-Match against the stored value; returns its (row id, version) or raises 412.
+
+    Call inside `user_data_writer.direct_write()`, which flushes buffered writes first.
+    """
+    meta = await get_version(db, user_id=user_id, key=key)
+    current_etag = _etag(user_id, key, meta[1]) if meta else None
+    if meta is None or not if_match_allows(if_match, current_etag):
+        raise _precondition_failed(current_etag)
+    return meta
+
+
+@router.get("", response_model=UserDataBatchOut)
+async def read_user_data_batch(
+    keys: list[str] = Query(..., description="Repeat `keys=` once per key"),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+) -> UserDataBatchOut:
+    # Preserve request order, drop duplicates.
+    unique_keys = list(dict.fromkeys(keys))
+    if len(unique_keys) > MAX_BATCH_KEYS:
+        raise HTTPException(status_code=400, detail=f"Too many keys (max {MAX_BATCH_KEYS})")
+
+    found = await get_values(db, user_id=current_user.id, keys=unique_keys)
+    items = []
+    for key in unique_keys:
+        pending = user_data_writer.peek(current_user.id, key)
+        if pending is not None:
+            items.append(
+                UserDataBatchItem(
+                    key=key, found=True, value=pending.value, updated_at=pending.updated_at, version=pending.version
+                )
+            )
+            continue
+        if key not in found:
+            items.append(UserDataBatchItem(key=key, found=False))
+            continue
+        value, row = found[key]
+        items.append(
+            UserDataBatchItem(key=key, found=True, value=value, updated_at=row.updated_at, version=row.version)
+        )
+    return UserDataBatchOut(items=items)
+
+
+@router.put("", response_model=UserDataBatchOut)
+async def write_user_data_batch(
+    payload: UserDataBatchUpsert,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+) -> UserDataBatchOut:
+    if not payload.values:
+        raise HTTPException(status_code=400, detail="No values provided")
+    if len(payload.values) > MAX_BATCH_KEYS:
+        raise HTTPException(status_code=400, detail=f"Too many keys (max {MAX_BATCH_KEYS})")
+
+    async with user_data_writer.direct_write(db, current_user.id, list(payload.values)):
+        rows = await upsert_values(db, user_id=current_user.id, values=payload.values)
+    return UserDataBatchOut(
+        items=[
+            UserDataBatchItem(
+                key=row.key,
+                found=True,
+                value=payload.values[row.key],
+                updated_at=row.updated_at,
+                version=row.version,
+            )
+            for row in rows
+        ]
+    )
+
+
+def _sse(event: str, data: object) -> bytes:
+    return f"event: {event}\ndata: {fastjson.dumps(data)}\n\n".encode()
+
+
+def _change_event(change: Change) -> bytes:
+    if change is RESYNC:
+        return _sse("resync", {})
+    updated_at = change.updated_at.isoformat() if change.updated_at is not None else None
+    return _sse("change", {"key": change.key, "version": change.version, "updated_at": updated_at})
+
+
+async def _change_stream(user_id: int) -> AsyncIterator[bytes]:
+    sub = user_data_hub.subscribe(user_id)
+    try:
+        # Reconnect delay for EventSource, then a marker that the subscription is live
+        # (refetch after it to close the gap before connecting).
+        yield b"retry: 3000\n\n" + _sse("ready", {})
+        deadline = time.monotonic() + settings.user_data_stream_max_age_seconds
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return
+            try:
+                change = await asyncio.wait_for(
+                    sub.queue.get(), timeout=min(settings.user_data_stream_heartbeat_seconds, remaining)
+                )
+            except asyncio.TimeoutError:
+                # Comment line: keeps proxies from closing an idle stream and surfaces
+                # dead clients, whose next write fails.
+                yield b": ping\n\n"
+                continue
+            yield _change_event(change)
+    finally:
+        user_data_hub.unsubscribe(sub)
+
+
+# Declared before `/{key}` so "changes" and "stream" aren't taken for keys.
+@router.get("/changes", response_model=UserDataChangesOut)
+async def read_user_data_changes(
+    since: int = Query(0, ge=0, description="Cursor from a previous response; 0 for everything"),
+    limit: int = Query(100, ge=1, le=500),
+    values: bool = Query(False, description="Include each key's current value"),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+) -> UserDataChangesOut:
+    """Keys changed after `since`, oldest first. Page with `cursor` while `has_more`.
+
+    A key written several times appears once, at its latest change.
+    """
+    # Buffered writes get their change numbers when they're committed.
+    await user_data_writer.flush_user(current_user.id)
+    changes, has_more = await get_changes(
+        db, user_id=current_user.id, since=since, limit=limit, include_values=values
+    )
+    items = [
+        UserDataChange(key=row.key, version=row.version, seq=row.change_seq, updated_at=row.updated_at, value=value)
+        for row, value in changes
+    ]
+    return UserDataChangesOut(items=items, cursor=items[-1].seq if items else since, has_more=has_more)
+
+
+@router.post("/stream-ticket", response_model=StreamTicketOut)
+async def create_user_data_stream_ticket(current_user: User = Depends(get_current_user)) -> StreamTicketOut:
+    """A short-lived ticket for `GET /stream?ticket=...`; fetch a new one to reconnect."""
+    return StreamTicketOut(
+        ticket=create_stream_ticket(user_id=current_user.id),
+        expires_in=settings.user_data_stream_ticket_seconds,
+    )
+
+
+@router.get("/stream")
+async def stream_user_data_changes(current_user: User = Depends(get_stream_user)) -> StreamingResponse:
+    """Server-Sent Events: a `change` event ({key, version, updated_at}) per write to your data.
+
+    Values aren't included; fetch the key (with If-None-Match) when it matters.
+    A `resync` event means notifications were dropped and every key may have changed.
+    """
+    try:
+        user_data_hub.check_capacity(current_user.id)
+    except StreamLimitError as e:
+        raise HTTPException(status_code=429 if e.per_user else 503, detail=str(e), headers={"Retry-After": "5"})
+    return StreamingResponse(
+        _change_stream(current_user.id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-store", "X-Accel-Buffering": "no"},
+    )
+
+
 @router.get("/{key}", response_model=UserDataOut)
-def read_user_data(
+async def read_user_data(
     key: str,
-    db: Session = Depends(get_db),
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user),
-) -> UserDataOut:
-    exists, value, row = get_value(db, user_id=current_user.id, key=key)
+) -> UserDataOut | Response:
+    if_none_match = request.headers.get("if-none-match")
+
+    # Read-your-writes: a buffered PUT is newer than whatever the database holds.
+    pending = user_data_writer.peek(current_user.id, key)
+    if pending is not None:
+        etag = _etag(current_user.id, key, pending.version)
+        if if_none_match_hits(if_none_match, etag):
+            return not_modified(etag)
+        set_etag(response, etag)
+        return UserDataOut(key=key, value=pending.value, updated_at=pending.updated_at, version=pending.version)
+
+    if if_none_match:
+        # Revalidation: compare against the version before loading/decoding the value.
+        meta = await get_version(db, user_id=current_user.id, key=key)
+        if meta is None:
+            raise HTTPException(status_code=404, detail="Not found")
+        etag = _etag(current_user.id, key, meta[1])
+        if if_none_match_hits(if_none_match, etag):
+            return not_modified(etag)
+
+    exists, value, row = await get_value(db, user_id=current_user.id, key=key)
     if not exists:
         raise HTTPException(status_code=404, detail="Not found")
-    return UserDataOut(key=key, value=value, updated_at=getattr(row, "updated_at", None))
+    set_etag(response, _etag(current_user.id, key, row.version))
+    return UserDataOut(key=key, value=value, updated_at=row.updated_at, version=row.version)
 
 
 @router.put("/{key}", response_model=UserDataOut)
-def write_user_data(
+async def write_user_data(
     key: str,
     payload: UserDataUpsert,
-    db: Session = Depends(get_db),
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ) -> UserDataOut:
-    row = upsert_value(db, user_id=current_user.id, key=key, value=payload.value)
-    exists, value, _ = get_value(db, user_id=current_user.id, key=key)
-    if not exists:
-        raise HTTPException(status_code=500, detail="Write failed")
-    return UserDataOut(key=key, value=value, updated_at=getattr(row, "updated_at", None))
+    if_match = request.headers.get("if-match")
+    if if_match is None and user_data_writer.enabled:
+        # Buffered: bursts of edits to the same key collapse into one commit.
+        pending = await user_data_writer.put(user_id=current_user.id, key=key, value=payload.value)
+        set_etag(response, _etag(current_user.id, key, pending.version))
+        return UserDataOut(key=key, value=payload.value, updated_at=pending.updated_at, version=pending.version)
+
+    async with user_data_writer.direct_write(db, current_user.id, [key]):
+        if if_match is None:
+            row = await upsert_value(db, user_id=current_user.id, key=key, value=payload.value)
+        else:
+            row_id, version = await _require_if_match(db, user_id=current_user.id, key=key, if_match=if_match)
+            try:
+                row = await replace_value(
+                    db, user_id=current_user.id, row_id=row_id, version=version, value=payload.value
+                )
+            except VersionConflict:
+                raise _precondition_failed(None)
+
+    set_etag(response, _etag(current_user.id, key, row.version))
+    return UserDataOut(key=key, value=payload.value, updated_at=row.updated_at, version=row.version)
+
+
+_JSON_PATCH = "application/json-patch+json"
+_MERGE_PATCH = "application/merge-patch+json"
+
+
+@router.patch("/{key}", response_model=UserDataOut)
+async def patch_user_data(
+    key: str,
+    request: Request,
+    response: Response,
+    expected_version: int | None = Query(None, ge=1, description="Fail with 409 unless the stored version matches"),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+) -> UserDataOut:
+    """Apply an RFC 6902 JSON Patch or RFC 7396 merge patch to a stored value.
+
+    The patch format is chosen by Content-Type. Only the edit crosses the wire;
+    the server reads, patches and writes back the document. `If-Match` (ETag) and
+    `?expected_version=` both guard against lost updates.
+    """
+    content_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+    if content_type not in (_JSON_PATCH, _MERGE_PATCH):
+        raise HTTPException(
+            status_code=415,
+            detail=f"Content-Type must be {_JSON_PATCH} or {_MERGE_PATCH}",
+            headers={"Accept-Patch": f"{_JSON_PATCH}, {_MERGE_PATCH}"},
+        )
+    try:
+        patch = fastjson.loads(await request.body())
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Patch body is not valid JSON")
+
+    if content_type == _JSON_PATCH:
+        apply = lambda doc: apply_json_patch(doc, patch)  # noqa: E731
+    else:
+        apply = lambda doc: apply_merge_patch(doc, patch)  # noqa: E731
+
+    if_match = request.headers.get("if-match")
+    async with user_data_writer.direct_write(db, current_user.id, [key]):
+        if if_match is not None:
+            _, version = await _require_if_match(db, user_id=current_user.id, key=key, if_match=if_match)
+            if expected_version is not None and expected_version != version:
+                raise HTTPException(
+                    status_code=409,
+                    detail={"message": "Version conflict", "current_version": version},
+                )
+            expected_version = version
+
+        try:
+            result = await patch_value(
+                db,
+                user_id=current_user.id,
+                key=key,
+                apply=apply,
+                expected_version=expected_version,
+            )
+        except PatchError as e:
+            raise HTTPException(status_code=422, detail=str(e))
+        except VersionConflict as e:
+            if if_match is not None:
+                raise _precondition_failed(None)
+            raise HTTPException(
+                status_code=409,
+                detail={"message": "Version conflict", "current_version": e.current_version},
+            )
+    if result is None:
+        raise HTTPException(status_code=404, detail="Not found")
+
+    value, row = result
+    set_etag(response, _etag(current_user.id, key, row.version))
+    return UserDataOut(key=key, value=value, updated_at=row.updated_at, version=row.version)
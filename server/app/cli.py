@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+import argparse
+import os
+
+from app.core.config import settings
+from app.db import migrations
+from app.db.session import engine
+
+
+def _migrate(args: argparse.Namespace) -> None:
+    applied = migrations.upgrade(engine, target=args.to)
+    for migration in applied:
+        print(f"applied {migration.version:04d}_{migration.name}")
+    with engine.connect() as conn:
+        print(f"schema version {migrations.current_version(conn)} (head {migrations.head_version()})")
+
+
+def _db_version(_args: argparse.Namespace) -> None:
+    with engine.connect() as conn:
+        current = migrations.current_version(conn)
+    head = migrations.head_version()
+    print(f"schema version {current} (head {head})")
+    for migration in migrations.discover():
+        state = "applied" if migration.version <= current else "pending"
+        print(f"  {migration.version:04d}_{migration.name}: {state}")
+
+
+def _rebuild_search_index(_args: argparse.Namespace) -> None:
+    from app.db.fts import rebuild_notes_fts
+
+    migrations.upgrade(engine)
+    with engine.begin() as conn:
+        rebuild_notes_fts(conn)
+    print("notes_fts rebuilt")
+
+
+def _rebuild_stats(args: argparse.Namespace) -> None:
+    from app.db.stats import rebuild_stats
+
+    migrations.upgrade(engine)
+    with engine.begin() as conn:
+        users = rebuild_stats(conn, user_id=args.user_id)
+    print(f"stats rebuilt for {users} user(s)")
+
+
+def _serve(args: argparse.Namespace) -> None:
+    import uvicorn
+
+    workers = args.workers or settings.web_concurrency or os.cpu_count() or 1
+    # Migrate once before the workers start; each then finds the schema at head.
+    migrations.upgrade(engine)
+    engine.dispose()
+    # Workers are spawned fresh and read their settings from the environment.
+    os.environ["WEB_CONCURRENCY"] = str(workers)
+    uvicorn.run("app.main:app", host=args.host, port=args.port, workers=workers)
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(prog="python -m app.cli", description="StudyBuddy server maintenance commands")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    cmd = sub.add_parser("migrate", help="Apply pending schema migrations")
+    cmd.add_argument("--to", type=int, default=None, help="Target version (default: head)")
+    cmd.set_defaults(func=_migrate)
+
+    cmd = sub.add_parser("db-version", help="Show the current schema version and pending migrations")
+    cmd.set_defaults(func=_db_version)
+
+    cmd = sub.add_parser("rebuild-search-index", help="Rebuild the notes full-text index from the notes table")
+    cmd.set_defaults(func=_rebuild_search_index)
+
+    cmd = sub.add_parser("rebuild-stats", help="Recompute dashboard stats from the tasks and assessments tables")
+    cmd.add_argument("--user-id", type=int, default=None, help="Only this user (default: everyone)")
+    cmd.set_defaults(func=_rebuild_stats)
+
+    cmd = sub.add_parser("serve", help="Run the API with one worker process per CPU (or --workers N)")
+    cmd.add_argument("--host", default="127.0.0.1")
+    cmd.add_argument("--port", type=int, default=8000)
+    cmd.add_argument("--workers", type=int, default=None, help="Worker processes (default: WEB_CONCURRENCY or CPU count)")
+    cmd.set_defaults(func=_serve)
+
+    args = parser.parse_args(argv)
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
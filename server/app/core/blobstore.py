@@ -0,0 +1,160 @@
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+import tempfile
+import warnings
+from pathlib import Path
+from typing import BinaryIO
+
+from app.core.config import settings
+
+try:  # Optional: thumbnails need Pillow; without it the original image is served.
+    from PIL import Image
+except ImportError:  # pragma: no cover - depends on the environment
+    Image = None
+
+if Image is not None:
+    # Pillow only warns past MAX_IMAGE_PIXELS (and refuses at twice that); refuse at the limit.
+    Image.MAX_IMAGE_PIXELS = settings.blob_max_image_pixels
+    warnings.filterwarnings("error", category=Image.DecompressionBombWarning)
+
+logger = logging.getLogger(__name__)
+
+_CHUNK = 64 * 1024
+
+# Magic-number sniffing: the stored type comes from the bytes, not the client's
+# Content-Type, so nothing but these image formats is ever served back.
+_SIGNATURES: list[tuple[bytes, int, str]] = [
+    (b"\x89PNG\r\n\x1a\n", 0, "image/png"),
+    (b"\xff\xd8\xff", 0, "image/jpeg"),
+    (b"GIF87a", 0, "image/gif"),
+    (b"GIF89a", 0, "image/gif"),
+    (b"WEBP", 8, "image/webp"),
+]
+
+
+class BlobTooLarge(ValueError):
+    """Upload exceeded the configured size limit."""
+
+
+class ImageTooLarge(ValueError):
+    """Image declares more pixels than the configured limit (a likely decompression bomb)."""
+
+
+def _bomb_errors() -> tuple[type[BaseException], ...]:
+    return (Image.DecompressionBombError, Image.DecompressionBombWarning) if Image is not None else ()
+
+
+def sniff_image_type(head: bytes) -> str | None:
+    for signature, offset, content_type in _SIGNATURES:
+        if head[offset : offset + len(signature)] == signature:
+            if content_type == "image/webp" and not head.startswith(b"RIFF"):
+                continue
+            return content_type
+    return None
+
+
+def check_image_pixels(fileobj: BinaryIO) -> None:
+    """Raise ImageTooLarge if the image header declares too many pixels. Blocking.
+
+    Only the header is read. Without Pillow, or for files Pillow can't parse, this
+    is a no-op (thumbnails then fall back to the original).
+    """
+    if Image is None:
+        return
+    position = fileobj.tell()
+    try:
+        with Image.open(fileobj):
+            pass
+    except _bomb_errors() as exc:
+        raise ImageTooLarge(str(exc)) from exc
+    except Exception:
+        pass
+    finally:
+        fileobj.seek(position)
+
+
+def is_blob_id(value: str) -> bool:
+    return len(value) == 64 and all(c in "0123456789abcdef" for c in value)
+
+
+class LocalBlobStore:
+    """Content-addressed files on local disk: `<root>/<aa>/<bb>/<sha256>`.
+
+    Writes go to a temp file in the same directory tree and are renamed into
+    place, so readers never see partial content and identical uploads dedupe.
+    """
+
+    def __init__(self, root: Path) -> None:
+        self.root = root
+
+    def path_for(self, blob_id: str) -> Path:
+        return self.root / blob_id[:2] / blob_id[2:4] / blob_id
+
+    def thumbnail_path(self, blob_id: str, width: int) -> Path:
+        return self.root / "thumbs" / blob_id[:2] / f"{blob_id}-w{width}.webp"
+
+    def save(self, fileobj: BinaryIO, *, max_bytes: int) -> tuple[str, int]:
+        """Stream `fileobj` into the store; returns (sha256 hex, size). Blocking."""
+        tmp_dir = self.root / "tmp"
+        tmp_dir.mkdir(parents=True, exist_ok=True)
+        digest = hashlib.sha256()
+        size = 0
+        fd, tmp_name = tempfile.mkstemp(dir=tmp_dir)
+        try:
+            with os.fdopen(fd, "wb") as out:
+                while chunk := fileobj.read(_CHUNK):
+                    size += len(chunk)
+                    if size > max_bytes:
+                        raise BlobTooLarge(f"Upload exceeds {max_bytes} bytes")
+                    digest.update(chunk)
+                    out.write(chunk)
+            blob_id = digest.hexdigest()
+            final = self.path_for(blob_id)
+            final.parent.mkdir(parents=True, exist_ok=True)
+            os.replace(tmp_name, final)
+            return blob_id, size
+        except BaseException:
+            Path(tmp_name).unlink(missing_ok=True)
+            raise
+
+    def thumbnail(self, blob_id: str, width: int) -> Path | None:
+        """Path to a cached `width`-px WebP thumbnail, generating it if needed. Blocking.
+
+        Returns None when Pillow is unavailable or the image can't be decoded, and
+        raises ImageTooLarge past `BLOB_MAX_IMAGE_PIXELS`.
+        """
+        target = self.thumbnail_path(blob_id, width)
+        if target.exists():
+            return target
+        if Image is None:
+            return None
+        target.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(dir=target.parent, suffix=".webp")
+        try:
+            with os.fdopen(fd, "wb") as out, Image.open(self.path_for(blob_id)) as img:
+                img.thumbnail((width, width * 4))
+                if img.mode not in ("RGB", "RGBA"):
+                    img = img.convert("RGBA")
+                img.save(out, format="WEBP", quality=85)
+            os.replace(tmp_name, target)
+        except _bomb_errors() as exc:
+            Path(tmp_name).unlink(missing_ok=True)
+            raise ImageTooLarge(str(exc)) from exc
+        except Exception:
+            Path(tmp_name).unlink(missing_ok=True)
+            logger.warning("Thumbnail generation failed for %s", blob_id, exc_info=True)
+            return None
+        return target
+
+
+def _blob_root() -> Path:
+    # Resolve relative to the `server/` folder, like the SQLite path.
+    server_dir = Path(__file__).resolve().parents[2]
+    configured = Path(settings.blob_dir)
+    return configured if configured.is_absolute() else (server_dir / configured)
+
+
+blob_store = LocalBlobStore(_blob_root())
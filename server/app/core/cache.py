@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Hashable
+
+from app.core.config import settings
+
+
+class TTLCache:
+    """Small thread-safe LRU cache with per-entry expiry and hit/miss counters.
+
+    Entries expire after `ttl_seconds` (if set) or at an explicit `expires_at`
+    epoch timestamp, whichever comes first. When full, the least recently used
+    entry is evicted.
+    """
+
+    def __init__(self, *, max_entries: int, ttl_seconds: float | None = None) -> None:
+        self.max_entries = max(0, int(max_entries))
+        self.ttl_seconds = ttl_seconds
+        self._data: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable) -> Any | None:
+        now = time.time()
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, value = entry
+            if now >= expires_at:
+                del self._data[key]
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any, *, expires_at: float | None = None) -> None:
+        if self.max_entries == 0:
+            return
+        deadline = float("inf")
+        if self.ttl_seconds is not None:
+            deadline = time.time() + self.ttl_seconds
+        if expires_at is not None:
+            deadline = min(deadline, expires_at)
+        with self._lock:
+            self._data[key] = (deadline, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, key: Hashable) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._data),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+
+# Authenticated users by id. Entries are detached ORM rows; invalidated on login/upsert.
+user_cache = TTLCache(max_entries=settings.user_cache_max_entries, ttl_seconds=settings.user_cache_ttl_seconds)
+
+# Decoded access-token payloads by raw token string, kept until the token's `exp`.
+token_cache = TTLCache(max_entries=settings.token_cache_max_entries)
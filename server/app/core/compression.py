@@ -0,0 +1,249 @@
+from __future__ import annotations
+
+import abc
+import functools
+import zlib
+from typing import Callable, Iterable
+
+import anyio.to_thread
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# Optional encoders; gzip (zlib) is always available.
+try:
+    import brotli
+except ImportError:  # pragma: no cover - depends on the environment
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - depends on the environment
+    zstandard = None
+
+
+# Compressing bigger bodies than this on the event loop would stall other requests.
+_THREAD_MIN_SIZE = 128 * 1024
+
+
+class _Encoder(abc.ABC):
+    """Streaming compressor: `compress()` for intermediate chunks, `finish()` for the last."""
+
+    @abc.abstractmethod
+    def compress(self, data: bytes) -> bytes: ...
+
+    @abc.abstractmethod
+    def finish(self, data: bytes) -> bytes: ...
+
+
+class _GzipEncoder(_Encoder):
+    def __init__(self, level: int) -> None:
+        self._z = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def compress(self, data: bytes) -> bytes:
+        # Sync flush so streamed chunks (e.g. NDJSON lines) reach the client promptly.
+        return self._z.compress(data) + self._z.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self, data: bytes) -> bytes:
+        return self._z.compress(data) + self._z.flush(zlib.Z_FINISH)
+
+
+class _BrotliEncoder(_Encoder):
+    def __init__(self, quality: int) -> None:
+        self._c = brotli.Compressor(quality=quality)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._c.process(data) + self._c.flush()
+
+    def finish(self, data: bytes) -> bytes:
+        return self._c.process(data) + self._c.finish()
+
+
+class _ZstdEncoder(_Encoder):
+    def __init__(self, level: int) -> None:
+        self._c = zstandard.ZstdCompressor(level=level).compressobj()
+
+    def compress(self, data: bytes) -> bytes:
+        return self._c.compress(data) + self._c.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+
+    def finish(self, data: bytes) -> bytes:
+        return self._c.compress(data) + self._c.flush(zstandard.COMPRESSOBJ_FLUSH_FINISH)
+
+
+def available_encodings() -> list[str]:
+    """Content codings this process can produce."""
+    names = ["gzip"]
+    if brotli is not None:
+        names.append("br")
+    if zstandard is not None:
+        names.append("zstd")
+    return names
+
+
+def _parse_accept_encoding(header: str) -> dict[str, float]:
+    accepted: dict[str, float] = {}
+    for item in header.split(","):
+        name, _, params = item.strip().partition(";")
+        name = name.strip().lower()
+        if not name:
+            continue
+        q = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key.strip().lower() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        accepted[name] = q
+    return accepted
+
+
+def negotiate_encoding(header: str | None, preferred: Iterable[str]) -> str | None:
+    """Pick the first of `preferred` the client accepts (q > 0), or None for identity.
+
+    The server's order wins among acceptable codings; client q-values only rule
+    codings in or out, which is what browsers expect in practice.
+    """
+    if not header:
+        return None
+    accepted = _parse_accept_encoding(header)
+    wildcard = accepted.get("*", 0.0)
+    for name in preferred:
+        if accepted.get(name, wildcard) > 0:
+            return name
+    return None
+
+
+class CompressionMiddleware:
+    """Compress responses with zstd, brotli or gzip, per the client's Accept-Encoding.
+
+    Only bodies of at least `minimum_size` bytes whose media type matches
+    `content_types` (entries ending in "/" match a whole family, e.g. "text/") are
+    compressed. Streaming responses are compressed chunk by chunk. Responses that
+    already carry a Content-Encoding, or are partial (206), pass through untouched.
+
+    ETags are left as-is (as Starlette's GZipMiddleware does) so If-Match keeps
+    working against them; `Vary: Accept-Encoding` keeps shared caches apart.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        *,
+        minimum_size: int = 1024,
+        encodings: Iterable[str] = ("zstd", "br", "gzip"),
+        content_types: Iterable[str] = ("application/json",),
+        gzip_level: int = 6,
+        brotli_quality: int = 4,
+        zstd_level: int = 3,
+    ) -> None:
+        self.app = app
+        self.minimum_size = minimum_size
+        supported = set(available_encodings())
+        self.encodings = [e for e in (e.strip().lower() for e in encodings) if e in supported]
+        self.content_types = tuple(t.strip().lower() for t in content_types if t.strip())
+        self._factories: dict[str, Callable[[], _Encoder]] = {
+            "gzip": lambda: _GzipEncoder(gzip_level),
+            "br": lambda: _BrotliEncoder(brotli_quality),
+            "zstd": lambda: _ZstdEncoder(zstd_level),
+        }
+        # Clients send only a handful of distinct Accept-Encoding values.
+        self._negotiate = functools.lru_cache(maxsize=64)(
+            lambda header: negotiate_encoding(header, self.encodings)
+        )
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not self.encodings:
+            await self.app(scope, receive, send)
+            return
+
+        encoding = self._negotiate(Headers(scope=scope).get("accept-encoding"))
+        responder = _Responder(self, encoding, send)
+        await self.app(scope, receive, responder.send)
+
+    def compressible(self, media_type: str) -> bool:
+        return any(
+            media_type.startswith(t) if t.endswith("/") else media_type == t for t in self.content_types
+        )
+
+
+def _shorter_than(content_length: str | None, size: int) -> bool:
+    # Most JSON responses declare their length up front; small ones are sent
+    # as-is without holding back the start message (or adding Vary).
+    try:
+        return content_length is not None and int(content_length) < size
+    except ValueError:
+        return False
+
+
+class _Responder:
+    def __init__(self, middleware: CompressionMiddleware, encoding: str | None, send: Send) -> None:
+        self.mw = middleware
+        self.encoding = encoding
+        self._send = send
+        self.start: Message | None = None
+        self.encoder: _Encoder | None = None
+        self.passthrough = False
+
+    async def send(self, message: Message) -> None:
+        kind = message["type"]
+        if kind == "http.response.start":
+            # Hold the start message until the first body chunk shows how big it is.
+            headers = Headers(raw=message["headers"])
+            media_type = headers.get("content-type", "").partition(";")[0].strip().lower()
+            self.passthrough = (
+                "content-encoding" in headers
+                or message["status"] == 206
+                or _shorter_than(headers.get("content-length"), self.mw.minimum_size)
+                or not self.mw.compressible(media_type)
+            )
+            if not self.passthrough:
+                # The representation depends on Accept-Encoding even when we end up
+                # sending it uncompressed.
+                MutableHeaders(raw=message["headers"]).add_vary_header("Accept-Encoding")
+                self.passthrough = self.encoding is None
+            if self.passthrough:
+                await self._send(message)
+            else:
+                self.start = message
+            return
+
+        if kind != "http.response.body" or self.passthrough:
+            if self.start is not None:
+                await self._send(self.start)
+                self.start = None
+            await self._send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if self.start is not None:
+            start, self.start = self.start, None
+            headers = MutableHeaders(raw=start["headers"])
+            if not more_body and len(body) < self.mw.minimum_size:
+                self.passthrough = True
+                await self._send(start)
+                await self._send(message)
+                return
+
+            assert self.encoding is not None
+            self.encoder = self.mw._factories[self.encoding]()
+            headers["Content-Encoding"] = self.encoding
+            if more_body:
+                del headers["Content-Length"]
+            body = await self._encode(body, last=not more_body)
+            if not more_body:
+                headers["Content-Length"] = str(len(body))
+            await self._send(start)
+            await self._send({**message, "body": body})
+            return
+
+        await self._send({**message, "body": await self._encode(body, last=not more_body)})
+
+    async def _encode(self, body: bytes, *, last: bool) -> bytes:
+        assert self.encoder is not None
+        fn = self.encoder.finish if last else self.encoder.compress
+        if len(body) >= _THREAD_MIN_SIZE:
+            return await anyio.to_thread.run_sync(fn, body)
+        return fn(body)
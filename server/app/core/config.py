@@ -20,14 +20,133 @@ class Settings(BaseSettings):
     # Google Identity / OAuth
     google_client_id: str | None = None
     google_client_secret: str | None = None
+    # Overridable so tests and local development can point at a stub server.
+    google_certs_url: str = "https://www.googleapis.com/oauth2/v1/certs"
+    google_token_url: str = "https://oauth2.googleapis.com/token"
+    google_http_timeout_seconds: float = 10.0
 
     # App-issued token signing (for simple session auth)
     secret_key: str = "dev-secret-change-me"
     access_token_expires_minutes: int = 60 * 24 * 7
 
+    # Server processes sharing the database (gunicorn.conf.py and `app.cli serve`
+    # export it to their workers; set it yourself for `uvicorn --workers N`). With
+    # more than one, per-process state that must be shared is switched off or split.
+    web_concurrency: int | None = None
+
+    # Password hashing process pool. Workers default to the CPU count split across
+    # server processes; requests beyond `password_hash_max_pending` queued/running
+    # hashes get a 503.
+    password_hash_workers: int | None = None
+    password_hash_max_pending: int = 64
+
+    # Token-bucket limits for /auth/login, /auth/signup and Google sign-in (see
+    # app/core/ratelimit.py), as "<count>/<second|minute|hour>"; empty disables one.
+    # Buckets are per process. Behind a proxy, run uvicorn with --proxy-headers so
+    # the client IP is the real one.
+    rate_limit_enabled: bool = True
+    rate_limit_auth_per_ip: str = "20/minute"
+    rate_limit_auth_per_email: str = "10/minute"
+    rate_limit_auth_per_route: str = "600/minute"
+    rate_limit_max_keys: int = 100_000
+    # Concurrent auth requests admitted at once; more get 429 immediately (0 = no cap).
+    auth_max_concurrent: int = 32
+
+    # In-process auth caches (see app/core/cache.py). Set max entries to 0 to disable.
+    user_cache_ttl_seconds: float = 60.0
+    user_cache_max_entries: int = 10_000
+    token_cache_max_entries: int = 10_000
+
+    # Write-behind buffer for `PUT /user-data/{key}` (see app/db/write_behind.py), used
+    # only when `web_concurrency` is 1. Buffered values are flushed after `debounce`
+    # seconds without a write, at most `max_delay` seconds after the first, or when
+    # `max_pending` keys are waiting.
+    user_data_write_behind: bool = True
+    user_data_write_debounce_seconds: float = 0.25
+    user_data_write_max_delay_seconds: float = 2.0
+    user_data_write_max_pending: int = 500
+
+    # GET /user-data/stream (Server-Sent Events, see app/core/pubsub.py). Streams are
+    # per process: they only hear about writes handled by the same worker. A stream
+    # ends after `max_age` seconds and the client reconnects, which also bounds how
+    # long a graceful shutdown waits for open streams.
+    user_data_stream_heartbeat_seconds: float = 15.0
+    user_data_stream_max_age_seconds: float = 300.0
+    user_data_stream_queue_size: int = 64
+    user_data_stream_max_per_user: int = 10
+    user_data_stream_max_connections: int = 10_000
+    # Lifetime of the ticket from `POST /user-data/stream-ticket` that opens a stream.
+    user_data_stream_ticket_seconds: int = 60
+
+    # Instrumentation (see app/core/metrics.py). `metrics_enabled` records per-route
+    # histograms and serves them at /metrics (once `metrics_token` is set); the others
+    # switch individual surfaces.
+    metrics_enabled: bool = True
+    metrics_db_queries: bool = True
+    metrics_pool_wait: bool = True
+    server_timing_header: bool = True
+    # Bearer token for /metrics and the /api/v1/health/* counters. While unset those
+    # endpoints aren't served at all; plain /health always is.
+    metrics_token: str | None = None
+
     # SQLite file path (relative to `server/` by default)
     sqlite_path: str = "./app.db"
 
+    # Blob store for uploads such as avatars (relative to `server/` by default).
+    blob_dir: str = "./blobs"
+    blob_max_bytes: int = 5 * 1024 * 1024
+    # Width x height limit for uploaded images; a small file can declare a huge canvas.
+    blob_max_image_pixels: int = 50_000_000
+    # Comma-separated widths (px) that `GET /blobs/{id}?w=` may request.
+    blob_thumbnail_widths: str = "64,128,256"
+
+    # SQLite tuning profile, applied to every new connection (see app/db/session.py).
+    # WAL lets readers proceed while one writer commits; synchronous=NORMAL is durable
+    # across app crashes in WAL mode and skips an fsync per commit.
+    sqlite_journal_mode: str = "WAL"
+    sqlite_synchronous: str = "NORMAL"
+    sqlite_cache_size: int = -20_000  # negative = KiB, i.e. ~20 MB page cache per connection
+    sqlite_mmap_size: int = 256 * 1024 * 1024
+    sqlite_temp_store: str = "MEMORY"
+    sqlite_busy_timeout_ms: int = 5_000
+
+    # Connection pool. WAL allows many concurrent readers, so keep enough connections
+    # around for them; writers still serialize on SQLite's single write lock.
+    sqlite_pool_size: int = 10
+    sqlite_max_overflow: int = 10
+    sqlite_pool_timeout: float = 30.0
+
+    # Response compression (see app/core/compression.py). Encodings are tried in this
+    # order; "br" and "zstd" are used only when `brotli` / `zstandard` are installed.
+    compression_enabled: bool = True
+    compression_min_size: int = 1024
+    compression_encodings: str = "zstd,br,gzip"
+    # Comma-separated media types; entries ending in "/" match a family (e.g. "text/").
+    compression_content_types: str = "application/json,application/x-ndjson,text/html,text/plain,text/css,text/javascript"
+    compression_gzip_level: int = 6
+    compression_brotli_quality: int = 4
+    compression_zstd_level: int = 3
+
+    @property
+    def worker_processes(self) -> int:
+        return max(1, self.web_concurrency or 1)
+
+    @property
+    def metrics_served(self) -> bool:
+        return self.metrics_enabled and bool(self.metrics_token)
+
+    @property
+    def compression_encodings_list(self) -> List[str]:
+        return [p.strip() for p in self.compression_encodings.split(",") if p.strip()]
+
+    @property
+    def compression_content_types_list(self) -> List[str]:
+        return [p.strip() for p in self.compression_content_types.split(",") if p.strip()]
+
+    @property
+    def blob_thumbnail_widths_list(self) -> List[int]:
+        return [int(p) for p in self.blob_thumbnail_widths.split(",") if p.strip()]
+
     @property
     def cors_origins_list(self) -> List[str]:
         value = self.cors_origins
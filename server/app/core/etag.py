@@ -0,0 +1,55 @@
+from __future__ import annotations
+
+import hashlib
+
+from fastapi import Response
+
+
+# Responses carrying an ETag may be stored by the browser (private) but must be
+# revalidated every time; the revalidation is the cheap If-None-Match round trip.
+REVALIDATE = "private, no-cache"
+
+
+def etag_from_parts(*parts: object) -> str:
+    """Strong ETag from values that together identify a representation."""
+    digest = hashlib.blake2b(repr(parts).encode("utf-8"), digest_size=16).hexdigest()
+    return f'"{digest}"'
+
+
+def _tags(header: str) -> list[str]:
+    return [t.strip() for t in header.split(",") if t.strip()]
+
+
+def if_none_match_hits(header: str | None, etag: str) -> bool:
+    """True if an If-None-Match header matches `etag` (weak comparison, RFC 9110)."""
+    if not header:
+        return False
+    bare = etag.removeprefix("W/")
+    for tag in _tags(header):
+        if tag == "*" or tag.removeprefix("W/") == bare:
+            return True
+    return False
+
+
+def if_match_allows(header: str | None, etag: str | None) -> bool:
+    """True if an If-Match header is satisfied (strong comparison, RFC 9110).
+
+    `etag` is None when the resource does not exist, which only `*` can't match.
+    """
+    if header is None:
+        return True
+    if etag is None:
+        return False
+    for tag in _tags(header):
+        if tag == "*" or (not tag.startswith("W/") and tag == etag):
+            return True
+    return False
+
+
+def not_modified(etag: str) -> Response:
+    return Response(status_code=304, headers={"ETag": etag, "Cache-Control": REVALIDATE})
+
+
+def set_etag(response: Response, etag: str) -> None:
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = REVALIDATE
@@ -0,0 +1,51 @@
+from __future__ import annotations
+
+import os
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None
+    import msvcrt
+
+
+@contextmanager
+def file_lock(path: str | Path) -> Iterator[None]:
+    """Exclusive advisory lock on `path` (created if missing), held across processes.
+
+    Blocks until the lock is free. The OS drops it if the holder dies, so a
+    crashed process never leaves a stale lock behind.
+    """
+    with open(path, "a+b") as fh:
+        if fcntl is not None:
+            fcntl.flock(fh.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(fh.fileno(), fcntl.LOCK_UN)
+            return
+
+        fh.seek(0)
+        while True:
+            try:
+                # Locks the first byte; a byte past EOF is fine on Windows.
+                msvcrt.locking(fh.fileno(), msvcrt.LK_NBLCK, 1)
+                break
+            except OSError:
+                time.sleep(0.05)
+        try:
+            yield
+        finally:
+            fh.seek(0)
+            msvcrt.locking(fh.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def lock_path_for(database: str | None, suffix: str) -> Path | None:
+    """Sidecar lock file next to a SQLite database, or None for in-memory databases."""
+    if not database or database == ":memory:" or database.startswith("file::memory:"):
+        return None
+    return Path(os.path.abspath(database + suffix))
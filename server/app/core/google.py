@@ -0,0 +1,194 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import re
+import time
+from base64 import urlsafe_b64decode
+
+import httpx
+from google.auth import jwt as google_jwt
+
+from app.core.config import settings
+
+
+GOOGLE_ISSUERS = ("accounts.google.com", "https://accounts.google.com")
+
+_MAX_AGE = re.compile(r"(?:^|,)\s*max-age\s*=\s*(\d+)", re.IGNORECASE)
+
+
+class InvalidGoogleToken(ValueError):
+    """The ID token or authorization code was rejected."""
+
+
+class GoogleUnavailableError(RuntimeError):
+    """Google's endpoints could not be reached or answered with an error."""
+
+
+def _cache_seconds(headers: httpx.Headers, default: float) -> float:
+    match = _MAX_AGE.search(headers.get("cache-control", ""))
+    if match is None:
+        return default
+    age = float(headers.get("age", "0") or 0)
+    return max(0.0, float(match.group(1)) - age)
+
+
+def _token_kid(token: str) -> str | None:
+    try:
+        header_b64 = token.split(".", 1)[0]
+        header = json.loads(urlsafe_b64decode(header_b64 + "=" * (-len(header_b64) % 4)))
+    except (ValueError, IndexError):
+        return None
+    kid = header.get("kid") if isinstance(header, dict) else None
+    return kid if isinstance(kid, str) else None
+
+
+class GoogleTokenVerifier:
+    """Verifies Google ID tokens and exchanges authorization codes.
+
+    Owns one pooled `httpx.AsyncClient`, so cert fetches and code exchanges reuse
+    connections. Signing certs are cached for their `Cache-Control: max-age`
+    (Google serves several hours) and refreshed by a single request when they
+    expire; a token signed with an unknown key id triggers one early refresh,
+    which covers key rotation. Signature checks are local and don't block.
+
+    URLs and the transport are injectable so tests can point it at a stub.
+    """
+
+    def __init__(
+        self,
+        *,
+        client_id: str | None,
+        client_secret: str | None = None,
+        certs_url: str,
+        token_url: str,
+        timeout_seconds: float = 10.0,
+        default_cache_seconds: float = 300.0,
+        min_refresh_interval_seconds: float = 30.0,
+        clock_skew_seconds: int = 10,
+        transport: httpx.AsyncBaseTransport | None = None,
+    ) -> None:
+        self.client_id = client_id
+        self.client_secret = client_secret
+        self.certs_url = certs_url
+        self.token_url = token_url
+        self.timeout_seconds = timeout_seconds
+        self.default_cache_seconds = default_cache_seconds
+        self.min_refresh_interval_seconds = min_refresh_interval_seconds
+        self.clock_skew_seconds = clock_skew_seconds
+        self._transport = transport
+        self._client: httpx.AsyncClient | None = None
+        self._certs: dict[str, str] = {}
+        self._certs_expire_at = 0.0
+        self._certs_fetched_at = 0.0
+        self._lock: asyncio.Lock | None = None
+        self.cert_fetches = 0
+
+    def _http(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                timeout=self.timeout_seconds,
+                transport=self._transport,
+                limits=httpx.Limits(max_connections=20, max_keepalive_connections=10),
+            )
+        return self._client
+
+    async def close(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def _fetch_certs(self) -> None:
+        try:
+            resp = await self._http().get(self.certs_url)
+            resp.raise_for_status()
+            certs = resp.json()
+        except (httpx.HTTPError, ValueError) as e:
+            raise GoogleUnavailableError("Failed to fetch Google signing certificates") from e
+        if not isinstance(certs, dict) or not certs:
+            raise GoogleUnavailableError("Unexpected Google certificate response")
+        now = time.monotonic()
+        self._certs = certs
+        self._certs_fetched_at = now
+        self._certs_expire_at = now + _cache_seconds(resp.headers, self.default_cache_seconds)
+        self.cert_fetches += 1
+
+    async def _get_certs(self, kid: str | None) -> dict[str, str]:
+        def fresh() -> bool:
+            if time.monotonic() >= self._certs_expire_at:
+                return False
+            if kid is not None and kid not in self._certs:
+                # Unknown key: refetch, but not more often than the floor allows.
+                return time.monotonic() - self._certs_fetched_at < self.min_refresh_interval_seconds
+            return True
+
+        if fresh():
+            return self._certs
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            # Concurrent logins share one fetch.
+            if not fresh():
+                await self._fetch_certs()
+        return self._certs
+
+    async def verify(self, credential: str) -> dict:
+        """Verify a Google ID token (signature, audience, expiry, issuer); returns its claims."""
+        if not self.client_id:
+            raise RuntimeError("GOOGLE_CLIENT_ID not configured")
+        certs = await self._get_certs(_token_kid(credential))
+        try:
+            info = google_jwt.decode(
+                credential,
+                certs=certs,
+                audience=self.client_id,
+                clock_skew_in_seconds=self.clock_skew_seconds,
+            )
+        except Exception as e:
+            raise InvalidGoogleToken("Invalid Google credential") from e
+
+        if info.get("iss") not in GOOGLE_ISSUERS:
+            raise InvalidGoogleToken("Invalid token issuer")
+        if not info.get("sub"):
+            raise InvalidGoogleToken("Invalid token subject")
+        return info
+
+    async def exchange_code(self, code: str, redirect_uri: str) -> str:
+        """Exchange an OAuth authorization code; returns the ID token from the response."""
+        if not self.client_id:
+            raise RuntimeError("GOOGLE_CLIENT_ID not configured")
+        if not self.client_secret:
+            raise RuntimeError("GOOGLE_CLIENT_SECRET not configured")
+        try:
+            resp = await self._http().post(
+                self.token_url,
+                data={
+                    "code": code,
+                    "client_id": self.client_id,
+                    "client_secret": self.client_secret,
+                    "redirect_uri": redirect_uri,
+                    "grant_type": "authorization_code",
+                },
+            )
+        except httpx.HTTPError as e:
+            raise GoogleUnavailableError("Failed to contact Google token endpoint") from e
+
+        if resp.status_code != 200:
+            raise InvalidGoogleToken("Google code exchange failed")
+        try:
+            body = resp.json()
+        except ValueError:
+            body = None
+        token = body.get("id_token") if isinstance(body, dict) else None
+        if not token:
+            raise InvalidGoogleToken("Google response missing id_token")
+        return token
+
+
+google_verifier = GoogleTokenVerifier(
+    client_id=settings.google_client_id,
+    client_secret=settings.google_client_secret,
+    certs_url=settings.google_certs_url,
+    token_url=settings.google_token_url,
+    timeout_seconds=settings.google_http_timeout_seconds,
+)
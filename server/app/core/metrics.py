@@ -0,0 +1,282 @@
+from __future__ import annotations
+
+import bisect
+import contextvars
+import re
+import threading
+import time
+from contextlib import contextmanager
+from typing import Iterator
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+
+# Seconds. Covers sub-ms cache hits up to multi-second login bursts.
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 34)
+
+
+def _format_labels(names: tuple[str, ...], values: tuple[str, ...], extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class Counter:
+    def __init__(self, name: str, help: str, *, labelnames: tuple[str, ...] = ()) -> None:
+        self.name = name
+        self.help = help
+        self.labelnames = labelnames
+        self._values: dict[tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            items = sorted(self._values.items())
+        for labels, value in items:
+            lines.append(f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}")
+        return lines
+
+
+class Histogram:
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        *,
+        labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = LATENCY_BUCKETS,
+    ) -> None:
+        self.name = name
+        self.help = help
+        self.labelnames = labelnames
+        self.buckets = tuple(sorted(buckets))
+        # labels -> (per-bucket counts, +Inf count at the end; sum)
+        self._series: dict[tuple[str, ...], tuple[list[int], list[float]]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labels: str) -> None:
+        idx = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = ([0] * (len(self.buckets) + 1), [0.0])
+            series[0][idx] += 1
+            series[1][0] += value
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            items = sorted((labels, (list(c), s[0])) for labels, (c, s) in self._series.items())
+        for labels, (counts, total) in items:
+            cumulative = 0
+            for bound, count in zip((*self.buckets, float("inf")), counts):
+                cumulative += count
+                le = _format_labels(self.labelnames, labels, f'le="{_format_value(bound)}"')
+                lines.append(f"{self.name}_bucket{le} {cumulative}")
+            plain = _format_labels(self.labelnames, labels)
+            lines.append(f"{self.name}_sum{plain} {_format_value(total)}")
+            lines.append(f"{self.name}_count{plain} {cumulative}")
+        return lines
+
+
+http_requests = Counter(
+    "studybuddy_http_requests_total", "HTTP requests by route and status.", labelnames=("method", "route", "status")
+)
+http_duration = Histogram(
+    "studybuddy_http_request_duration_seconds", "Time to first response byte.", labelnames=("method", "route")
+)
+http_db_queries = Histogram(
+    "studybuddy_http_request_db_queries",
+    "SQL statements executed per request.",
+    labelnames=("method", "route"),
+    buckets=QUERY_COUNT_BUCKETS,
+)
+http_db_time = Histogram(
+    "studybuddy_http_request_db_seconds", "Time spent in SQL statements per request.", labelnames=("method", "route")
+)
+db_query_duration = Histogram("studybuddy_db_query_duration_seconds", "Duration of single SQL statements.")
+db_pool_wait = Histogram(
+    "studybuddy_db_pool_checkout_wait_seconds", "Time waiting for a pooled connection.", labelnames=("engine",)
+)
+
+rejected_requests = Counter(
+    "studybuddy_rejected_requests_total",
+    "Requests turned away by rate limits or admission control.",
+    labelnames=("route", "reason"),
+)
+
+REGISTRY = (
+    http_requests,
+    http_duration,
+    http_db_queries,
+    http_db_time,
+    db_query_duration,
+    db_pool_wait,
+    rejected_requests,
+)
+
+
+def render_metrics() -> str:
+    """All metrics in the Prometheus text exposition format (0.0.4)."""
+    lines: list[str] = []
+    for metric in REGISTRY:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+class RequestTimings:
+    """Per-request breakdown collected while a request is being served."""
+
+    __slots__ = ("db_queries", "db_seconds", "pool_wait_seconds", "spans")
+
+    def __init__(self) -> None:
+        self.db_queries = 0
+        self.db_seconds = 0.0
+        self.pool_wait_seconds = 0.0
+        self.spans: dict[str, float] = {}
+
+
+_current: contextvars.ContextVar[RequestTimings | None] = contextvars.ContextVar("request_timings", default=None)
+
+
+def current_timings() -> RequestTimings | None:
+    return _current.get()
+
+
+@contextmanager
+def span(name: str) -> Iterator[None]:
+    """Add the time spent in the block to the current request's `name` span."""
+    timings = _current.get()
+    if timings is None:
+        yield
+        return
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings.spans[name] = timings.spans.get(name, 0.0) + (time.perf_counter() - t0)
+
+
+def record_query(seconds: float) -> None:
+    db_query_duration.observe(seconds)
+    timings = _current.get()
+    if timings is not None:
+        timings.db_queries += 1
+        timings.db_seconds += seconds
+
+
+def record_pool_wait(engine: str, seconds: float) -> None:
+    db_pool_wait.observe(seconds, engine)
+    timings = _current.get()
+    if timings is not None:
+        timings.pool_wait_seconds += seconds
+
+
+def server_timing(timings: RequestTimings, total_seconds: float) -> str:
+    parts = [f"app;dur={total_seconds * 1000:.1f}"]
+    if timings.db_queries:
+        parts.append(f'db;dur={timings.db_seconds * 1000:.1f};desc="{timings.db_queries} queries"')
+    if timings.pool_wait_seconds:
+        parts.append(f"pool;dur={timings.pool_wait_seconds * 1000:.1f}")
+    for name, seconds in timings.spans.items():
+        parts.append(f"{name};dur={seconds * 1000:.1f}")
+    return ", ".join(parts)
+
+
+_PARAM = re.compile(r"{(\w+)(?::\w+)?}")
+
+
+def route_label(scope: Scope) -> str:
+    """Path template of the matched route, e.g. `/api/v1/user-data/{key}`.
+
+    Routes from included routers may carry only their own part of the template,
+    so the matched prefix is recovered from the concrete path.
+    """
+    route = scope.get("route")
+    template = getattr(route, "path", None)
+    if not template:
+        return "<unmatched>"
+    params = scope.get("path_params", {})
+    rendered = _PARAM.sub(lambda m: str(params.get(m.group(1), m.group(0))), template)
+    path = scope.get("path", "")
+    if rendered and path.endswith(rendered):
+        return path[: len(path) - len(rendered)] + template
+    return template
+
+
+class MetricsMiddleware:
+    """Per-route latency/DB histograms and an optional `Server-Timing` header.
+
+    Routes are labelled by their path template (e.g. `/api/v1/user-data/{key}`),
+    so label cardinality stays bounded. Timings stop at the first response byte.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        *,
+        record: bool = True,
+        server_timing_header: bool = True,
+        timing_allow_origins: list[str] | None = None,
+    ) -> None:
+        self.app = app
+        self.record = record
+        self.server_timing_header = server_timing_header
+        self.timing_allow_origins = set(timing_allow_origins or [])
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timings = RequestTimings()
+        token = _current.set(timings)
+        start = time.perf_counter()
+        status = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                elapsed = time.perf_counter() - start
+                if self.server_timing_header:
+                    headers = MutableHeaders(raw=message["headers"])
+                    headers.append("Server-Timing", server_timing(timings, elapsed))
+                    origin = Headers(scope=scope).get("origin")
+                    if origin and origin in self.timing_allow_origins:
+                        # Lets browser code on our own front-end read the breakdown.
+                        headers.append("Timing-Allow-Origin", origin)
+                if self.record:
+                    self._observe(scope, status, elapsed, timings)
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _current.reset(token)
+
+    def _observe(self, scope: Scope, status: int, elapsed: float, timings: RequestTimings) -> None:
+        path = route_label(scope)
+        method = scope.get("method", "")
+        http_requests.inc(method, path, str(status))
+        http_duration.observe(elapsed, method, path)
+        http_db_queries.observe(timings.db_queries, method, path)
+        http_db_time.observe(timings.db_seconds, method, path)
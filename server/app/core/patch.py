@@ -0,0 +1,155 @@
+from __future__ import annotations
+
+import copy
+from typing import Any
+
+
+class PatchError(ValueError):
+    """A patch document is malformed or cannot be applied to the target."""
+
+
+def _parse_pointer(pointer: str) -> list[str]:
+    # RFC 6901: "" is the whole document; otherwise "/"-separated, with ~1 -> "/" and ~0 -> "~".
+    if pointer == "":
+        return []
+    if not isinstance(pointer, str) or not pointer.startswith("/"):
+        raise PatchError(f"Invalid JSON pointer: {pointer!r}")
+    return [part.replace("~1", "/").replace("~0", "~") for part in pointer[1:].split("/")]
+
+
+def _array_index(container: list, token: str, *, allow_end: bool) -> int:
+    if allow_end and token == "-":
+        return len(container)
+    if not token.isdigit() or (token.startswith("0") and token != "0"):
+        raise PatchError(f"Invalid array index: {token!r}")
+    index = int(token)
+    limit = len(container) if allow_end else len(container) - 1
+    if index > limit:
+        raise PatchError(f"Array index out of range: {index}")
+    return index
+
+
+def _resolve_parent(doc: Any, parts: list[str]) -> tuple[Any, str]:
+    target = doc
+    for token in parts[:-1]:
+        if isinstance(target, dict):
+            if token not in target:
+                raise PatchError(f"Path not found: {token!r}")
+            target = target[token]
+        elif isinstance(target, list):
+            target = target[_array_index(target, token, allow_end=False)]
+        else:
+            raise PatchError(f"Cannot traverse into {type(target).__name__}")
+    return target, parts[-1]
+
+
+def _get(doc: Any, parts: list[str]) -> Any:
+    if not parts:
+        return doc
+    parent, token = _resolve_parent(doc, parts)
+    if isinstance(parent, dict):
+        if token not in parent:
+            raise PatchError(f"Path not found: {token!r}")
+        return parent[token]
+    if isinstance(parent, list):
+        return parent[_array_index(parent, token, allow_end=False)]
+    raise PatchError(f"Cannot traverse into {type(parent).__name__}")
+
+
+def _add(doc: Any, parts: list[str], value: Any) -> Any:
+    if not parts:
+        return value
+    parent, token = _resolve_parent(doc, parts)
+    if isinstance(parent, dict):
+        parent[token] = value
+    elif isinstance(parent, list):
+        parent.insert(_array_index(parent, token, allow_end=True), value)
+    else:
+        raise PatchError(f"Cannot add into {type(parent).__name__}")
+    return doc
+
+
+def _remove(doc: Any, parts: list[str]) -> tuple[Any, Any]:
+    if not parts:
+        raise PatchError("Cannot remove the document root")
+    parent, token = _resolve_parent(doc, parts)
+    if isinstance(parent, dict):
+        if token not in parent:
+            raise PatchError(f"Path not found: {token!r}")
+        return doc, parent.pop(token)
+    if isinstance(parent, list):
+        return doc, parent.pop(_array_index(parent, token, allow_end=False))
+    raise PatchError(f"Cannot remove from {type(parent).__name__}")
+
+
+def _json_equal(a: Any, b: Any) -> bool:
+    # Python's == has True == 1. JSON booleans aren't numbers, but 1 and 1.0 are the same number.
+    if isinstance(a, bool) or isinstance(b, bool):
+        return type(a) is type(b) and a == b
+    if isinstance(a, (int, float)) and isinstance(b, (int, float)):
+        return a == b
+    if type(a) is not type(b):
+        return False
+    if isinstance(a, dict):
+        return a.keys() == b.keys() and all(_json_equal(value, b[key]) for key, value in a.items())
+    if isinstance(a, list):
+        return len(a) == len(b) and all(_json_equal(x, y) for x, y in zip(a, b))
+    return a == b
+
+
+def apply_json_patch(doc: Any, operations: Any) -> Any:
+    """Apply an RFC 6902 JSON Patch and return the new document.
+
+    Operations apply in order to a working copy; if any fails (including a failed
+    `test`) a `PatchError` is raised and the input is left untouched.
+    """
+    if not isinstance(operations, list):
+        raise PatchError("JSON Patch must be an array of operations")
+    doc = copy.deepcopy(doc)
+    for op in operations:
+        if not isinstance(op, dict) or "op" not in op or "path" not in op:
+            raise PatchError("Each operation needs 'op' and 'path'")
+        kind = op["op"]
+        path = _parse_pointer(op["path"])
+        if kind in ("add", "replace", "test") and "value" not in op:
+            raise PatchError(f"'{kind}' requires 'value'")
+
+        if kind == "add":
+            doc = _add(doc, path, copy.deepcopy(op["value"]))
+        elif kind == "remove":
+            doc, _ = _remove(doc, path)
+        elif kind == "replace":
+            _get(doc, path)  # must exist
+            if path:
+                doc, _ = _remove(doc, path)
+            doc = _add(doc, path, copy.deepcopy(op["value"]))
+        elif kind in ("move", "copy"):
+            if "from" not in op:
+                raise PatchError(f"'{kind}' requires 'from'")
+            source = _parse_pointer(op["from"])
+            if kind == "move":
+                if path[: len(source)] == source and path != source:
+                    raise PatchError("Cannot move a value into one of its children")
+                doc, value = _remove(doc, source)
+            else:
+                value = copy.deepcopy(_get(doc, source))
+            doc = _add(doc, path, value)
+        elif kind == "test":
+            if not _json_equal(_get(doc, path), op["value"]):
+                raise PatchError(f"Test failed at {op['path']!r}")
+        else:
+            raise PatchError(f"Unknown operation: {kind!r}")
+    return doc
+
+
+def apply_merge_patch(target: Any, patch: Any) -> Any:
+    """Apply an RFC 7396 JSON Merge Patch and return the new document."""
+    if not isinstance(patch, dict):
+        return copy.deepcopy(patch)
+    result = copy.deepcopy(target) if isinstance(target, dict) else {}
+    for name, value in patch.items():
+        if value is None:
+            result.pop(name, None)
+        else:
+            result[name] = apply_merge_patch(result.get(name), value)
+    return result
@@ -0,0 +1,102 @@
+from __future__ import annotations
+
+import asyncio
+import dataclasses
+from datetime import datetime
+
+from app.core.config import settings
+
+
+@dataclasses.dataclass(frozen=True)
+class Change:
+    key: str
+    version: int
+    updated_at: datetime | None
+
+
+# Queued in place of the dropped events when a subscriber falls behind.
+RESYNC = Change(key="", version=0, updated_at=None)
+
+
+class StreamLimitError(RuntimeError):
+    def __init__(self, message: str, *, per_user: bool) -> None:
+        super().__init__(message)
+        self.per_user = per_user
+
+
+class Subscription:
+    __slots__ = ("user_id", "queue")
+
+    def __init__(self, user_id: int, maxsize: int) -> None:
+        self.user_id = user_id
+        self.queue: asyncio.Queue[Change] = asyncio.Queue(maxsize=maxsize)
+
+
+class ChangeHub:
+    """In-process fan-out of user-data change notifications.
+
+    Each subscriber gets a bounded queue. `publish` never blocks: a subscriber
+    whose queue is full loses its backlog and receives `RESYNC` instead, telling
+    the client to refetch. An idle subscriber costs one small queue, so thousands
+    of open streams are cheap. Only writes handled by this process are seen.
+    """
+
+    def __init__(self, *, queue_size: int, max_per_user: int, max_connections: int) -> None:
+        self.queue_size = max(1, queue_size)
+        self.max_per_user = max_per_user
+        self.max_connections = max_connections
+        self._subscribers: dict[int, set[Subscription]] = {}
+        self._count = 0
+        self.published = 0
+        self.resyncs = 0
+
+    def stats(self) -> dict:
+        return {
+            "connections": self._count,
+            "users": len(self._subscribers),
+            "published": self.published,
+            "resyncs": self.resyncs,
+        }
+
+    def check_capacity(self, user_id: int) -> None:
+        """Raise `StreamLimitError` if another stream for this user would exceed a cap."""
+        if self.max_connections > 0 and self._count >= self.max_connections:
+            raise StreamLimitError("Too many open streams", per_user=False)
+        if self.max_per_user > 0 and len(self._subscribers.get(user_id, ())) >= self.max_per_user:
+            raise StreamLimitError("Too many open streams for this user", per_user=True)
+
+    def subscribe(self, user_id: int) -> Subscription:
+        sub = Subscription(user_id, self.queue_size)
+        self._subscribers.setdefault(user_id, set()).add(sub)
+        self._count += 1
+        return sub
+
+    def unsubscribe(self, sub: Subscription) -> None:
+        subs = self._subscribers.get(sub.user_id)
+        if subs is None or sub not in subs:
+            return
+        subs.discard(sub)
+        self._count -= 1
+        if not subs:
+            del self._subscribers[sub.user_id]
+
+    def publish(self, user_id: int, change: Change) -> None:
+        subs = self._subscribers.get(user_id)
+        if not subs:
+            return
+        self.published += 1
+        for sub in subs:
+            try:
+                sub.queue.put_nowait(change)
+            except asyncio.QueueFull:
+                while not sub.queue.empty():
+                    sub.queue.get_nowait()
+                sub.queue.put_nowait(RESYNC)
+                self.resyncs += 1
+
+
+user_data_hub = ChangeHub(
+    queue_size=settings.user_data_stream_queue_size,
+    max_per_user=settings.user_data_stream_max_per_user,
+    max_connections=settings.user_data_stream_max_connections,
+)
@@ -0,0 +1,178 @@
+from __future__ import annotations
+
+import abc
+import re
+import time
+from collections import OrderedDict
+from collections.abc import Sequence
+from dataclasses import dataclass
+
+from app.core.config import settings
+
+
+_RATE = re.compile(r"^\s*(\d+)\s*/\s*(second|minute|hour)\s*$", re.IGNORECASE)
+_PERIODS = {"second": 1.0, "minute": 60.0, "hour": 3600.0}
+
+
+@dataclass(frozen=True)
+class Rate:
+    """A token bucket: `capacity` requests at once, refilled evenly over `period` seconds."""
+
+    capacity: int
+    period: float
+
+    @property
+    def refill_per_second(self) -> float:
+        return self.capacity / self.period
+
+    @classmethod
+    def parse(cls, value: str) -> Rate | None:
+        """Parse "10/minute" style limits; "" or "0/..." disables the limit (None)."""
+        if not value or not value.strip():
+            return None
+        match = _RATE.match(value)
+        if match is None:
+            raise ValueError(f"Invalid rate limit {value!r} (expected e.g. '10/minute')")
+        count = int(match.group(1))
+        if count == 0:
+            return None
+        return cls(capacity=count, period=_PERIODS[match.group(2).lower()])
+
+
+class RateLimitBackend(abc.ABC):
+    """Storage for token buckets. Subclass for a shared store (e.g. Redis) across workers."""
+
+    @abc.abstractmethod
+    async def hit(self, buckets: Sequence[tuple[str, Rate]], *, cost: float = 1.0) -> tuple[int, float] | None:
+        """Take `cost` tokens from every (key, rate) bucket, or from none of them.
+
+        Returns None when allowed. Otherwise nothing is taken, and the result is
+        (index of the bucket that is shortest of tokens, seconds until it has enough).
+        A shared store must check and take atomically across all the keys.
+        """
+
+
+class InMemoryRateLimitBackend(RateLimitBackend):
+    """Per-process buckets, LRU-bounded to `max_keys` (an evicted bucket starts full)."""
+
+    def __init__(self, *, max_keys: int = 100_000) -> None:
+        self.max_keys = max(1, max_keys)
+        self._buckets: OrderedDict[str, tuple[float, float]] = OrderedDict()
+
+    async def hit(self, buckets: Sequence[tuple[str, Rate]], *, cost: float = 1.0) -> tuple[int, float] | None:
+        # No awaits: runs atomically on the event loop.
+        now = time.monotonic()
+        levels = []
+        rejected = None
+        for i, (key, rate) in enumerate(buckets):
+            tokens, updated = self._buckets.get(key, (float(rate.capacity), now))
+            tokens = min(float(rate.capacity), tokens + (now - updated) * rate.refill_per_second)
+            levels.append(tokens)
+            if tokens < cost:
+                retry_after = (cost - tokens) / rate.refill_per_second
+                if rejected is None or retry_after > rejected[1]:
+                    rejected = (i, retry_after)
+        spent = 0.0 if rejected is not None else cost
+        for (key, _), tokens in zip(buckets, levels):
+            self._buckets[key] = (tokens - spent, now)
+            self._buckets.move_to_end(key)
+        while len(self._buckets) > self.max_keys:
+            self._buckets.popitem(last=False)
+        return rejected
+
+
+class RateLimited(Exception):
+    def __init__(self, scope: str, retry_after: float) -> None:
+        super().__init__(f"Rate limited ({scope})")
+        self.scope = scope
+        self.retry_after = retry_after
+
+
+class RateLimiter:
+    """Applies per-IP, per-account and per-route buckets to a named route."""
+
+    def __init__(
+        self,
+        backend: RateLimitBackend,
+        *,
+        per_ip: Rate | None,
+        per_email: Rate | None,
+        per_route: Rate | None,
+        enabled: bool = True,
+    ) -> None:
+        self.backend = backend
+        self.per_ip = per_ip
+        self.per_email = per_email
+        self.per_route = per_route
+        self.enabled = enabled
+
+    async def check(self, route: str, *, ip: str | None, email: str | None = None) -> None:
+        """Raise `RateLimited` if any bucket for this request is empty.
+
+        Tokens are taken from all the buckets or none: a request rejected by one
+        bucket doesn't use up the others.
+        """
+        if not self.enabled:
+            return
+        checks = []
+        if self.per_ip is not None and ip:
+            checks.append(("ip", f"{route}:ip:{ip}", self.per_ip))
+        if self.per_email is not None and email:
+            checks.append(("email", f"{route}:email:{email.strip().lower()}", self.per_email))
+        if self.per_route is not None:
+            checks.append(("route", f"{route}:all", self.per_route))
+        if not checks:
+            return
+        rejected = await self.backend.hit([(key, rate) for _, key, rate in checks])
+        if rejected is not None:
+            i, retry_after = rejected
+            raise RateLimited(checks[i][0], retry_after)
+
+
+class AdmissionRejected(Exception):
+    def __init__(self, retry_after: float) -> None:
+        super().__init__("Too many concurrent requests")
+        self.retry_after = retry_after
+
+
+class AdmissionGate:
+    """Caps in-flight requests across a group of expensive routes.
+
+    `enter()` either reserves a slot (release it by leaving the returned context)
+    or raises `AdmissionRejected` straight away; nothing waits in a queue.
+    """
+
+    def __init__(self, *, limit: int, retry_after: float = 1.0) -> None:
+        self.limit = limit
+        self.retry_after = retry_after
+        self.active = 0
+        self.rejected = 0
+
+    def enter(self) -> _Slot:
+        if self.limit > 0 and self.active >= self.limit:
+            self.rejected += 1
+            raise AdmissionRejected(self.retry_after)
+        self.active += 1
+        return _Slot(self)
+
+
+class _Slot:
+    def __init__(self, gate: AdmissionGate) -> None:
+        self._gate = gate
+
+    def __enter__(self) -> _Slot:
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._gate.active -= 1
+
+
+auth_rate_limiter = RateLimiter(
+    InMemoryRateLimitBackend(max_keys=settings.rate_limit_max_keys),
+    per_ip=Rate.parse(settings.rate_limit_auth_per_ip),
+    per_email=Rate.parse(settings.rate_limit_auth_per_email),
+    per_route=Rate.parse(settings.rate_limit_auth_per_route),
+    enabled=settings.rate_limit_enabled,
+)
+
+auth_admission = AdmissionGate(limit=settings.auth_max_concurrent)
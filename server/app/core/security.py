@@ -1,6 +1,11 @@
 from __future__ import annotations
 
+import asyncio
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timezone
+from typing import Any, Callable
 
 import jwt
 from jwt import PyJWTError
@@ -12,6 +17,25 @@ from app.core.config import settings
 
 
 def decode_access_token(token: str) -> dict:
+    return _decode_token(token, typ="access")
+
+
+def create_stream_ticket(*, user_id: int) -> str:
+    """A short-lived token that only opens `GET /user-data/stream`.
+
+    EventSource can't send headers, so the stream is authenticated from the URL;
+    this keeps the long-lived access token out of it (and out of access logs).
+    """
+    now = int(datetime.now(timezone.utc).timestamp())
+    payload = {"sub": str(user_id), "iat": now, "exp": now + settings.user_data_stream_ticket_seconds, "typ": "stream"}
+    return jwt.encode(payload, settings.secret_key, algorithm="HS256")
+
+
+def decode_stream_ticket(token: str) -> dict:
+    return _decode_token(token, typ="stream")
+
+
+def _decode_token(token: str, *, typ: str) -> dict:
     try:
         payload = jwt.decode(token, settings.secret_key, algorithms=["HS256"])
     except PyJWTError as e:
@@ -23,7 +47,7 @@ def decode_access_token(token: str) -> dict:
     if datetime.now(timezone.utc).timestamp() >= float(exp):
         raise ValueError("Token expired")
 
-    if payload.get("typ") != "access":
+    if payload.get("typ") != typ:
         raise ValueError("Invalid token type")
 
     return payload
@@ -56,3 +80,77 @@ def verify_password(password: str, stored: str | None) -> bool:
         return hmac.compare_digest(candidate, expected)
     except Exception:
         return False
+
+
+class HashingBusyError(RuntimeError):
+    """Raised when the password-hashing queue is full; callers should answer 503."""
+
+
+class HashingExecutor:
+    """Bounded process pool for CPU-bound password hashing.
+
+    PBKDF2 runs in worker processes so it spreads across cores and never holds the
+    event loop or the request threadpool. At most `max_pending` jobs may be queued
+    or running; beyond that `submit` fails fast with `HashingBusyError`.
+
+    Workers are spawned, not forked: by the time a request needs hashing, the
+    server process runs an event loop, aiosqlite threads and a threadpool, and a
+    fork copies their locks in whatever state they happen to be. Call `start()`
+    from the startup hook; `submit()` only starts the pool itself as a fallback.
+    """
+
+    def __init__(self, *, workers: int | None, max_pending: int) -> None:
+        self.workers = workers or os.cpu_count() or 1
+        self.max_pending = max(1, max_pending)
+        self._pool: ProcessPoolExecutor | None = None
+        self._pending = 0
+        self._lock = threading.Lock()
+
+    def start(self) -> None:
+        """Create the pool and begin spawning its workers in the background."""
+        pool = self._get_pool()
+        # Spawned workers take a while to boot; don't make the first logins wait.
+        for _ in range(self.workers):
+            pool.submit(os.getpid)
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")
+                )
+            return self._pool
+
+    async def submit(self, fn: Callable[..., Any], *args: Any) -> Any:
+        with self._lock:
+            if self._pending >= self.max_pending:
+                raise HashingBusyError("Password hashing queue is full")
+            self._pending += 1
+        try:
+            return await asyncio.wrap_future(self._get_pool().submit(fn, *args))
+        finally:
+            with self._lock:
+                self._pending -= 1
+
+    def shutdown(self) -> None:
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=True, cancel_futures=True)
+
+
+hashing_executor = HashingExecutor(
+    # One pool per server process; don't oversubscribe the cores between them.
+    workers=settings.password_hash_workers or max(1, (os.cpu_count() or 1) // settings.worker_processes),
+    max_pending=settings.password_hash_max_pending,
+)
+
+
+async def hash_password_async(password: str) -> str:
+    return await hashing_executor.submit(hash_password, password)
+
+
+async def verify_password_async(password: str, stored: str | None) -> bool:
+    if not stored:
+        return False
+    return await hashing_executor.submit(verify_password, password, stored)
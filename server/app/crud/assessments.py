@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+import datetime as dt
+
+from sqlalchemy import delete, insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.pubsub import Change, user_data_hub
+from app.crud.stats import record_assessment_change
+from app.models.assessment import Assessment
+from app.schemas.assessment import AssessmentCreate
+
+
+def _announce(user_id: int, updated_at: dt.datetime | None) -> None:
+    # Call after commit. Clients watching "assessments" refetch the range they show.
+    user_data_hub.publish(user_id, Change(key="assessments", version=0, updated_at=updated_at))
+
+
+async def list_assessments(
+    db: AsyncSession,
+    *,
+    user_id: int,
+    start: dt.date | None = None,
+    end: dt.date | None = None,
+) -> list[Assessment]:
+    """The user's assessments dated from `start` to `end` (inclusive, either optional).
+
+    An index range scan on (user_id, date), so a week costs that week's rows
+    whatever the size of the history.
+    """
+    stmt = select(Assessment).where(Assessment.user_id == user_id)
+    if start is not None:
+        stmt = stmt.where(Assessment.date >= start)
+    if end is not None:
+        stmt = stmt.where(Assessment.date <= end)
+    stmt = stmt.order_by(Assessment.date.asc(), Assessment.start_time.asc(), Assessment.id.asc())
+    return list((await db.execute(stmt)).scalars().all())
+
+
+async def create_assessment(db: AsyncSession, *, user_id: int, payload: AssessmentCreate) -> Assessment:
+    stmt = insert(Assessment).values(user_id=user_id, **payload.model_dump()).returning(Assessment)
+    assessment = await db.scalar(stmt)
+    await record_assessment_change(db, user_id=user_id, delta=1)
+    await db.commit()
+    _announce(user_id, assessment.updated_at)
+    return assessment
+
+
+async def update_assessment(
+    db: AsyncSession, *, user_id: int, assessment_id: int, changes: dict
+) -> Assessment | None:
+    """Apply `changes` (column -> value) to one of the user's assessments; None if it isn't theirs."""
+    mine = (Assessment.id == assessment_id, Assessment.user_id == user_id)
+    if changes:
+        assessment = await db.scalar(update(Assessment).where(*mine).values(**changes).returning(Assessment))
+    else:
+        assessment = await db.scalar(select(Assessment).where(*mine))
+    if assessment is None:
+        return None
+    await db.commit()
+    if changes:
+        _announce(user_id, assessment.updated_at)
+    return assessment
+
+
+async def delete_assessment(db: AsyncSession, *, user_id: int, assessment_id: int) -> bool:
+    stmt = delete(Assessment).where(Assessment.id == assessment_id, Assessment.user_id == user_id)
+    deleted = await db.scalar(stmt.returning(Assessment.id))
+    if deleted is None:
+        return False
+    await record_assessment_change(db, user_id=user_id, delta=-1)
+    await db.commit()
+    _announce(user_id, None)
+    return True
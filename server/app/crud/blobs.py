@@ -0,0 +1,29 @@
+from __future__ import annotations
+
+from sqlalchemy import select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.blob import Blob
+
+
+async def get_blob(db: AsyncSession, *, blob_id: str) -> Blob | None:
+    return (await db.execute(select(Blob).where(Blob.id == blob_id))).scalar_one_or_none()
+
+
+async def create_blob(
+    db: AsyncSession,
+    *,
+    blob_id: str,
+    content_type: str,
+    size: int,
+    created_by: int | None,
+) -> None:
+    # Content-addressed: re-uploading identical bytes is a no-op.
+    stmt = (
+        sqlite_insert(Blob)
+        .values(id=blob_id, content_type=content_type, size=size, created_by=created_by)
+        .on_conflict_do_nothing(index_elements=[Blob.id])
+    )
+    await db.execute(stmt)
+    await db.commit()
@@ -1,25 +1,167 @@
 from __future__ import annotations
 
-from sqlalchemy.orm import Session
+import html
+from collections.abc import AsyncIterator
+
+from sqlalchemy import delete, insert, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.fts import to_match_query
+from app.db.session import AsyncSessionLocal
 
 from app.models.note import Note
 from app.schemas.note import NoteCreate
 
 
-def list_notes(db: Session, *, user_id: int, limit: int = 50, offset: int = 0) -> list[Note]:
-    return (
-        db.query(Note)
-        .filter(Note.user_id == user_id)
-        .order_by(Note.id.desc())
-        .offset(offset)
-        .limit(limit)
-        .all()
-    )
+async def list_notes(
+    db: AsyncSession,
+    *,
+    user_id: int,
+    limit: int = 50,
+    before_id: int | None = None,
+    after_id: int | None = None,
+) -> tuple[list[Note], int | None]:
+    """Keyset-paginated notes, newest first.
+
+    `before_id` pages towards older notes, `after_id` towards newer ones. The
+    returned cursor continues in the same direction (pass it back as the same
+    parameter) and is None when there is nothing further. Each page is an index
+    range scan on (user_id, id), so cost doesn't grow with page depth.
+    """
+    stmt = select(Note).where(Note.user_id == user_id)
+    if after_id is not None:
+        stmt = stmt.where(Note.id > after_id).order_by(Note.id.asc())
+    else:
+        if before_id is not None:
+            stmt = stmt.where(Note.id < before_id)
+        stmt = stmt.order_by(Note.id.desc())
 
+    # Fetch one extra row to learn whether another page exists.
+    notes = list((await db.execute(stmt.limit(limit + 1))).scalars().all())
+    has_more = len(notes) > limit
+    notes = notes[:limit]
+    next_cursor = notes[-1].id if has_more else None
+    if after_id is not None:
+        notes.reverse()
+    return notes, next_cursor
 
-def create_note(db: Session, *, user_id: int, payload: NoteCreate) -> Note:
+
+async def create_note(db: AsyncSession, *, user_id: int, payload: NoteCreate) -> Note:
     note = Note(user_id=user_id, title=payload.title, content=payload.content)
     db.add(note)
-    db.commit()
-    db.refresh(note)
+    await db.commit()
+    await db.refresh(note)
     return note
+
+
+async def create_notes(db: AsyncSession, *, user_id: int, payloads: list[NoteCreate]) -> list[Note]:
+    """Insert many notes in one transaction; returns them in input order.
+
+    One executemany INSERT ... RETURNING (batched into multi-row VALUES by
+    SQLAlchemy) replaces a commit and refresh SELECT per note.
+    """
+    if not payloads:
+        return []
+    rows = [{"user_id": user_id, "title": p.title, "content": p.content} for p in payloads]
+    result = await db.scalars(insert(Note).returning(Note, sort_by_parameter_order=True), rows)
+    notes = list(result.all())
+    await db.commit()
+    return notes
+
+
+async def delete_notes(db: AsyncSession, *, user_id: int, ids: list[int]) -> list[int]:
+    """Delete the user's notes among `ids`; returns the ids actually deleted."""
+    if not ids:
+        return []
+    result = await db.execute(
+        delete(Note).where(Note.user_id == user_id, Note.id.in_(ids)).returning(Note.id)
+    )
+    deleted = sorted(result.scalars().all())
+    await db.commit()
+    return deleted
+
+
+async def iter_notes(*, user_id: int, chunk_size: int = 500) -> AsyncIterator[list[Note]]:
+    """All of a user's notes, oldest first, in chunks of up to `chunk_size`.
+
+    Uses its own session so it can outlive the request's dependencies (e.g. while
+    a streaming response is being sent). Rows are fetched `chunk_size` at a time
+    from one cursor, so memory stays flat however many notes there are.
+    """
+    stmt = (
+        select(Note)
+        .where(Note.user_id == user_id)
+        .order_by(Note.id.asc())
+        .execution_options(yield_per=chunk_size)
+    )
+    async with AsyncSessionLocal() as db:
+        result = await db.stream_scalars(stmt)
+        async for chunk in result.partitions():
+            yield chunk
+            # Chunks are handed off; don't keep them in the identity map.
+            db.expunge_all()
+
+
+# Highlight markers are control characters so user text can be HTML-escaped first
+# and the markers swapped for <mark> tags afterwards.
+_HL_OPEN, _HL_CLOSE = "\x02", "\x03"
+
+_SEARCH_SQL = text(
+    """
+    SELECT n.id, n.user_id, n.title, n.content, n.created_at,
+           bm25(notes_fts, 10.0, 1.0) AS rank,
+           highlight(notes_fts, 0, :hl_open, :hl_close) AS title_highlight,
+           snippet(notes_fts, 1, :hl_open, :hl_close, '…', :snippet_tokens) AS snippet
+    FROM notes_fts
+    JOIN notes AS n ON n.id = notes_fts.rowid
+    WHERE notes_fts MATCH :match AND n.user_id = :user_id
+    ORDER BY rank
+    LIMIT :limit OFFSET :offset
+    """
+)
+
+
+def _marked_html(value: str | None) -> str:
+    escaped = html.escape(value or "")
+    return escaped.replace(_HL_OPEN, "<mark>").replace(_HL_CLOSE, "</mark>")
+
+
+async def search_notes(
+    db: AsyncSession,
+    *,
+    user_id: int,
+    query: str,
+    limit: int = 20,
+    offset: int = 0,
+    snippet_tokens: int = 16,
+) -> tuple[list[dict], int | None]:
+    """Full-text search over the user's notes, best bm25 match first.
+
+    Title matches weigh 10x content matches. Returns hits plus the offset of the
+    next page (None when exhausted). Highlights are HTML-escaped with <mark> tags.
+    """
+    match = to_match_query(query)
+    if not match:
+        return [], None
+
+    result = await db.execute(
+        _SEARCH_SQL,
+        {
+            "match": match,
+            "user_id": user_id,
+            "limit": limit + 1,
+            "offset": offset,
+            "hl_open": _HL_OPEN,
+            "hl_close": _HL_CLOSE,
+            "snippet_tokens": snippet_tokens,
+        },
+    )
+    rows = result.mappings().all()
+    next_offset = offset + limit if len(rows) > limit else None
+    hits = []
+    for row in rows[:limit]:
+        hit = dict(row)
+        hit["title_highlight"] = _marked_html(hit["title_highlight"])
+        hit["snippet"] = _marked_html(hit["snippet"])
+        hits.append(hit)
+    return hits, next_offset
@@ -0,0 +1,220 @@
+from __future__ import annotations
+
+import datetime as dt
+
+from sqlalchemy import delete, func, insert, select, update
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.assessment import Assessment
+from app.models.stats import StreakRun, TaskDay, UserStats
+
+
+ONE_DAY = dt.timedelta(days=1)
+
+# (task date, completed) before or after a write; None when the task doesn't exist.
+TaskState = tuple[dt.date, bool]
+
+
+async def _bump_counters(db: AsyncSession, user_id: int, **deltas: int) -> None:
+    deltas = {name: delta for name, delta in deltas.items() if delta}
+    if not deltas:
+        return
+    stmt = sqlite_insert(UserStats).values(user_id=user_id, **{name: max(delta, 0) for name, delta in deltas.items()})
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[UserStats.user_id],
+        set_={
+            **{name: getattr(UserStats, name) + delta for name, delta in deltas.items()},
+            "updated_at": func.now(),
+        },
+    )
+    await db.execute(stmt)
+
+
+async def _add_run(db: AsyncSession, user_id: int, start: dt.date, end: dt.date) -> None:
+    await db.execute(
+        insert(StreakRun).values(user_id=user_id, start_day=start, end_day=end, length=(end - start).days + 1)
+    )
+
+
+async def _set_run(db: AsyncSession, run_id: int, start: dt.date, end: dt.date) -> None:
+    await db.execute(
+        update(StreakRun)
+        .where(StreakRun.id == run_id)
+        .values(start_day=start, end_day=end, length=(end - start).days + 1)
+    )
+
+
+async def _activate(db: AsyncSession, user_id: int, day: dt.date) -> None:
+    # `day` got its first completed task: extend or join the neighbouring runs.
+    left = (
+        await db.execute(
+            select(StreakRun.id, StreakRun.start_day).where(
+                StreakRun.user_id == user_id, StreakRun.end_day == day - ONE_DAY
+            )
+        )
+    ).first()
+    right = (
+        await db.execute(
+            select(StreakRun.id, StreakRun.end_day).where(
+                StreakRun.user_id == user_id, StreakRun.start_day == day + ONE_DAY
+            )
+        )
+    ).first()
+    if left is not None and right is not None:
+        await db.execute(delete(StreakRun).where(StreakRun.id == right.id))
+        await _set_run(db, left.id, left.start_day, right.end_day)
+    elif left is not None:
+        await _set_run(db, left.id, left.start_day, day)
+    elif right is not None:
+        await _set_run(db, right.id, day, right.end_day)
+    else:
+        await _add_run(db, user_id, day, day)
+
+
+async def _deactivate(db: AsyncSession, user_id: int, day: dt.date) -> None:
+    # `day` lost its last completed task: shrink or split the run holding it.
+    run = (
+        await db.execute(
+            select(StreakRun.id, StreakRun.start_day, StreakRun.end_day)
+            .where(StreakRun.user_id == user_id, StreakRun.end_day >= day)
+            .order_by(StreakRun.end_day.asc())
+            .limit(1)
+        )
+    ).first()
+    if run is None or run.start_day > day:
+        return
+    if run.start_day == run.end_day:
+        await db.execute(delete(StreakRun).where(StreakRun.id == run.id))
+    elif day == run.start_day:
+        await _set_run(db, run.id, day + ONE_DAY, run.end_day)
+    elif day == run.end_day:
+        await _set_run(db, run.id, run.start_day, day - ONE_DAY)
+    else:
+        await _set_run(db, run.id, run.start_day, day - ONE_DAY)
+        await _add_run(db, user_id, day + ONE_DAY, run.end_day)
+
+
+async def _bump_day(db: AsyncSession, user_id: int, day: dt.date, delta: int) -> None:
+    if delta > 0:
+        stmt = sqlite_insert(TaskDay).values(user_id=user_id, day=day, completed=1)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[TaskDay.user_id, TaskDay.day],
+            set_={"completed": TaskDay.completed + 1},
+        )
+        completed = await db.scalar(stmt.returning(TaskDay.completed))
+        if completed == 1:
+            await _activate(db, user_id, day)
+        return
+
+    completed = await db.scalar(
+        update(TaskDay)
+        .where(TaskDay.user_id == user_id, TaskDay.day == day)
+        .values(completed=TaskDay.completed - 1)
+        .returning(TaskDay.completed)
+    )
+    if completed is not None and completed <= 0:
+        await db.execute(delete(TaskDay).where(TaskDay.user_id == user_id, TaskDay.day == day))
+        await _deactivate(db, user_id, day)
+
+
+async def record_task_change(
+    db: AsyncSession,
+    *,
+    user_id: int,
+    before: TaskState | None,
+    after: TaskState | None,
+) -> None:
+    """Update the user's stats for one task write, inside the caller's transaction.
+
+    Touches at most two `task_days` rows and the streak runs next to them, so the
+    cost doesn't depend on how many tasks the user has.
+    """
+    done_before = before if before is not None and before[1] else None
+    done_after = after if after is not None and after[1] else None
+    await _bump_counters(
+        db,
+        user_id,
+        tasks_total=(after is not None) - (before is not None),
+        tasks_completed=(done_after is not None) - (done_before is not None),
+    )
+    if done_before is not None and done_before != done_after:
+        await _bump_day(db, user_id, done_before[0], -1)
+    if done_after is not None and done_after != done_before:
+        await _bump_day(db, user_id, done_after[0], +1)
+
+
+async def record_assessment_change(db: AsyncSession, *, user_id: int, delta: int) -> None:
+    """Count `delta` assessments created (or deleted, when negative), inside the caller's transaction."""
+    await _bump_counters(db, user_id, assessments_total=delta)
+
+
+def _days_within(run, first: dt.date, last: dt.date) -> int:
+    # Days of `run` (start_day..end_day) that fall in first..last.
+    if run is None:
+        return 0
+    return max(0, (min(run.end_day, last) - max(run.start_day, first)).days + 1)
+
+
+async def get_stats(db: AsyncSession, *, user_id: int, today: dt.date, year: int) -> dict:
+    """The user's dashboard stats as of `today`, plus completed tasks per day of `year`.
+
+    Streaks only count days of `year` up to `today` (up to 31 December for other
+    years), the window the profile page shows. Every part is a primary-key or
+    index seek except the day map, which reads at most one row per active day of
+    `year`, and the upcoming-assessment count, which reads one index entry per
+    assessment dated from `today` on.
+    """
+    counters = await db.get(UserStats, user_id)
+
+    # Assessments dated before today count as done. Upcoming ones are few, so count those.
+    upcoming = await db.scalar(
+        select(func.count()).select_from(Assessment).where(Assessment.user_id == user_id, Assessment.date >= today)
+    )
+
+    first = dt.date(year, 1, 1)
+    last = today if year == today.year else dt.date(year, 12, 31)
+    runs = select(StreakRun.start_day, StreakRun.end_day).where(StreakRun.user_id == user_id)
+
+    # The run holding `last`, and the one holding `first` (the same run if it spans both).
+    ending = (
+        await db.execute(runs.where(StreakRun.end_day >= last).order_by(StreakRun.end_day.asc()).limit(1))
+    ).first()
+    current = _days_within(ending, first, last) if ending and ending.start_day <= last else 0
+    starting = (
+        await db.execute(runs.where(StreakRun.end_day >= first).order_by(StreakRun.end_day.asc()).limit(1))
+    ).first()
+
+    before = (
+        await db.execute(
+            runs.where(StreakRun.end_day >= first, StreakRun.end_day < last - dt.timedelta(days=current))
+            .order_by(StreakRun.end_day.desc())
+            .limit(1)
+        )
+    ).first()
+    inside = await db.scalar(
+        select(StreakRun.length)
+        .where(StreakRun.user_id == user_id, StreakRun.start_day >= first, StreakRun.end_day <= last)
+        .order_by(StreakRun.length.desc())
+        .limit(1)
+    )
+
+    days = await db.execute(
+        select(TaskDay.day, TaskDay.completed).where(
+            TaskDay.user_id == user_id,
+            TaskDay.day >= first,
+            TaskDay.day <= dt.date(year, 12, 31),
+        )
+    )
+
+    assessments_total = counters.assessments_total if counters else 0
+    return {
+        "tasks_total": counters.tasks_total if counters else 0,
+        "tasks_completed": counters.tasks_completed if counters else 0,
+        "assessments_total": assessments_total,
+        "assessments_completed": max(0, assessments_total - (upcoming or 0)),
+        "current_streak": current,
+        "previous_streak": _days_within(before, first, last),
+        "best_streak": max(inside or 0, current, _days_within(starting, first, last)),
+        "completed_by_day": {day.isoformat(): completed for day, completed in days},
+    }
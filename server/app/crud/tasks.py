@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+import datetime as dt
+
+from sqlalchemy import delete, insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.pubsub import Change, user_data_hub
+from app.crud.stats import record_task_change
+from app.models.task import Task
+from app.schemas.task import TaskCreate
+
+
+def _announce(user_id: int, updated_at: dt.datetime | None) -> None:
+    # Call after commit. Clients watching "tasks" refetch the range they show.
+    user_data_hub.publish(user_id, Change(key="tasks", version=0, updated_at=updated_at))
+
+
+async def list_tasks(
+    db: AsyncSession,
+    *,
+    user_id: int,
+    start: dt.date | None = None,
+    end: dt.date | None = None,
+) -> list[Task]:
+    """The user's tasks dated from `start` to `end` (inclusive, either optional).
+
+    An index range scan on (user_id, date), so a week costs that week's rows
+    whatever the size of the history.
+    """
+    stmt = select(Task).where(Task.user_id == user_id)
+    if start is not None:
+        stmt = stmt.where(Task.date >= start)
+    if end is not None:
+        stmt = stmt.where(Task.date <= end)
+    stmt = stmt.order_by(Task.date.asc(), Task.start_time.asc(), Task.id.asc())
+    return list((await db.execute(stmt)).scalars().all())
+
+
+def _state(task: Task) -> tuple[dt.date, bool]:
+    return task.date, task.progress >= 100
+
+
+async def create_task(db: AsyncSession, *, user_id: int, payload: TaskCreate) -> Task:
+    task = await db.scalar(insert(Task).values(user_id=user_id, **payload.model_dump()).returning(Task))
+    await record_task_change(db, user_id=user_id, before=None, after=_state(task))
+    await db.commit()
+    _announce(user_id, task.updated_at)
+    return task
+
+
+async def update_task(db: AsyncSession, *, user_id: int, task_id: int, changes: dict) -> Task | None:
+    """Apply `changes` (column -> value) to one of the user's tasks; None if it isn't theirs."""
+    mine = (Task.id == task_id, Task.user_id == user_id)
+    if not changes:
+        return await db.scalar(select(Task).where(*mine))
+
+    before = None
+    if "date" in changes or "progress" in changes:
+        # Read the old state with a (no-op) UPDATE, not a SELECT: SQLite defers the write
+        # lock to the first write, so two concurrent PATCHes would both read the pre-update
+        # row and count the same change twice.
+        before = (
+            await db.execute(update(Task).where(*mine).values(date=Task.date).returning(Task.date, Task.progress))
+        ).first()
+        if before is None:
+            return None
+    task = await db.scalar(update(Task).where(*mine).values(**changes).returning(Task))
+    if task is None:
+        return None
+    if before is not None:
+        await record_task_change(db, user_id=user_id, before=(before.date, before.progress >= 100), after=_state(task))
+    await db.commit()
+    _announce(user_id, task.updated_at)
+    return task
+
+
+async def delete_task(db: AsyncSession, *, user_id: int, task_id: int) -> bool:
+    stmt = delete(Task).where(Task.id == task_id, Task.user_id == user_id)
+    deleted = (await db.execute(stmt.returning(Task.date, Task.progress))).first()
+    if deleted is None:
+        return False
+    await record_task_change(db, user_id=user_id, before=(deleted.date, deleted.progress >= 100), after=None)
+    await db.commit()
+    _announce(user_id, None)
+    return True
@@ -1,36 +1,298 @@
 from __future__ import annotations
 
-import json
+from typing import Callable
 
-from sqlalchemy import select
-from sqlalchemy.orm import Session
+from sqlalchemy import func, select, update
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import load_only
 
-from app.models.user_data import UserData
+from app.core import fastjson
+from app.core.metrics import span
+from app.core.pubsub import Change, user_data_hub
+from app.models.user_data import UserChangeSeq, UserData
 
 
-def get_value(db: Session, *, user_id: int, key: str) -> tuple[bool, object | None, UserData | None]:
-    row = db.execute(select(UserData).where(UserData.user_id == user_id, UserData.key == key)).scalar_one_or_none()
-    if row is None:
-        return False, None, None
+class VersionConflict(ValueError):
+    """The row changed (or did not match the expected version) during a write."""
+
+    def __init__(self, current_version: int | None) -> None:
+        super().__init__("Version conflict")
+        self.current_version = current_version
+
 
+def announce(row: UserData) -> None:
+    # Call after commit: listeners may refetch the key straight away.
+    user_data_hub.publish(row.user_id, Change(key=row.key, version=row.version, updated_at=row.updated_at))
+
+
+def _decode(row: UserData) -> object | None:
     try:
-        value = json.loads(row.value_json)
+        with span("json"):
+            return fastjson.loads(row.value_json)
     except Exception:
-        value = None
-    return True, value, row
+        return None
 
 
-def upsert_value(db: Session, *, user_id: int, key: str, value: object) -> UserData:
-    value_json = json.dumps(value, ensure_ascii=False)
-    row = db.execute(select(UserData).where(UserData.user_id == user_id, UserData.key == key)).scalar_one_or_none()
+async def get_value(db: AsyncSession, *, user_id: int, key: str) -> tuple[bool, object | None, UserData | None]:
+    stmt = select(UserData).where(UserData.user_id == user_id, UserData.key == key)
+    row = (await db.execute(stmt)).scalar_one_or_none()
     if row is None:
-        row = UserData(user_id=user_id, key=key, value_json=value_json)
-        db.add(row)
-        db.commit()
-        db.refresh(row)
-        return row
-
-    row.value_json = value_json
-    db.commit()
-    db.refresh(row)
+        return False, None, None
+
+    return True, _decode(row), row
+
+
+async def get_version(db: AsyncSession, *, user_id: int, key: str) -> tuple[int, int] | None:
+    """(row id, version) for a key without loading or decoding its value."""
+    stmt = select(UserData.id, UserData.version).where(UserData.user_id == user_id, UserData.key == key)
+    row = (await db.execute(stmt)).first()
+    return (row.id, row.version) if row is not None else None
+
+
+async def get_values(db: AsyncSession, *, user_id: int, keys: list[str]) -> dict[str, tuple[object | None, UserData]]:
+    """Read many keys with a single `IN (...)` query.
+
+    Missing keys are simply absent from the returned mapping.
+    """
+    if not keys:
+        return {}
+    stmt = select(UserData).where(UserData.user_id == user_id, UserData.key.in_(set(keys)))
+    rows = (await db.execute(stmt)).scalars().all()
+    return {row.key: (_decode(row), row) for row in rows}
+
+
+def _seq_stmt(user_id: int, count: int = 1):
+    """Reserve `count` change numbers for the user; RETURNING gives the last one.
+
+    One primary-key upsert on `user_change_seqs`, run once per transaction before
+    the rows are written. It takes SQLite's write lock, so numbers are unique and
+    increase in commit order.
+    """
+    stmt = sqlite_insert(UserChangeSeq).values(user_id=user_id, seq=count)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[UserChangeSeq.user_id],
+        set_={"seq": UserChangeSeq.seq + count},
+    )
+    return stmt.returning(UserChangeSeq.seq)
+
+
+async def _take_seqs(db: AsyncSession, user_id: int, count: int = 1) -> int:
+    """The first of `count` fresh change numbers for the user."""
+    last = (await db.execute(_seq_stmt(user_id, count))).scalar_one()
+    return last - count + 1
+
+
+async def get_changes(
+    db: AsyncSession,
+    *,
+    user_id: int,
+    since: int,
+    limit: int,
+    include_values: bool = False,
+) -> tuple[list[tuple[UserData, object | None]], bool]:
+    """Keys written after change number `since`, oldest change first.
+
+    An index range scan on (user_id, change_seq). Returns (row, value) pairs
+    (value is None unless `include_values`) and whether more changes follow.
+    """
+    columns = [UserData.key, UserData.version, UserData.change_seq, UserData.updated_at]
+    if include_values:
+        columns.append(UserData.value_json)
+    stmt = (
+        select(UserData)
+        .options(load_only(*columns))
+        .where(UserData.user_id == user_id, UserData.change_seq > since)
+        .order_by(UserData.change_seq.asc())
+        .limit(limit + 1)
+    )
+    rows = list((await db.execute(stmt)).scalars().all())
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    return [(row, _decode(row) if include_values else None) for row in rows], has_more
+
+
+def _upsert_stmt():
+    """`INSERT ... ON CONFLICT(user_id, key) DO UPDATE ... RETURNING`, run with one parameter set per key.
+
+    Relies on the `uq_user_data_user_key` unique constraint; `updated_at` is bumped
+    explicitly because ORM `onupdate` hooks don't fire for ON CONFLICT updates.
+    Built once: a multi-row `.values([...])` has no compilation cache key, so it
+    would be recompiled on every write.
+    """
+    stmt = sqlite_insert(UserData)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[UserData.user_id, UserData.key],
+        set_={
+            "value_json": stmt.excluded.value_json,
+            "version": UserData.version + 1,
+            "change_seq": stmt.excluded.change_seq,
+            "updated_at": func.now(),
+        },
+    )
+    return stmt.returning(UserData, sort_by_parameter_order=True)
+
+
+_UPSERT = _upsert_stmt()
+_UPSERT_OPTIONS = {"populate_existing": True}
+
+
+def _upsert_params(*, user_id: int, values: dict[str, object], first_seq: int) -> list[dict]:
+    return [
+        {"user_id": user_id, "key": key, "value_json": fastjson.dumps(value), "change_seq": first_seq + i}
+        for i, (key, value) in enumerate(values.items())
+    ]
+
+
+async def upsert_value(db: AsyncSession, *, user_id: int, key: str, value: object) -> UserData:
+    (row,) = await stage_values(db, user_id=user_id, values={key: value})
+    await db.commit()
+    announce(row)
     return row
+
+
+async def stage_values(db: AsyncSession, *, user_id: int, values: dict[str, object]) -> list[UserData]:
+    """Upsert keys inside the caller's transaction; call `announce()` on each row after committing."""
+    if not values:
+        return []
+    first_seq = await _take_seqs(db, user_id, len(values))
+    params = _upsert_params(user_id=user_id, values=values, first_seq=first_seq)
+    return list((await db.scalars(_UPSERT, params, execution_options=_UPSERT_OPTIONS)).all())
+
+
+async def upsert_values(db: AsyncSession, *, user_id: int, values: dict[str, object]) -> list[UserData]:
+    """Insert or update many keys with a single statement and one commit."""
+    rows = await stage_values(db, user_id=user_id, values=values)
+    if not rows:
+        return []
+    await db.commit()
+    for row in rows:
+        announce(row)
+    return rows
+
+
+def _write_versioned_stmt():
+    stmt = sqlite_insert(UserData)
+    return stmt.on_conflict_do_update(
+        index_elements=[UserData.user_id, UserData.key],
+        set_={
+            "value_json": stmt.excluded.value_json,
+            "version": func.max(UserData.version + 1, stmt.excluded.version),
+            "change_seq": stmt.excluded.change_seq,
+            "updated_at": stmt.excluded.updated_at,
+        },
+    )
+
+
+_WRITE_VERSIONED = _write_versioned_stmt()
+
+
+async def write_versioned(db: AsyncSession, *, rows: list[dict]) -> None:
+    """Upsert rows for many users in one transaction, with caller-chosen versions.
+
+    Each row has `user_id`, `key`, `value`, `version` and `updated_at`. Used by the
+    write-behind buffer, which hands out versions (and announces them) before the
+    write lands. The stored version never goes backwards: it becomes
+    max(current + 1, version). Change numbers are assigned here, at flush time.
+    """
+    if not rows:
+        return
+    counts: dict[int, int] = {}
+    for r in rows:
+        counts[r["user_id"]] = counts.get(r["user_id"], 0) + 1
+    next_seq = {user_id: await _take_seqs(db, user_id, count) for user_id, count in counts.items()}
+
+    # One executemany; SQLAlchemy batches it into multi-row INSERTs under SQLite's parameter limit.
+    await db.execute(
+        _WRITE_VERSIONED,
+        [
+            {
+                "user_id": r["user_id"],
+                "key": r["key"],
+                "value_json": fastjson.dumps(r["value"]),
+                "version": r["version"],
+                "change_seq": _claim(next_seq, r["user_id"]),
+                "updated_at": r["updated_at"],
+            }
+            for r in rows
+        ],
+    )
+    await db.commit()
+
+
+def _claim(next_seq: dict[int, int], user_id: int) -> int:
+    seq = next_seq[user_id]
+    next_seq[user_id] = seq + 1
+    return seq
+
+
+async def _compare_and_swap(
+    db: AsyncSession, *, user_id: int, row_id: int, version: int, value_json: str
+) -> UserData:
+    # A version mismatch rolls back, so a conflicting write uses up no change number.
+    seq = await _take_seqs(db, user_id)
+    cas = (
+        update(UserData)
+        .where(UserData.id == row_id, UserData.user_id == user_id, UserData.version == version)
+        .values(value_json=value_json, version=UserData.version + 1, change_seq=seq, updated_at=func.now())
+        .returning(UserData)
+        .execution_options(populate_existing=True, synchronize_session=False)
+    )
+    updated = (await db.execute(cas)).scalar_one_or_none()
+    if updated is None:
+        await db.rollback()
+        raise VersionConflict(None)
+    await db.commit()
+    announce(updated)
+    return updated
+
+
+async def replace_value(
+    db: AsyncSession,
+    *,
+    user_id: int,
+    row_id: int,
+    version: int,
+    value: object,
+) -> UserData:
+    """Overwrite a value only if the row is still at `version` (else `VersionConflict`)."""
+    return await _compare_and_swap(
+        db,
+        user_id=user_id,
+        row_id=row_id,
+        version=version,
+        value_json=fastjson.dumps(value),
+    )
+
+
+async def patch_value(
+    db: AsyncSession,
+    *,
+    user_id: int,
+    key: str,
+    apply: Callable[[object | None], object],
+    expected_version: int | None = None,
+) -> tuple[object, UserData] | None:
+    """Read-modify-write a stored value with optimistic concurrency.
+
+    `apply` receives the decoded value and returns the new one (it may raise).
+    The write is a compare-and-swap on `version`, so a concurrent writer makes
+    this raise `VersionConflict` instead of being silently overwritten. Returns
+    None when the key does not exist.
+    """
+    stmt = select(UserData).where(UserData.user_id == user_id, UserData.key == key)
+    row = (await db.execute(stmt)).scalar_one_or_none()
+    if row is None:
+        return None
+    if expected_version is not None and row.version != expected_version:
+        raise VersionConflict(row.version)
+
+    new_value = apply(_decode(row))
+    updated = await _compare_and_swap(
+        db,
+        user_id=user_id,
+        row_id=row.id,
+        version=row.version,
+        value_json=fastjson.dumps(new_value),
+    )
+    return new_value, updated
@@ -2,20 +2,44 @@ from __future__ import annotations
 
 from datetime import datetime, timezone
 
-from sqlalchemy import select
-from sqlalchemy.orm import Session
+from sqlalchemy import func, select, update
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.user import User
-from app.core.security import hash_password, verify_password
+from app.core.cache import user_cache
+from app.crud.user_data import announce, stage_values
 
 
-def get_by_provider_sub(db: Session, *, provider: str, provider_sub: str) -> User | None:
+async def get_by_provider_sub(db: AsyncSession, *, provider: str, provider_sub: str) -> User | None:
     stmt = select(User).where(User.provider == provider, User.provider_sub == provider_sub)
-    return db.execute(stmt).scalar_one_or_none()
+    return (await db.execute(stmt)).scalar_one_or_none()
 
 
-def upsert_google_user(
-    db: Session,
+def _snapshot(user: User) -> dict:
+    # The copy of the login profile kept in user_data under "user" for the app.
+    return {
+        "id": user.id,
+        "provider": user.provider,
+        "email": user.email,
+        "name": user.name,
+        "picture": user.picture,
+        "last_login_at": user.last_login_at.isoformat() if user.last_login_at else None,
+    }
+
+
+async def _commit_login(db: AsyncSession, user: User) -> User:
+    # The snapshot goes into the same transaction as the user row: one commit per login.
+    rows = await stage_values(db, user_id=user.id, values={"user": _snapshot(user)})
+    await db.commit()
+    user_cache.invalidate(user.id)
+    for row in rows:
+        announce(row)
+    return user
+
+
+async def upsert_google_user(
+    db: AsyncSession,
     *,
     sub: str,
     email: str | None,
@@ -26,72 +50,73 @@ def upsert_google_user(
     picture: str | None,
     locale: str | None,
 ) -> User:
-    provider = "google"
-    user = get_by_provider_sub(db, provider=provider, provider_sub=sub)
-    now = datetime.now(timezone.utc)
-    if user is None:
-        user = User(
-            provider=provider,
-            provider_sub=sub,
-            email=email,
-            email_verified=email_verified,
-            name=name,
-            given_name=given_name,
-            family_name=family_name,
-            picture=picture,
-            locale=locale,
-            last_login_at=now,
-        )
-        db.add(user)
-        db.commit()
-        db.refresh(user)
-        return user
-
-    user.email = email
-    user.email_verified = email_verified
-    user.name = name
-    user.given_name = given_name
-    user.family_name = family_name
-    user.picture = picture
-    user.locale = locale
-    user.last_login_at = now
-    db.commit()
-    db.refresh(user)
-    return user
+    """Create or update a Google user and their "user" snapshot in one transaction.
+
+    A single `INSERT ... ON CONFLICT(provider, provider_sub) DO UPDATE ... RETURNING`
+    replaces the select-then-write, and nothing is re-read after the commit.
+    """
+    profile = {
+        "email": email,
+        "email_verified": email_verified,
+        "name": name,
+        "given_name": given_name,
+        "family_name": family_name,
+        "picture": picture,
+        "locale": locale,
+        "last_login_at": datetime.now(timezone.utc),
+    }
+    stmt = sqlite_insert(User).values(provider="google", provider_sub=sub, **profile)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[User.provider, User.provider_sub],
+        # ORM `onupdate` hooks don't fire for ON CONFLICT updates.
+        set_={**{field: stmt.excluded[field] for field in profile}, "updated_at": func.now()},
+    )
+    stmt = stmt.returning(User).execution_options(populate_existing=True)
+    user = (await db.execute(stmt)).scalar_one()
+    return await _commit_login(db, user)
 
 
-def get_password_user_by_email(db: Session, *, email: str) -> User | None:
+async def get_password_user_by_email(db: AsyncSession, *, email: str) -> User | None:
     stmt = select(User).where(User.provider == "password", User.provider_sub == email)
-    return db.execute(stmt).scalar_one_or_none()
+    return (await db.execute(stmt)).scalar_one_or_none()
 
 
-def create_password_user(db: Session, *, email: str, password: str, name: str | None = None) -> User:
-    existing = get_password_user_by_email(db, email=email)
-    if existing:
-        raise ValueError("User already exists")
-    user = User(
-        provider="password",
-        provider_sub=email,
-        email=email,
-        email_verified=False,
-        name=name,
-        password_hash=hash_password(password),
+async def create_password_user(db: AsyncSession, *, email: str, password_hash: str, name: str | None = None) -> User:
+    """Create a password user and their "user" snapshot in one transaction.
+
+    Raises ValueError if the email is taken (the insert is a no-op then).
+    """
+    # `password_hash` is computed by the caller (off the request thread, see core.security).
+    stmt = (
+        sqlite_insert(User)
+        .values(
+            provider="password",
+            provider_sub=email,
+            email=email,
+            email_verified=False,
+            name=name,
+            password_hash=password_hash,
+        )
+        .on_conflict_do_nothing(index_elements=[User.provider, User.provider_sub])
+        .returning(User)
     )
-    db.add(user)
-    db.commit()
-    db.refresh(user)
-    return user
+    user = (await db.execute(stmt)).scalar_one_or_none()
+    if user is None:
+        await db.rollback()
+        raise ValueError("User already exists")
+    return await _commit_login(db, user)
 
 
-def check_password_user(db: Session, *, email: str, password: str) -> User | None:
-    user = get_password_user_by_email(db, email=email)
-    if user is None:
-        return None
-    if not verify_password(password, user.password_hash):
-        return None
-    # update last_login_at
-    from datetime import datetime, timezone
-    user.last_login_at = datetime.now(timezone.utc)
-    db.commit()
-    db.refresh(user)
+async def record_password_login(db: AsyncSession, *, user: User) -> User:
+    # Called after the password was verified; update last_login_at.
+    stmt = (
+        update(User)
+        .where(User.id == user.id)
+        .values(last_login_at=datetime.now(timezone.utc))
+        .returning(User)
+        .execution_options(populate_existing=True)
+    )
+    user = (await db.execute(stmt)).scalar_one()
+    await db.commit()
+    user_cache.invalidate(user.id)
     return user
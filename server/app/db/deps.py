@@ -1,11 +1,19 @@
 from __future__ import annotations
 
-from collections.abc import Generator
+from collections.abc import AsyncGenerator, Generator
 
-from app.db.session import SessionLocal
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
 
+from app.db.session import AsyncSessionLocal, SessionLocal
 
-def get_db() -> Generator:
+
+async def get_db() -> AsyncGenerator[AsyncSession, None]:
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+def get_sync_db() -> Generator[Session, None, None]:
     db = SessionLocal()
     try:
         yield db
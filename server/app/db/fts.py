@@ -0,0 +1,19 @@
+from __future__ import annotations
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+
+def rebuild_notes_fts(conn: Connection) -> None:
+    """Re-index every row of `notes` (safe to run at any time)."""
+    conn.execute(text("INSERT INTO notes_fts(notes_fts) VALUES ('rebuild')"))
+
+
+def to_match_query(q: str) -> str:
+    """Turn free text into a safe FTS5 MATCH expression.
+
+    Each whitespace-separated term is quoted (so FTS5 operators and punctuation in
+    user input can't cause syntax errors) and prefix-matched; terms are ANDed.
+    """
+    terms = [t.replace('"', '""') for t in q.split() if t.strip('"')]
+    return " ".join(f'"{t}"*' for t in terms)
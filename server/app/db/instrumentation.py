@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+import time
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+from app.core.metrics import current_timings, record_pool_wait, record_query
+
+
+class _TimedCheckout:
+    """Pool mixin timing how long `connect()` waits for a connection.
+
+    Includes opening a new connection when the pool has room, and queueing for a
+    free one when it doesn't.
+    """
+
+    metrics_engine = "sync"
+
+    def _do_get(self):
+        t0 = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            record_pool_wait(self.metrics_engine, time.perf_counter() - t0)
+
+
+class TimedQueuePool(_TimedCheckout, QueuePool):
+    metrics_engine = "sync"
+
+
+class TimedAsyncAdaptedQueuePool(_TimedCheckout, AsyncAdaptedQueuePool):
+    metrics_engine = "async"
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    starts = conn.info.get("query_start")
+    if starts:
+        record_query(time.perf_counter() - starts.pop())
+
+
+def _handle_error(exception_context) -> None:
+    conn = exception_context.connection
+    if conn is not None and conn.info.get("query_start"):
+        conn.info["query_start"].pop()
+
+
+def instrument_queries(engine: Engine) -> None:
+    """Count and time every SQL statement run through `engine`."""
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(engine, "handle_error", _handle_error)
+
+
+def _before_commit(session: Session) -> None:
+    session.info["commit_start"] = time.perf_counter()
+
+
+def _after_commit(session: Session) -> None:
+    t0 = session.info.pop("commit_start", None)
+    timings = current_timings()
+    if t0 is not None and timings is not None:
+        timings.spans["commit"] = timings.spans.get("commit", 0.0) + (time.perf_counter() - t0)
+
+
+def instrument_commits() -> None:
+    """Report ORM session commits (flush + COMMIT) as a `commit` Server-Timing span."""
+    if not event.contains(Session, "before_commit", _before_commit):
+        event.listen(Session, "before_commit", _before_commit)
+        event.listen(Session, "after_commit", _after_commit)
@@ -0,0 +1,110 @@
+"""Versioned schema migrations for the SQLite database.
+
+Migrations live in `app/db/migrations/versions/` as modules named `vNNNN_<slug>.py`,
+each exposing `upgrade(conn)`. They run in version order, each in its own
+transaction that also records the new version in `schema_version`. On startup
+`upgrade()` costs one `SELECT` when the database is already at head. Pending
+migrations are applied under a file lock next to the database, so several server
+processes starting together migrate it once.
+"""
+from __future__ import annotations
+
+import importlib
+import logging
+import pkgutil
+import re
+from contextlib import nullcontext
+from dataclasses import dataclass
+from types import ModuleType
+from typing import Callable
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.exc import OperationalError
+
+from app.core.filelock import file_lock, lock_path_for
+from app.db.migrations import versions as _versions_pkg
+
+
+logger = logging.getLogger(__name__)
+
+_MODULE_RE = re.compile(r"^v(\d{4})_([a-z0-9_]+)$")
+
+
+@dataclass(frozen=True)
+class Migration:
+    version: int
+    name: str
+    upgrade: Callable[[Connection], None]
+
+
+def _load(module: ModuleType, version: int, name: str) -> Migration:
+    upgrade_fn = getattr(module, "upgrade", None)
+    if not callable(upgrade_fn):
+        raise RuntimeError(f"Migration {module.__name__} has no upgrade(conn)")
+    return Migration(version=version, name=name, upgrade=upgrade_fn)
+
+
+def discover() -> list[Migration]:
+    migrations: list[Migration] = []
+    for info in pkgutil.iter_modules(_versions_pkg.__path__):
+        match = _MODULE_RE.match(info.name)
+        if not match:
+            continue
+        module = importlib.import_module(f"{_versions_pkg.__name__}.{info.name}")
+        migrations.append(_load(module, int(match.group(1)), match.group(2)))
+    migrations.sort(key=lambda m: m.version)
+
+    expected = list(range(1, len(migrations) + 1))
+    if [m.version for m in migrations] != expected:
+        raise RuntimeError(f"Migration versions must be contiguous from 1, got {[m.version for m in migrations]}")
+    return migrations
+
+
+def head_version() -> int:
+    migrations = discover()
+    return migrations[-1].version if migrations else 0
+
+
+def current_version(conn: Connection) -> int:
+    try:
+        row = conn.execute(text("SELECT version FROM schema_version")).first()
+    except OperationalError:
+        # No schema_version table yet: brand-new or pre-migrations database.
+        return 0
+    return int(row[0]) if row else 0
+
+
+def _set_version(conn: Connection, version: int) -> None:
+    conn.execute(text("CREATE TABLE IF NOT EXISTS schema_version (version INTEGER NOT NULL)"))
+    updated = conn.execute(text("UPDATE schema_version SET version = :v"), {"v": version})
+    if updated.rowcount == 0:
+        conn.execute(text("INSERT INTO schema_version (version) VALUES (:v)"), {"v": version})
+
+
+def upgrade(engine: Engine, *, target: int | None = None) -> list[Migration]:
+    """Apply pending migrations up to `target` (default: head). Returns what ran."""
+    with engine.connect() as conn:
+        current = current_version(conn)
+
+    migrations = discover()
+    head = migrations[-1].version if migrations else 0
+    target = head if target is None else target
+    if not any(current < m.version <= target for m in migrations):
+        return []
+
+    lock_path = lock_path_for(engine.url.database, ".migrate.lock")
+    applied: list[Migration] = []
+    with file_lock(lock_path) if lock_path is not None else nullcontext():
+        # Another process may have migrated while we waited for the lock.
+        with engine.connect() as conn:
+            current = current_version(conn)
+        for migration in [m for m in migrations if current < m.version <= target]:
+            with engine.begin() as conn:
+                if current_version(conn) >= migration.version:
+                    continue
+                logger.info("Applying migration %04d_%s", migration.version, migration.name)
+                migration.upgrade(conn)
+                _set_version(conn, migration.version)
+            applied.append(migration)
+    return applied
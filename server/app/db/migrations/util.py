@@ -0,0 +1,19 @@
+from __future__ import annotations
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+
+# Introspection helpers for migrations. They only run while a migration is being
+# applied, never on a normal startup.
+
+
+def table_columns(conn: Connection, table: str) -> set[str]:
+    rows = conn.execute(text(f"PRAGMA table_info({table})")).fetchall()
+    return {row[1] for row in rows}  # row[1] = name
+
+
+def add_column(conn: Connection, table: str, column: str, ddl: str) -> None:
+    """`ALTER TABLE ... ADD COLUMN` unless the column already exists."""
+    if column not in table_columns(conn, table):
+        conn.execute(text(f"ALTER TABLE {table} ADD COLUMN {column} {ddl}"))
@@ -0,0 +1,78 @@
+"""Baseline schema: users, notes, user_data.
+
+Also upgrades databases created before migrations existed, which may lack
+columns that were added ad hoc over time.
+"""
+from __future__ import annotations
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+from app.db.migrations.util import add_column
+
+
+STATEMENTS = [
+    """
+    CREATE TABLE IF NOT EXISTS users (
+        id INTEGER NOT NULL,
+        provider VARCHAR(50) NOT NULL,
+        provider_sub VARCHAR(255) NOT NULL,
+        email VARCHAR(320),
+        email_verified BOOLEAN NOT NULL,
+        password_hash VARCHAR(512),
+        name VARCHAR(255),
+        given_name VARCHAR(255),
+        family_name VARCHAR(255),
+        picture VARCHAR(2048),
+        locale VARCHAR(32),
+        created_at DATETIME DEFAULT CURRENT_TIMESTAMP NOT NULL,
+        updated_at DATETIME DEFAULT CURRENT_TIMESTAMP NOT NULL,
+        last_login_at DATETIME,
+        PRIMARY KEY (id),
+        CONSTRAINT uq_users_provider_sub UNIQUE (provider, provider_sub)
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS ix_users_email ON users (email)",
+    "CREATE INDEX IF NOT EXISTS ix_users_id ON users (id)",
+    "CREATE INDEX IF NOT EXISTS ix_users_provider ON users (provider)",
+    "CREATE INDEX IF NOT EXISTS ix_users_provider_sub ON users (provider_sub)",
+    """
+    CREATE TABLE IF NOT EXISTS notes (
+        id INTEGER NOT NULL,
+        user_id INTEGER,
+        title VARCHAR(200) NOT NULL,
+        content VARCHAR(4000) NOT NULL,
+        created_at DATETIME DEFAULT CURRENT_TIMESTAMP NOT NULL,
+        PRIMARY KEY (id),
+        FOREIGN KEY(user_id) REFERENCES users (id)
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS ix_notes_id ON notes (id)",
+    """
+    CREATE TABLE IF NOT EXISTS user_data (
+        id INTEGER NOT NULL,
+        user_id INTEGER NOT NULL,
+        "key" VARCHAR(100) NOT NULL,
+        value_json TEXT NOT NULL,
+        created_at DATETIME DEFAULT CURRENT_TIMESTAMP NOT NULL,
+        updated_at DATETIME DEFAULT CURRENT_TIMESTAMP NOT NULL,
+        PRIMARY KEY (id),
+        CONSTRAINT uq_user_data_user_key UNIQUE (user_id, "key"),
+        FOREIGN KEY(user_id) REFERENCES users (id)
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS ix_user_data_id ON user_data (id)",
+    "CREATE INDEX IF NOT EXISTS ix_user_data_user_id ON user_data (user_id)",
+]
+
+
+def upgrade(conn: Connection) -> None:
+    for statement in STATEMENTS:
+        conn.execute(text(statement))
+
+    # Columns that older local databases may be missing.
+    add_column(conn, "users", "last_login_at", "DATETIME")
+    add_column(conn, "users", "password_hash", "TEXT")
+    add_column(conn, "notes", "user_id", "INTEGER")
+    # The index on notes.user_id can only exist once the column does.
+    conn.execute(text("CREATE INDEX IF NOT EXISTS ix_notes_user_id ON notes (user_id)"))
@@ -0,0 +1,9 @@
+"""Composite (user_id, id) index for keyset pagination of notes."""
+from __future__ import annotations
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+
+def upgrade(conn: Connection) -> None:
+    conn.execute(text("CREATE INDEX IF NOT EXISTS ix_notes_user_id_id ON notes (user_id, id)"))
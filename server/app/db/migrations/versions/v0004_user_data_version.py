@@ -0,0 +1,10 @@
+"""Per-row version counter on user_data for optimistic concurrency."""
+from __future__ import annotations
+
+from sqlalchemy.engine import Connection
+
+from app.db.migrations.util import add_column
+
+
+def upgrade(conn: Connection) -> None:
+    add_column(conn, "user_data", "version", "INTEGER NOT NULL DEFAULT 1")
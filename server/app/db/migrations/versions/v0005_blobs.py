@@ -0,0 +1,23 @@
+"""Metadata table for the content-addressed blob store (avatars and other uploads)."""
+from __future__ import annotations
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+
+def upgrade(conn: Connection) -> None:
+    conn.execute(
+        text(
+            """
+            CREATE TABLE IF NOT EXISTS blobs (
+                id VARCHAR(64) NOT NULL,
+                content_type VARCHAR(100) NOT NULL,
+                size INTEGER NOT NULL,
+                created_by INTEGER,
+                created_at DATETIME DEFAULT CURRENT_TIMESTAMP NOT NULL,
+                PRIMARY KEY (id),
+                FOREIGN KEY(created_by) REFERENCES users (id)
+            )
+            """
+        )
+    )
@@ -0,0 +1,28 @@
+"""Per-user change sequence on user_data, for the incremental change feed."""
+from __future__ import annotations
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+from app.db.migrations.util import add_column
+
+
+def upgrade(conn: Connection) -> None:
+    add_column(conn, "user_data", "change_seq", "INTEGER NOT NULL DEFAULT 0")
+    # Number existing rows per user in write order.
+    conn.execute(
+        text(
+            """
+            UPDATE user_data SET change_seq = (
+                SELECT ranked.rn FROM (
+                    SELECT id, ROW_NUMBER() OVER (PARTITION BY user_id ORDER BY updated_at, id) AS rn
+                    FROM user_data
+                ) AS ranked
+                WHERE ranked.id = user_data.id
+            )
+            """
+        )
+    )
+    conn.execute(
+        text("CREATE INDEX IF NOT EXISTS ix_user_data_user_id_change_seq ON user_data (user_id, change_seq)")
+    )
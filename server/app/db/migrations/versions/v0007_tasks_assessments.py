@@ -0,0 +1,173 @@
+"""Tasks and assessments as tables, moved out of the `tasks`/`assessments` user-data blobs.
+
+Each blob item becomes a row. A blob is deleted once all of its items are
+copied; a blob holding an item that can't be converted (no title or topic, or
+no usable date) is left in place, untouched, and logged.
+"""
+from __future__ import annotations
+
+import datetime as dt
+import json
+import logging
+import re
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+
+logger = logging.getLogger(__name__)
+
+STATEMENTS = [
+    """
+    CREATE TABLE IF NOT EXISTS tasks (
+        id INTEGER NOT NULL,
+        user_id INTEGER NOT NULL,
+        title VARCHAR(200) NOT NULL,
+        description VARCHAR(4000),
+        date DATE NOT NULL,
+        start_time VARCHAR(5),
+        end_time VARCHAR(5),
+        priority VARCHAR(10) DEFAULT 'Medium' NOT NULL,
+        progress INTEGER DEFAULT 0 NOT NULL,
+        completed_on DATE,
+        category VARCHAR(50),
+        repeat VARCHAR(10),
+        created_at DATETIME DEFAULT CURRENT_TIMESTAMP NOT NULL,
+        updated_at DATETIME DEFAULT CURRENT_TIMESTAMP NOT NULL,
+        PRIMARY KEY (id),
+        FOREIGN KEY(user_id) REFERENCES users (id)
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS ix_tasks_user_id_date ON tasks (user_id, date)",
+    """
+    CREATE TABLE IF NOT EXISTS assessments (
+        id INTEGER NOT NULL,
+        user_id INTEGER NOT NULL,
+        topic VARCHAR(200) NOT NULL,
+        subjects JSON NOT NULL,
+        date DATE NOT NULL,
+        start_time VARCHAR(5),
+        end_time VARCHAR(5),
+        priority VARCHAR(10) DEFAULT 'Medium' NOT NULL,
+        alert BOOLEAN DEFAULT 1 NOT NULL,
+        created_at DATETIME DEFAULT CURRENT_TIMESTAMP NOT NULL,
+        updated_at DATETIME DEFAULT CURRENT_TIMESTAMP NOT NULL,
+        PRIMARY KEY (id),
+        FOREIGN KEY(user_id) REFERENCES users (id)
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS ix_assessments_user_id_date ON assessments (user_id, date)",
+]
+
+_TIME_RE = re.compile(r"^([01]\d|2[0-3]):[0-5]\d$")
+_PRIORITIES = {"Low", "Medium", "High"}
+_REPEATS = {"daily", "weekly", "none"}
+
+_INSERT_TASK = text(
+    """
+    INSERT INTO tasks (user_id, title, description, date, start_time, end_time,
+                       priority, progress, completed_on, category, repeat)
+    VALUES (:user_id, :title, :description, :date, :start_time, :end_time,
+            :priority, :progress, :completed_on, :category, :repeat)
+    """
+)
+
+_INSERT_ASSESSMENT = text(
+    """
+    INSERT INTO assessments (user_id, topic, subjects, date, start_time, end_time, priority, alert)
+    VALUES (:user_id, :topic, :subjects, :date, :start_time, :end_time, :priority, :alert)
+    """
+)
+
+
+def _day(value: object) -> str | None:
+    # The client stored "YYYY-MM-DD", and older builds a full ISO timestamp.
+    if not isinstance(value, str):
+        return None
+    try:
+        return dt.date.fromisoformat(value[:10]).isoformat()
+    except ValueError:
+        return None
+
+
+def _text(value: object, max_length: int) -> str | None:
+    if not isinstance(value, str) or not value.strip():
+        return None
+    return value[:max_length]
+
+
+def _time(value: object) -> str | None:
+    return value if isinstance(value, str) and _TIME_RE.match(value) else None
+
+
+def _priority(value: object) -> str:
+    return value if value in _PRIORITIES else "Medium"
+
+
+def _task_row(user_id: int, item: object) -> dict | None:
+    if not isinstance(item, dict):
+        return None
+    title, date = _text(item.get("title"), 200), _day(item.get("date"))
+    if title is None or date is None:
+        return None
+    progress = item.get("progress")
+    progress = min(100, max(0, round(progress))) if isinstance(progress, (int, float)) else 0
+    return {
+        "user_id": user_id,
+        "title": title,
+        "description": _text(item.get("description"), 4000),
+        "date": date,
+        "start_time": _time(item.get("startTime")),
+        "end_time": _time(item.get("endTime")),
+        "priority": _priority(item.get("priority")),
+        "progress": progress,
+        "completed_on": _day(item.get("completedOn")),
+        "category": _text(item.get("category"), 50),
+        "repeat": item.get("repeat") if item.get("repeat") in _REPEATS else None,
+    }
+
+
+def _assessment_row(user_id: int, item: object) -> dict | None:
+    if not isinstance(item, dict):
+        return None
+    topic, date = _text(item.get("topic"), 200), _day(item.get("date"))
+    if topic is None or date is None:
+        return None
+    subjects = item.get("subjects")
+    subjects = [s[:50] for s in subjects if isinstance(s, str) and s] if isinstance(subjects, list) else []
+    alert = item.get("alert")
+    return {
+        "user_id": user_id,
+        "topic": topic,
+        "subjects": json.dumps(subjects[:50]),
+        "date": date,
+        "start_time": _time(item.get("startTime")),
+        "end_time": _time(item.get("endTime")),
+        "priority": _priority(item.get("priority")),
+        "alert": alert if isinstance(alert, bool) else True,
+    }
+
+
+def _move_out(conn: Connection, key: str, to_row, insert) -> None:
+    blobs = conn.execute(
+        text('SELECT id, user_id, value_json FROM user_data WHERE "key" = :key'), {"key": key}
+    ).fetchall()
+    for blob_id, user_id, value_json in blobs:
+        try:
+            items = json.loads(value_json)
+        except ValueError:
+            items = None
+        rows = [to_row(user_id, item) for item in items] if isinstance(items, list) else [None]
+        if any(row is None for row in rows):
+            logger.warning("Kept user_data %r for user %s: it has items that can't be converted", key, user_id)
+            continue
+        if rows:
+            conn.execute(insert, rows)
+        conn.execute(text("DELETE FROM user_data WHERE id = :id"), {"id": blob_id})
+
+
+def upgrade(conn: Connection) -> None:
+    for statement in STATEMENTS:
+        conn.execute(text(statement))
+    _move_out(conn, "tasks", _task_row, _INSERT_TASK)
+    _move_out(conn, "assessments", _assessment_row, _INSERT_ASSESSMENT)
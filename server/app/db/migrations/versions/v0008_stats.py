@@ -0,0 +1,73 @@
+"""Dashboard statistics tables (user_stats, task_days, streak_runs), backfilled from tasks."""
+from __future__ import annotations
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+
+STATEMENTS = [
+    """
+    CREATE TABLE IF NOT EXISTS user_stats (
+        user_id INTEGER NOT NULL,
+        tasks_total INTEGER DEFAULT 0 NOT NULL,
+        tasks_completed INTEGER DEFAULT 0 NOT NULL,
+        assessments_total INTEGER DEFAULT 0 NOT NULL,
+        updated_at DATETIME DEFAULT CURRENT_TIMESTAMP NOT NULL,
+        PRIMARY KEY (user_id),
+        FOREIGN KEY(user_id) REFERENCES users (id)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS task_days (
+        user_id INTEGER NOT NULL,
+        day DATE NOT NULL,
+        completed INTEGER NOT NULL,
+        PRIMARY KEY (user_id, day),
+        FOREIGN KEY(user_id) REFERENCES users (id)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS streak_runs (
+        id INTEGER NOT NULL,
+        user_id INTEGER NOT NULL,
+        start_day DATE NOT NULL,
+        end_day DATE NOT NULL,
+        length INTEGER NOT NULL,
+        PRIMARY KEY (id),
+        FOREIGN KEY(user_id) REFERENCES users (id)
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS ix_streak_runs_user_id_start_day ON streak_runs (user_id, start_day)",
+    "CREATE INDEX IF NOT EXISTS ix_streak_runs_user_id_end_day ON streak_runs (user_id, end_day)",
+    "CREATE INDEX IF NOT EXISTS ix_streak_runs_user_id_length ON streak_runs (user_id, length)",
+    # Backfill; the same result as app.db.stats.rebuild_stats at this version.
+    """
+    INSERT INTO user_stats (user_id, tasks_total, tasks_completed, assessments_total)
+    SELECT user_id, sum(tasks), sum(completed), sum(assessments) FROM (
+        SELECT user_id, 1 AS tasks, progress >= 100 AS completed, 0 AS assessments FROM tasks
+        UNION ALL
+        SELECT user_id, 0, 0, 1 FROM assessments
+    )
+    GROUP BY user_id
+    """,
+    """
+    INSERT INTO task_days (user_id, day, completed)
+    SELECT user_id, date, count(*) FROM tasks
+    WHERE progress >= 100
+    GROUP BY user_id, date
+    """,
+    # Consecutive days share `julianday(day) - row number`, so each group is one run.
+    """
+    INSERT INTO streak_runs (user_id, start_day, end_day, length)
+    SELECT user_id, min(day), max(day), count(*) FROM (
+        SELECT user_id, day, julianday(day) - row_number() OVER (PARTITION BY user_id ORDER BY day) AS run
+        FROM task_days
+    )
+    GROUP BY user_id, run
+    """,
+]
+
+
+def upgrade(conn: Connection) -> None:
+    for statement in STATEMENTS:
+        conn.execute(text(statement))
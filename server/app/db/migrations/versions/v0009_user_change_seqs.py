@@ -0,0 +1,28 @@
+"""Per-user change-number counter, so writes no longer scan for MAX(change_seq)."""
+from __future__ import annotations
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+
+def upgrade(conn: Connection) -> None:
+    conn.execute(
+        text(
+            """
+            CREATE TABLE IF NOT EXISTS user_change_seqs (
+                user_id INTEGER NOT NULL,
+                seq INTEGER DEFAULT 0 NOT NULL,
+                PRIMARY KEY (user_id),
+                FOREIGN KEY(user_id) REFERENCES users (id)
+            )
+            """
+        )
+    )
+    conn.execute(
+        text(
+            """
+            INSERT OR REPLACE INTO user_change_seqs (user_id, seq)
+            SELECT user_id, MAX(change_seq) FROM user_data GROUP BY user_id
+            """
+        )
+    )
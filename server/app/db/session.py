@@ -2,13 +2,20 @@ from __future__ import annotations
 
 from pathlib import Path
 
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
 
 from app.core.config import settings
+from app.db.instrumentation import (
+    TimedAsyncAdaptedQueuePool,
+    TimedQueuePool,
+    instrument_commits,
+    instrument_queries,
+)
 
 
-def _sqlite_url() -> str:
+def _sqlite_path() -> Path:
     # Resolve DB path relative to the `server/` folder (portable across CWDs)
     server_dir = Path(__file__).resolve().parents[2]
     configured = Path(settings.sqlite_path)
@@ -17,14 +24,82 @@ def _sqlite_url() -> str:
     # Ensure parent dir exists if user points to a nested path
     if db_path.parent and str(db_path.parent) not in (".", ""):
         db_path.parent.mkdir(parents=True, exist_ok=True)
+    return db_path
+
+
+def _sqlite_url(*, driver: str = "") -> str:
+    # `driver` selects the DBAPI, e.g. "aiosqlite" for the async engine.
+    scheme = f"sqlite+{driver}" if driver else "sqlite"
+    return f"{scheme}:///{_sqlite_path().as_posix()}"
+
+
+_ALLOWED_PRAGMA_VALUES = {
+    "journal_mode": {"DELETE", "TRUNCATE", "PERSIST", "MEMORY", "WAL", "OFF"},
+    "synchronous": {"OFF", "NORMAL", "FULL", "EXTRA"},
+    "temp_store": {"DEFAULT", "FILE", "MEMORY"},
+}
+
+
+def _sqlite_pragmas() -> list[tuple[str, str | int]]:
+    pragmas: list[tuple[str, str | int]] = [
+        ("journal_mode", settings.sqlite_journal_mode),
+        ("synchronous", settings.sqlite_synchronous),
+        ("temp_store", settings.sqlite_temp_store),
+    ]
+    for name, value in pragmas:
+        if str(value).upper() not in _ALLOWED_PRAGMA_VALUES[name]:
+            raise ValueError(f"Invalid SQLite {name}: {value!r}")
+    pragmas += [
+        ("busy_timeout", int(settings.sqlite_busy_timeout_ms)),
+        ("cache_size", int(settings.sqlite_cache_size)),
+        ("mmap_size", int(settings.sqlite_mmap_size)),
+    ]
+    return pragmas
 
-    # `check_same_thread=False` allows using the same connection in different threads (FastAPI typical)
-    return f"sqlite:///{db_path.as_posix()}"
 
+def _apply_sqlite_pragmas(dbapi_connection, _connection_record) -> None:
+    cursor = dbapi_connection.cursor()
+    try:
+        for name, value in _sqlite_pragmas():
+            cursor.execute(f"PRAGMA {name}={value}")
+    finally:
+        cursor.close()
 
+
+def _pool_kwargs() -> dict:
+    return {
+        "pool_size": settings.sqlite_pool_size,
+        "max_overflow": settings.sqlite_max_overflow,
+        "pool_timeout": settings.sqlite_pool_timeout,
+    }
+
+
+# Sync stack: startup schema setup, CLI tools and benchmarks.
+# `check_same_thread=False` allows using the same connection in different threads (FastAPI typical)
 engine = create_engine(
     _sqlite_url(),
     connect_args={"check_same_thread": False},
+    **_pool_kwargs(),
+    **({"poolclass": TimedQueuePool} if settings.metrics_pool_wait else {}),
 )
+event.listen(engine, "connect", _apply_sqlite_pragmas)
+
+# `expire_on_commit=False`: sessions are request-scoped, and expiring on commit would
+# force a refresh SELECT for every attribute read after a write (e.g. RETURNING rows).
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False, bind=engine)
+
+# Async stack used by the API routes (aiosqlite runs each connection on its own thread,
+# so a request waiting on SQLite no longer occupies a threadpool worker).
+async_engine = create_async_engine(
+    _sqlite_url(driver="aiosqlite"),
+    **_pool_kwargs(),
+    **({"poolclass": TimedAsyncAdaptedQueuePool} if settings.metrics_pool_wait else {}),
+)
+event.listen(async_engine.sync_engine, "connect", _apply_sqlite_pragmas)
+
+if settings.metrics_db_queries:
+    instrument_queries(engine)
+    instrument_queries(async_engine.sync_engine)
+    instrument_commits()
 
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
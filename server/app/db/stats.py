@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+import datetime as dt
+from itertools import groupby
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+
+def _runs(days: list[dt.date]) -> list[tuple[dt.date, dt.date]]:
+    # Sorted days -> (start, end) of each stretch of consecutive days.
+    runs: list[tuple[dt.date, dt.date]] = []
+    for day in days:
+        if runs and runs[-1][1] + dt.timedelta(days=1) == day:
+            runs[-1] = (runs[-1][0], day)
+        else:
+            runs.append((day, day))
+    return runs
+
+
+def rebuild_stats(conn: Connection, *, user_id: int | None = None) -> int:
+    """Recompute stats from `tasks` and `assessments` (all users, or one); safe to run at any time.
+
+    app.crud.stats keeps the tables current on every task and assessment write;
+    this is for repairs. Returns the number of users with stats.
+    """
+    only = "WHERE user_id = :user_id" if user_id is not None else ""
+    params = {"user_id": user_id}
+    for table in ("user_stats", "task_days", "streak_runs"):
+        conn.execute(text(f"DELETE FROM {table} {only}"), params)
+
+    conn.execute(
+        text(
+            f"""
+            INSERT INTO user_stats (user_id, tasks_total, tasks_completed, assessments_total)
+            SELECT user_id, sum(tasks), sum(completed), sum(assessments) FROM (
+                SELECT user_id, 1 AS tasks, progress >= 100 AS completed, 0 AS assessments FROM tasks
+                UNION ALL
+                SELECT user_id, 0, 0, 1 FROM assessments
+            ) {only}
+            GROUP BY user_id
+            """
+        ),
+        params,
+    )
+    conn.execute(
+        text(
+            f"""
+            INSERT INTO task_days (user_id, day, completed)
+            SELECT user_id, date, count(*) FROM tasks
+            WHERE progress >= 100 {"AND user_id = :user_id" if user_id is not None else ""}
+            GROUP BY user_id, date
+            """
+        ),
+        params,
+    )
+
+    rows = conn.execute(text(f"SELECT user_id, day FROM task_days {only} ORDER BY user_id, day"), params)
+    runs = [
+        {"user_id": uid, "start_day": start.isoformat(), "end_day": end.isoformat(), "length": (end - start).days + 1}
+        for uid, group in groupby(rows, key=lambda row: row[0])
+        for start, end in _runs([dt.date.fromisoformat(row[1]) for row in group])
+    ]
+    if runs:
+        conn.execute(
+            text(
+                "INSERT INTO streak_runs (user_id, start_day, end_day, length) "
+                "VALUES (:user_id, :start_day, :end_day, :length)"
+            ),
+            runs,
+        )
+    return conn.execute(text(f"SELECT count(*) FROM user_stats {only}"), params).scalar_one()
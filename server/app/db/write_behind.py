@@ -0,0 +1,305 @@
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import contextvars
+import dataclasses
+import logging
+import time
+from collections.abc import AsyncIterator
+from datetime import datetime, timezone
+from typing import Callable
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.pubsub import Change, user_data_hub
+from app.crud.user_data import get_version, write_versioned
+from app.db.session import AsyncSessionLocal
+
+
+logger = logging.getLogger(__name__)
+
+
+@dataclasses.dataclass
+class PendingWrite:
+    user_id: int
+    key: str
+    value: object
+    # Version the row will have once this value is flushed.
+    version: int
+    updated_at: datetime
+    first_at: float = 0.0
+    last_at: float = 0.0
+
+
+@dataclasses.dataclass
+class _KeyGuard:
+    lock: asyncio.Lock = dataclasses.field(default_factory=asyncio.Lock)
+    holders: int = 0
+
+
+class UserDataWriteBehind:
+    """Coalesce bursts of `PUT /user-data/{key}` into batched transactions.
+
+    Only the latest value per (user_id, key) is kept. An entry is flushed once no
+    write touched it for `debounce_seconds`, or `max_delay_seconds` after its first
+    buffered write (so constant edits still persist), or when `max_pending` keys
+    are buffered. A flush writes every due entry, for any user, in one commit.
+
+    Each buffered write still gets its own version number: the buffer predicts it
+    from the stored version, and the flush writes it explicitly. Reads go through
+    `peek()` first, so a client always sees its own writes. Other write paths must
+    write inside `direct_write()`, so no prediction overlaps their commit and two
+    contents never share a version. Buffered values live only in this process;
+    `close()` flushes them on shutdown, but a crash loses up to `max_delay_seconds`
+    of writes.
+    """
+
+    def __init__(
+        self,
+        *,
+        session_factory: Callable[[], AsyncSession],
+        enabled: bool,
+        debounce_seconds: float,
+        max_delay_seconds: float,
+        max_pending: int,
+    ) -> None:
+        self.session_factory = session_factory
+        self.enabled = enabled
+        self.debounce_seconds = debounce_seconds
+        self.max_delay_seconds = max(max_delay_seconds, debounce_seconds)
+        self.max_pending = max(1, max_pending)
+        self._pending: dict[tuple[int, str], PendingWrite] = {}
+        # Entries being committed; still visible to readers until the commit ends.
+        self._inflight: dict[tuple[int, str], PendingWrite] = {}
+        # Versions committed by recent flushes, for writes whose version lookup
+        # raced a flush of the same key.
+        self._committed = TTLCache(max_entries=4 * self.max_pending, ttl_seconds=60.0)
+        # Held while a version is predicted or a direct write is in progress; only
+        # keys someone is waiting on or holding have an entry.
+        self._guards: dict[tuple[int, str], _KeyGuard] = {}
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._lock: asyncio.Lock | None = None
+        self._wake: asyncio.Event | None = None
+        self._task: asyncio.Task | None = None
+        self.writes = 0
+        self.flushes = 0
+        self.rows_flushed = 0
+        self.errors = 0
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "pending": len(self._pending),
+            "writes": self.writes,
+            "flushes": self.flushes,
+            "rows_flushed": self.rows_flushed,
+            "errors": self.errors,
+        }
+
+    def peek(self, user_id: int, key: str) -> PendingWrite | None:
+        """The buffered (not yet committed) value for a key, if any."""
+        k = (user_id, key)
+        return self._pending.get(k) or self._inflight.get(k)
+
+    async def put(self, *, user_id: int, key: str, value: object) -> PendingWrite:
+        """Buffer a write and return a snapshot of it (with its predicted version)."""
+        self._bind_loop()
+        k = (user_id, key)
+        entry = self._pending.get(k)
+        if entry is None:
+            async with self._guard(k):
+                entry = self._pending.get(k) or self._start_entry(k, await self._stored_version(k))
+
+        entry.value = value
+        entry.version += 1
+        entry.updated_at = _utcnow()
+        entry.last_at = time.monotonic()
+        self.writes += 1
+        # Readers already see buffered values, so announce now rather than at flush.
+        user_data_hub.publish(user_id, Change(key=key, version=entry.version, updated_at=entry.updated_at))
+
+        # Later writes only push deadlines back, so the flusher needs waking only when
+        # the buffer was empty (it sleeps without a timeout then) or is full.
+        if len(self._pending) == 1 or len(self._pending) >= self.max_pending:
+            self._wake.set()
+        return dataclasses.replace(entry)
+
+    @contextlib.asynccontextmanager
+    async def direct_write(self, db: AsyncSession, user_id: int, keys: list[str]) -> AsyncIterator[None]:
+        """Write these keys through `db` (and commit) inside this block, not through the buffer.
+
+        Ends `db`'s current transaction, which must hold no writes, so the caller
+        reads what the flush commits. Then flushes the keys and holds off version
+        predictions for them until the block exits.
+        """
+        if not self.enabled:
+            yield
+            return
+        await db.commit()
+        async with contextlib.AsyncExitStack() as stack:
+            for key in sorted(set(keys)):
+                await stack.enter_async_context(self._guard((user_id, key)))
+            await self.flush_keys(user_id, keys)
+            yield
+
+    async def flush_keys(self, user_id: int, keys: list[str]) -> None:
+        """Commit any buffered values for these keys (and wait out an in-flight flush)."""
+        if self._lock is None:
+            return
+        async with self._lock:
+            await self._flush([(user_id, key) for key in keys])
+
+    async def flush_user(self, user_id: int) -> None:
+        """Commit every buffered (or in-flight) value of one user."""
+        keys = [key for uid, key in [*self._pending, *self._inflight] if uid == user_id]
+        if keys:
+            await self.flush_keys(user_id, keys)
+
+    async def flush_all(self) -> None:
+        if self._lock is None:
+            return
+        async with self._lock:
+            await self._flush(list(self._pending))
+
+    async def close(self) -> None:
+        """Stop the background flusher and commit everything still buffered."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush_all()
+
+    def _bind_loop(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._loop is loop and self._task is not None and not self._task.done():
+            return
+        if self._loop is not loop:
+            self._lock = asyncio.Lock()
+            self._wake = asyncio.Event()
+            self._loop = loop
+        # Fresh context: the flusher must not inherit (and report into) the
+        # per-request state of whichever request happened to start it.
+        self._task = loop.create_task(self._run(), context=contextvars.Context())
+
+    async def _stored_version(self, k: tuple[int, str]) -> int:
+        inflight = self._inflight.get(k)
+        if inflight is not None:
+            return inflight.version
+        # A fresh session: the caller's may hold a snapshot older than the last direct write.
+        async with self.session_factory() as db:
+            meta = await get_version(db, user_id=k[0], key=k[1])
+        base = meta[1] if meta else 0
+        # Another request may have buffered and flushed this key meanwhile.
+        inflight = self._inflight.get(k)
+        return max(base, inflight.version if inflight else 0, self._committed.get(k) or 0)
+
+    def _start_entry(self, k: tuple[int, str], base: int) -> PendingWrite:
+        entry = PendingWrite(k[0], k[1], None, base, _utcnow(), first_at=time.monotonic())
+        self._pending[k] = entry
+        return entry
+
+    @contextlib.asynccontextmanager
+    async def _guard(self, k: tuple[int, str]) -> AsyncIterator[None]:
+        guard = self._guards.get(k)
+        if guard is None:
+            guard = self._guards[k] = _KeyGuard()
+        guard.holders += 1
+        try:
+            async with guard.lock:
+                yield
+        finally:
+            guard.holders -= 1
+            if guard.holders == 0:
+                del self._guards[k]
+
+    def _due(self, now: float) -> list[tuple[int, str]]:
+        if len(self._pending) >= self.max_pending:
+            return list(self._pending)
+        return [
+            k
+            for k, e in self._pending.items()
+            if now - e.last_at >= self.debounce_seconds or now - e.first_at >= self.max_delay_seconds
+        ]
+
+    def _next_deadline(self, now: float) -> float | None:
+        if not self._pending:
+            return None
+        soonest = min(
+            min(e.last_at + self.debounce_seconds, e.first_at + self.max_delay_seconds)
+            for e in self._pending.values()
+        )
+        return max(0.0, soonest - now)
+
+    async def _run(self) -> None:
+        while True:
+            timeout = self._next_deadline(time.monotonic())
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            async with self._lock:
+                ok = await self._flush(self._due(time.monotonic()))
+            if not ok:
+                # Don't spin on a failing database; failed entries stay buffered.
+                await asyncio.sleep(max(self.debounce_seconds, 0.5))
+
+    async def _flush(self, keys: list[tuple[int, str]]) -> bool:
+        batch = {k: self._pending.pop(k) for k in keys if k in self._pending}
+        if not batch:
+            return True
+        self._inflight.update(batch)
+        try:
+            async with self.session_factory() as db:
+                await write_versioned(
+                    db,
+                    rows=[
+                        {
+                            "user_id": e.user_id,
+                            "key": e.key,
+                            "value": e.value,
+                            "version": e.version,
+                            "updated_at": e.updated_at,
+                        }
+                        for e in batch.values()
+                    ],
+                )
+        except Exception:
+            self.errors += 1
+            logger.exception("user-data write-behind flush failed (%d rows kept for retry)", len(batch))
+            for k, e in batch.items():
+                # A newer buffered write already supersedes the failed one.
+                self._pending.setdefault(k, e)
+            return False
+        else:
+            self.flushes += 1
+            self.rows_flushed += len(batch)
+            for k, e in batch.items():
+                self._committed.set(k, e.version)
+            return True
+        finally:
+            for k, e in batch.items():
+                if self._inflight.get(k) is e:
+                    del self._inflight[k]
+
+
+def _utcnow() -> datetime:
+    # Naive UTC, matching what SQLite's CURRENT_TIMESTAMP reads back as.
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+user_data_writer = UserDataWriteBehind(
+    session_factory=AsyncSessionLocal,
+    # Buffered values are only visible to the process holding them, and an unset
+    # WEB_CONCURRENCY says nothing about siblings (`uvicorn --workers N`).
+    enabled=settings.user_data_write_behind and settings.web_concurrency == 1,
+    debounce_seconds=settings.user_data_write_debounce_seconds,
+    max_delay_seconds=settings.user_data_write_max_delay_seconds,
+    max_pending=settings.user_data_write_max_pending,
+)
@@ -1,59 +1,75 @@
 from __future__ import annotations
 
-from fastapi import FastAPI
+from fastapi import Depends, FastAPI
+from fastapi.datastructures import Default
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 
+from app.api.deps import require_metrics_token
 from app.api.v1.router import api_router
+from app.core.compression import CompressionMiddleware
 from app.core.config import settings
-from app.db.base import Base
-from app.db.session import engine
+from app.core.fastjson import FastJSONResponse
+from app.core.google import google_verifier
+from app.core.metrics import MetricsMiddleware, render_metrics
+from app.core.security import hashing_executor
+from app.db import migrations
+from app.db.session import async_engine, engine
+from app.db.write_behind import user_data_writer
+from app.models import blob as _blob  # noqa: F401
 from app.models import note as _note  # noqa: F401
 from app.models import user as _user  # noqa: F401
 from app.models import user_data as _user_data  # noqa: F401
 
 
-def _ensure_sqlite_migrations() -> None:
-    # Minimal migration support for local SQLite: add notes.user_id if missing.
-    from sqlalchemy import text
-
-    with engine.connect() as conn:
-        # users.last_login_at
-        cols = conn.execute(text("PRAGMA table_info(users)"))
-        user_cols = {row[1] for row in cols.fetchall()}
-        if "last_login_at" not in user_cols:
-            conn.execute(text("ALTER TABLE users ADD COLUMN last_login_at DATETIME"))
-            conn.commit()
-
-        # users.password_hash for local accounts
-        cols = conn.execute(text("PRAGMA table_info(users)"))
-        user_cols = {row[1] for row in cols.fetchall()}
-        if "password_hash" not in user_cols:
-            conn.execute(text("ALTER TABLE users ADD COLUMN password_hash TEXT"))
-            conn.commit()
-
-        cols = conn.execute(text("PRAGMA table_info(notes)"))
-        col_names = {row[1] for row in cols.fetchall()}  # row[1] = name
-        if "user_id" not in col_names:
-            conn.execute(text("ALTER TABLE notes ADD COLUMN user_id INTEGER"))
-            conn.commit()
-
-
 def create_app() -> FastAPI:
-    app = FastAPI(title=settings.app_name)
+    # Wrapped in Default() so routes with a response model keep FastAPI's Pydantic
+    # fast path; FastJSONResponse only renders untyped return values.
+    app = FastAPI(title=settings.app_name, default_response_class=Default(FastJSONResponse))
+
+    if settings.compression_enabled:
+        app.add_middleware(
+            CompressionMiddleware,
+            minimum_size=settings.compression_min_size,
+            encodings=settings.compression_encodings_list,
+            content_types=settings.compression_content_types_list,
+            gzip_level=settings.compression_gzip_level,
+            brotli_quality=settings.compression_brotli_quality,
+            zstd_level=settings.compression_zstd_level,
+        )
 
     app.add_middleware(
         CORSMiddleware,
         allow_origins=settings.cors_origins_list,
         allow_credentials=True,
         allow_methods=["*"],
-        allow_headers=["*"]
+        allow_headers=["*"],
+        # Let browser code read validators for conditional requests.
+        expose_headers=["ETag", "Server-Timing"],
     )
 
+    # Outermost, so timings cover CORS and compression too.
+    if settings.metrics_served or settings.server_timing_header:
+        app.add_middleware(
+            MetricsMiddleware,
+            record=settings.metrics_served,
+            server_timing_header=settings.server_timing_header,
+            timing_allow_origins=settings.cors_origins_list,
+        )
+
     @app.on_event("startup")
     def _startup() -> None:
-        # Create tables for a simple SQLite setup.
-        Base.metadata.create_all(bind=engine)
-        _ensure_sqlite_migrations()
+        # Bring the SQLite schema up to date (a single version check when current).
+        migrations.upgrade(engine)
+        hashing_executor.start()
+
+    @app.on_event("shutdown")
+    async def _shutdown() -> None:
+        hashing_executor.shutdown()
+        await google_verifier.close()
+        # Commit buffered user-data writes before the engine goes away.
+        await user_data_writer.close()
+        await async_engine.dispose()
 
     @app.get("/")
     def root() -> dict:
@@ -69,6 +85,17 @@ def create_app() -> FastAPI:
     def health() -> dict:
         return {"status": "ok"}
 
+    if settings.metrics_served:
+
+        @app.get(
+            "/metrics",
+            response_class=PlainTextResponse,
+            include_in_schema=False,
+            dependencies=[Depends(require_metrics_token)],
+        )
+        def metrics() -> PlainTextResponse:
+            return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
+
     app.include_router(api_router, prefix="/api/v1")
     return app
 
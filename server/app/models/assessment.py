@@ -0,0 +1,36 @@
+from __future__ import annotations
+
+import datetime as dt
+
+from sqlalchemy import JSON, Boolean, Date, DateTime, ForeignKey, Index, Integer, String, func
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.base import Base
+
+
+class Assessment(Base):
+    __tablename__ = "assessments"
+    __table_args__ = (
+        # Range queries: WHERE user_id = ? AND date BETWEEN ? AND ? ORDER BY date
+        Index("ix_assessments_user_id_date", "user_id", "date"),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    user_id: Mapped[int] = mapped_column(Integer, ForeignKey("users.id"), nullable=False)
+
+    topic: Mapped[str] = mapped_column(String(200), nullable=False)
+    # JSON array of subject names.
+    subjects: Mapped[list[str]] = mapped_column(JSON, nullable=False, default=list)
+    date: Mapped[dt.date] = mapped_column(Date, nullable=False)
+    # "HH:MM", local to the user.
+    start_time: Mapped[str | None] = mapped_column(String(5), nullable=True)
+    end_time: Mapped[str | None] = mapped_column(String(5), nullable=True)
+    priority: Mapped[str] = mapped_column(String(10), nullable=False, default="Medium", server_default="Medium")
+    alert: Mapped[bool] = mapped_column(Boolean, nullable=False, default=True, server_default="1")
+
+    created_at: Mapped[dt.datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
+    updated_at: Mapped[dt.datetime] = mapped_column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        onupdate=func.now(),
+    )
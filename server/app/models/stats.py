@@ -0,0 +1,51 @@
+from __future__ import annotations
+
+import datetime as dt
+
+from sqlalchemy import Date, DateTime, ForeignKey, Index, Integer, func
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.base import Base
+
+
+# Per-user counters, kept current by the task and assessment write paths.
+class UserStats(Base):
+    __tablename__ = "user_stats"
+
+    user_id: Mapped[int] = mapped_column(Integer, ForeignKey("users.id"), primary_key=True)
+    tasks_total: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
+    tasks_completed: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
+    assessments_total: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
+
+    updated_at: Mapped[dt.datetime] = mapped_column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        onupdate=func.now(),
+    )
+
+
+# Completed tasks per user and task date; only days with at least one are stored.
+class TaskDay(Base):
+    __tablename__ = "task_days"
+
+    user_id: Mapped[int] = mapped_column(Integer, ForeignKey("users.id"), primary_key=True)
+    day: Mapped[dt.date] = mapped_column(Date, primary_key=True)
+    completed: Mapped[int] = mapped_column(Integer, nullable=False)
+
+
+# A maximal run of consecutive days in `task_days`, both ends inclusive.
+class StreakRun(Base):
+    __tablename__ = "streak_runs"
+    __table_args__ = (
+        Index("ix_streak_runs_user_id_start_day", "user_id", "start_day"),
+        Index("ix_streak_runs_user_id_end_day", "user_id", "end_day"),
+        # Longest run: ORDER BY length DESC LIMIT 1
+        Index("ix_streak_runs_user_id_length", "user_id", "length"),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    user_id: Mapped[int] = mapped_column(Integer, ForeignKey("users.id"), nullable=False)
+    start_day: Mapped[dt.date] = mapped_column(Date, nullable=False)
+    end_day: Mapped[dt.date] = mapped_column(Date, nullable=False)
+    # Days in the run, end_day - start_day + 1.
+    length: Mapped[int] = mapped_column(Integer, nullable=False)
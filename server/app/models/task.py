@@ -0,0 +1,38 @@
+from __future__ import annotations
+
+import datetime as dt
+
+from sqlalchemy import Date, DateTime, ForeignKey, Index, Integer, String, func
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.base import Base
+
+
+class Task(Base):
+    __tablename__ = "tasks"
+    __table_args__ = (
+        # Range queries: WHERE user_id = ? AND date BETWEEN ? AND ? ORDER BY date
+        Index("ix_tasks_user_id_date", "user_id", "date"),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    user_id: Mapped[int] = mapped_column(Integer, ForeignKey("users.id"), nullable=False)
+
+    title: Mapped[str] = mapped_column(String(200), nullable=False)
+    description: Mapped[str | None] = mapped_column(String(4000), nullable=True)
+    date: Mapped[dt.date] = mapped_column(Date, nullable=False)
+    # "HH:MM", local to the user.
+    start_time: Mapped[str | None] = mapped_column(String(5), nullable=True)
+    end_time: Mapped[str | None] = mapped_column(String(5), nullable=True)
+    priority: Mapped[str] = mapped_column(String(10), nullable=False, default="Medium", server_default="Medium")
+    progress: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
+    completed_on: Mapped[dt.date | None] = mapped_column(Date, nullable=True)
+    category: Mapped[str | None] = mapped_column(String(50), nullable=True)
+    repeat: Mapped[str | None] = mapped_column(String(10), nullable=True)
+
+    created_at: Mapped[dt.datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
+    updated_at: Mapped[dt.datetime] = mapped_column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        onupdate=func.now(),
+    )
@@ -2,7 +2,7 @@ from __future__ import annotations
 
 from datetime import datetime
 
-from sqlalchemy import DateTime, ForeignKey, Integer, String, Text, UniqueConstraint, func
+from sqlalchemy import DateTime, ForeignKey, Index, Integer, String, Text, UniqueConstraint, func
 from sqlalchemy.orm import Mapped, mapped_column
 
 from app.db.base import Base
@@ -12,6 +12,8 @@ class UserData(Base):
     __tablename__ = "user_data"
     __table_args__ = (
         UniqueConstraint("user_id", "key", name="uq_user_data_user_key"),
+        # Change feed: WHERE user_id = ? AND change_seq > ? ORDER BY change_seq
+        Index("ix_user_data_user_id_change_seq", "user_id", "change_seq"),
     )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
@@ -19,6 +21,10 @@ class UserData(Base):
 
     key: Mapped[str] = mapped_column(String(100), nullable=False)
     value_json: Mapped[str] = mapped_column(Text, nullable=False)
+    # Bumped on every write; used for optimistic concurrency on PATCH.
+    version: Mapped[int] = mapped_column(Integer, nullable=False, default=1, server_default="1")
+    # Position in the user's change feed; every write moves the row to the end.
+    change_seq: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
 
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
     updated_at: Mapped[datetime] = mapped_column(
@@ -26,3 +32,12 @@ class UserData(Base):
         server_default=func.now(),
         onupdate=func.now(),
     )
+
+
+
+# Last change number handed out per user (see UserData.change_seq).
+class UserChangeSeq(Base):
+    __tablename__ = "user_change_seqs"
+
+    user_id: Mapped[int] = mapped_column(Integer, ForeignKey("users.id"), primary_key=True)
+    seq: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
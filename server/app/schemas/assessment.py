@@ -0,0 +1,54 @@
+from __future__ import annotations
+
+import datetime as dt
+from typing import Annotated
+
+from pydantic import BaseModel, Field, field_validator
+
+from app.schemas.task import TIME_PATTERN, Priority
+
+
+Subject = Annotated[str, Field(min_length=1, max_length=50)]
+
+
+class AssessmentCreate(BaseModel):
+    topic: str = Field(min_length=1, max_length=200)
+    subjects: list[Subject] = Field(default_factory=list, max_length=50)
+    date: dt.date
+    start_time: str | None = Field(None, pattern=TIME_PATTERN)
+    end_time: str | None = Field(None, pattern=TIME_PATTERN)
+    priority: Priority = "Medium"
+    alert: bool = True
+
+
+class AssessmentUpdate(BaseModel):
+    """Partial update: only the fields present in the request are changed."""
+
+    topic: str | None = Field(None, min_length=1, max_length=200)
+    subjects: list[Subject] | None = Field(None, max_length=50)
+    date: dt.date | None = None
+    start_time: str | None = Field(None, pattern=TIME_PATTERN)
+    end_time: str | None = Field(None, pattern=TIME_PATTERN)
+    priority: Priority | None = None
+    alert: bool | None = None
+
+    @field_validator("topic", "subjects", "date", "priority", "alert")
+    @classmethod
+    def _not_null(cls, value: object) -> object:
+        # Only runs for fields sent explicitly; these columns can't be cleared.
+        if value is None:
+            raise ValueError("may not be null")
+        return value
+
+
+class AssessmentOut(AssessmentCreate):
+    id: int
+    created_at: dt.datetime
+    updated_at: dt.datetime
+
+    model_config = {"from_attributes": True}
+
+
+class AssessmentList(BaseModel):
+    # Ordered by date, then start time.
+    items: list[AssessmentOut]
@@ -0,0 +1,11 @@
+from __future__ import annotations
+
+from pydantic import BaseModel
+
+
+class BlobOut(BaseModel):
+    id: str
+    # Path relative to the API host, e.g. /api/v1/blobs/<id>; append ?w=128 for a thumbnail.
+    url: str
+    content_type: str
+    size: int
@@ -5,11 +5,19 @@ from datetime import datetime
 from pydantic import BaseModel, Field
 
 
+# Upper bound for notes in a single batch create/delete request.
+MAX_BATCH_NOTES = 500
+
+
 class NoteCreate(BaseModel):
     title: str = Field(min_length=1, max_length=200)
     content: str = Field(min_length=1, max_length=4000)
 
 
+class NoteBatchCreate(BaseModel):
+    notes: list[NoteCreate] = Field(min_length=1, max_length=MAX_BATCH_NOTES)
+
+
 class NoteOut(BaseModel):
     id: int
     user_id: int | None = None
@@ -18,3 +26,31 @@ class NoteOut(BaseModel):
     created_at: datetime
 
     model_config = {"from_attributes": True}
+
+
+class NotePage(BaseModel):
+    items: list[NoteOut]
+    # Pass back as `before_id` (or `after_id` when paging forward); None on the last page.
+    next_cursor: int | None = None
+
+
+class NoteBatchOut(BaseModel):
+    # Same order as the request.
+    items: list[NoteOut]
+
+
+class NoteBatchDeleteOut(BaseModel):
+    # Ids that existed and belonged to the caller; others are ignored.
+    deleted: list[int]
+
+
+class NoteSearchHit(NoteOut):
+    rank: float
+    # HTML-escaped text with matches wrapped in <mark>...</mark>.
+    title_highlight: str
+    snippet: str
+
+
+class NoteSearchPage(BaseModel):
+    items: list[NoteSearchHit]
+    next_offset: int | None = None
@@ -0,0 +1,20 @@
+from __future__ import annotations
+
+from pydantic import BaseModel
+
+
+class StatsOut(BaseModel):
+    tasks_total: int
+    # Tasks with progress 100.
+    tasks_completed: int
+    assessments_total: int
+    # Assessments dated before `today`.
+    assessments_completed: int
+    # Streaks count days of the requested year up to `today` (31 December for other years).
+    # Consecutive days with a completed task, ending on the last such day (0 if it has none).
+    current_streak: int
+    # The run before the current one (or before that last day).
+    previous_streak: int
+    best_streak: int
+    # "YYYY-MM-DD" -> completed tasks dated that day, for the requested year.
+    completed_by_day: dict[str, int]
@@ -0,0 +1,62 @@
+from __future__ import annotations
+
+import datetime as dt
+from typing import Literal
+
+from pydantic import BaseModel, Field, field_validator
+
+
+Priority = Literal["Low", "Medium", "High"]
+Repeat = Literal["daily", "weekly", "none"]
+
+# "HH:MM", 24-hour clock.
+TIME_PATTERN = r"^([01]\d|2[0-3]):[0-5]\d$"
+
+
+class TaskCreate(BaseModel):
+    title: str = Field(min_length=1, max_length=200)
+    description: str | None = Field(None, max_length=4000)
+    date: dt.date
+    start_time: str | None = Field(None, pattern=TIME_PATTERN)
+    end_time: str | None = Field(None, pattern=TIME_PATTERN)
+    priority: Priority = "Medium"
+    progress: int = Field(0, ge=0, le=100)
+    completed_on: dt.date | None = None
+    category: str | None = Field(None, max_length=50)
+    repeat: Repeat | None = None
+
+
+class TaskUpdate(BaseModel):
+    """Partial update: only the fields present in the request are changed."""
+
+    title: str | None = Field(None, min_length=1, max_length=200)
+    description: str | None = Field(None, max_length=4000)
+    date: dt.date | None = None
+    start_time: str | None = Field(None, pattern=TIME_PATTERN)
+    end_time: str | None = Field(None, pattern=TIME_PATTERN)
+    priority: Priority | None = None
+    progress: int | None = Field(None, ge=0, le=100)
+    completed_on: dt.date | None = None
+    category: str | None = Field(None, max_length=50)
+    repeat: Repeat | None = None
+
+    @field_validator("title", "date", "priority", "progress")
+    @classmethod
+    def _not_null(cls, value: object) -> object:
+        # Only runs for fields sent explicitly; these columns can't be cleared.
+        if value is None:
+            raise ValueError("may not be null")
+        return value
+
+
+class TaskOut(TaskCreate):
+    id: int
+    created_at: dt.datetime
+    updated_at: dt.datetime
+
+    model_config = {"from_attributes": True}
+
+
+class TaskList(BaseModel):
+    # Ordered by date, then start time.
+    items: list[TaskOut]
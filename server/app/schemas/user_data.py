@@ -6,6 +6,10 @@ from typing import Any
 from pydantic import BaseModel, Field
 
 
+# Upper bound for keys in a single batch read/write request.
+MAX_BATCH_KEYS = 100
+
+
 class UserDataUpsert(BaseModel):
     value: Any = Field(..., description="Arbitrary JSON-serializable value")
 
@@ -14,3 +18,41 @@ class UserDataOut(BaseModel):
     key: str
     value: Any
     updated_at: datetime | None = None
+    version: int | None = None
+
+
+class UserDataBatchUpsert(BaseModel):
+    values: dict[str, Any] = Field(..., description="Mapping of key -> JSON-serializable value")
+
+
+class UserDataBatchItem(BaseModel):
+    key: str
+    found: bool
+    value: Any = None
+    updated_at: datetime | None = None
+    version: int | None = None
+
+
+class UserDataBatchOut(BaseModel):
+    items: list[UserDataBatchItem]
+
+
+class UserDataChange(BaseModel):
+    key: str
+    version: int
+    seq: int
+    updated_at: datetime | None = None
+    # Only filled in with `?values=true`.
+    value: Any = None
+
+
+class StreamTicketOut(BaseModel):
+    ticket: str
+    expires_in: int
+
+
+class UserDataChangesOut(BaseModel):
+    items: list[UserDataChange]
+    # Pass back as `since`; unchanged when nothing is new.
+    cursor: int
+    has_more: bool = False
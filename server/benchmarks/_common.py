@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+import json
+import os
+import statistics
+import sys
+import tempfile
+from pathlib import Path
+
+
+SERVER_DIR = Path(__file__).resolve().parents[1]
+
+
+def use_temp_sqlite(prefix: str = "studybuddy-bench-") -> Path:
+    """Point the app at a throwaway SQLite file.
+
+    Must be called before anything under `app.` is imported, since the engine
+    is created from `settings.sqlite_path` at import time.
+    """
+    if "app.db.session" in sys.modules:
+        raise RuntimeError("use_temp_sqlite() must run before importing the app")
+    tmp_dir = Path(tempfile.mkdtemp(prefix=prefix))
+    db_path = tmp_dir / "bench.db"
+    os.environ["SQLITE_PATH"] = str(db_path)
+    os.environ.setdefault("SECRET_KEY", "bench-secret-key-that-is-long-enough-for-hs256")
+    # Every benchmark client shares one IP; auth rate limits would dominate the numbers.
+    os.environ.setdefault("RATE_LIMIT_ENABLED", "false")
+    if str(SERVER_DIR) not in sys.path:
+        sys.path.insert(0, str(SERVER_DIR))
+    return db_path
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    idx = min(len(ordered) - 1, max(0, round(pct / 100.0 * (len(ordered) - 1))))
+    return ordered[idx]
+
+
+def summarize(samples_s: list[float], *, elapsed_s: float) -> dict:
+    """Latency percentiles (ms) and throughput for one scenario."""
+    count = len(samples_s)
+    return {
+        "count": count,
+        "throughput_rps": round(count / elapsed_s, 2) if elapsed_s > 0 else 0.0,
+        "mean_ms": round(statistics.fmean(samples_s) * 1000, 3) if samples_s else 0.0,
+        "p50_ms": round(percentile(samples_s, 50) * 1000, 3),
+        "p95_ms": round(percentile(samples_s, 95) * 1000, 3),
+        "p99_ms": round(percentile(samples_s, 99) * 1000, 3),
+    }
+
+
+def emit(report: dict) -> None:
+    print(json.dumps(report, indent=2, sort_keys=True))
+
+
+class ServerProcess:
+    """Run an app factory under uvicorn in a child process on an ephemeral port.
+
+    A separate process keeps the load generator from sharing the server's GIL.
+    `factory` is an import string such as "app.main:create_app". The child
+    inherits the environment, so call `use_temp_sqlite()` first.
+    """
+
+    def __init__(self, factory: str, *, host: str = "127.0.0.1", extra_args: list[str] | None = None) -> None:
+        self.factory = factory
+        self.host = host
+        self.extra_args = extra_args or []
+        self.base_url = ""
+        self._proc = None
+
+    def __enter__(self) -> "ServerProcess":
+        import socket
+        import subprocess
+        import time
+        import urllib.request
+
+        with socket.socket() as sock:
+            sock.bind((self.host, 0))
+            port = sock.getsockname()[1]
+        cmd = [
+            sys.executable, "-m", "uvicorn", self.factory, "--factory",
+            "--host", self.host, "--port", str(port), "--log-level", "warning",
+            *self.extra_args,
+        ]
+        self._proc = subprocess.Popen(cmd, cwd=SERVER_DIR, env=os.environ.copy())
+        self.base_url = f"http://{self.host}:{port}"
+        deadline = time.monotonic() + 30
+        while time.monotonic() < deadline:
+            if self._proc.poll() is not None:
+                raise RuntimeError(f"uvicorn exited with {self._proc.returncode}")
+            try:
+                urllib.request.urlopen(f"{self.base_url}/health", timeout=1).close()
+                return self
+            except OSError:
+                time.sleep(0.1)
+        self.__exit__()
+        raise RuntimeError("uvicorn did not become ready")
+
+    @property
+    def pid(self) -> int:
+        return self._proc.pid
+
+    def __exit__(self, *exc) -> None:
+        import subprocess
+
+        if self._proc is None:
+            return
+        self._proc.terminate()
+        try:
+            self._proc.wait(timeout=15)
+        except subprocess.TimeoutExpired:
+            self._proc.kill()
+            self._proc.wait()
+        self._proc = None
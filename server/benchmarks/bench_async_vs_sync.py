@@ -0,0 +1,126 @@
+"""Requests/sec at high concurrency: sync (threadpool) vs async (aiosqlite) handlers.
+
+Both servers answer `GET /api/v1/user-data/{key}` for the same user and data. The
+sync variant mirrors the pre-async route (sync `Session`, sync handler running in
+Starlette's threadpool); the async variant is the real `app.main:create_app`.
+
+Usage (from `server/`):
+
+    python -m benchmarks.bench_async_vs_sync --concurrency 200 --duration 5
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import time
+
+from benchmarks._common import ServerProcess, emit, summarize, use_temp_sqlite
+
+
+def build_sync_app():
+    # App factory for the sync variant; loaded by uvicorn in the server process.
+    from fastapi import Depends, FastAPI, HTTPException
+    from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+    from sqlalchemy import select
+    from sqlalchemy.orm import Session
+
+    from app.core.security import decode_access_token
+    from app.db.deps import get_sync_db
+    from app.models.user import User
+    from app.models.user_data import UserData
+
+    app = FastAPI()
+    bearer = HTTPBearer(auto_error=False)
+
+    def current_user(
+        credentials: HTTPAuthorizationCredentials | None = Depends(bearer),
+        db: Session = Depends(get_sync_db),
+    ) -> User:
+        if credentials is None:
+            raise HTTPException(status_code=401)
+        payload = decode_access_token(credentials.credentials)
+        user = db.execute(select(User).where(User.id == int(payload["sub"]))).scalar_one_or_none()
+        if user is None:
+            raise HTTPException(status_code=401)
+        return user
+
+    @app.get("/health")
+    def health() -> dict:
+        return {"status": "ok"}
+
+    @app.get("/api/v1/user-data/{key}")
+    def read_user_data(key: str, db: Session = Depends(get_sync_db), user: User = Depends(current_user)) -> dict:
+        row = db.execute(select(UserData).where(UserData.user_id == user.id, UserData.key == key)).scalar_one_or_none()
+        if row is None:
+            raise HTTPException(status_code=404)
+        return {"key": key, "value": json.loads(row.value_json), "updated_at": row.updated_at}
+
+    return app
+
+
+async def _drive(base_url: str, *, headers: dict, concurrency: int, duration: float) -> dict:
+    import httpx
+
+    samples: list[float] = []
+    errors = 0
+    deadline = time.perf_counter() + duration
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(base_url=base_url, timeout=15, limits=limits) as client:
+
+        async def worker() -> None:
+            nonlocal errors
+            while time.perf_counter() < deadline:
+                t0 = time.perf_counter()
+                try:
+                    resp = await client.get("/api/v1/user-data/tasks", headers=headers)
+                except httpx.HTTPError:
+                    errors += 1
+                    continue
+                if resp.status_code != 200:
+                    errors += 1
+                    continue
+                samples.append(time.perf_counter() - t0)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        report = summarize(samples, elapsed_s=time.perf_counter() - started)
+    report["errors"] = errors
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--duration", type=float, default=5.0)
+    parser.add_argument("--items", type=int, default=100, help="Tasks in the stored value")
+    args = parser.parse_args()
+
+    use_temp_sqlite()
+
+    import httpx
+
+    value = [{"id": str(i), "title": f"Task {i}", "date": "2024-03-26", "progress": i % 100} for i in range(args.items)]
+    report = {"benchmark": "async_vs_sync", "concurrency": args.concurrency, "items": args.items}
+
+    with ServerProcess("app.main:create_app") as server:
+        with httpx.Client(base_url=server.base_url, timeout=60) as client:
+            resp = client.post("/api/v1/auth/signup", json={"email": "bench@example.com", "password": "bench-pw"})
+            resp.raise_for_status()
+            headers = {"Authorization": f"Bearer {resp.json()['access_token']}"}
+            client.put("/api/v1/user-data/tasks", json={"value": value}, headers=headers).raise_for_status()
+        report["async"] = asyncio.run(
+            _drive(server.base_url, headers=headers, concurrency=args.concurrency, duration=args.duration)
+        )
+
+    with ServerProcess("benchmarks.bench_async_vs_sync:build_sync_app") as server:
+        report["sync"] = asyncio.run(
+            _drive(server.base_url, headers=headers, concurrency=args.concurrency, duration=args.duration)
+        )
+
+    emit(report)
+
+
+if __name__ == "__main__":
+    main()
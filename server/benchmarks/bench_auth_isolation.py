@@ -0,0 +1,87 @@
+"""Non-auth endpoint latency while a burst of password logins is running.
+
+Measures `GET /api/v1/notes` latency on its own, then again while `--login-concurrency`
+clients hammer `POST /api/v1/auth/login`. With hashing in the bounded process pool
+the two runs should stay close; logins beyond the queue depth get a fast 503.
+
+Usage (from `server/`):
+
+    python -m benchmarks.bench_auth_isolation --duration 5 --login-concurrency 64
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import time
+
+from benchmarks._common import ServerProcess, emit, summarize, use_temp_sqlite
+
+
+async def _probe(client, *, headers: dict, duration: float, concurrency: int) -> dict:
+    samples: list[float] = []
+    deadline = time.perf_counter() + duration
+
+    async def worker() -> None:
+        while time.perf_counter() < deadline:
+            t0 = time.perf_counter()
+            resp = await client.get("/api/v1/notes/", headers=headers)
+            resp.raise_for_status()
+            samples.append(time.perf_counter() - t0)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return summarize(samples, elapsed_s=time.perf_counter() - started)
+
+
+async def _login_storm(client, *, stop: asyncio.Event, concurrency: int, counts: dict) -> None:
+    async def worker() -> None:
+        while not stop.is_set():
+            resp = await client.post("/api/v1/auth/login", json={"email": "bench@example.com", "password": "bench-pw"})
+            counts[resp.status_code] = counts.get(resp.status_code, 0) + 1
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+
+
+async def _main(args) -> dict:
+    import httpx
+
+    with ServerProcess("app.main:create_app") as server:
+        limits = httpx.Limits(max_connections=args.login_concurrency + args.probe_concurrency + 8)
+        async with httpx.AsyncClient(base_url=server.base_url, timeout=60, limits=limits) as client:
+            resp = await client.post("/api/v1/auth/signup", json={"email": "bench@example.com", "password": "bench-pw"})
+            resp.raise_for_status()
+            headers = {"Authorization": f"Bearer {resp.json()['access_token']}"}
+
+            baseline = await _probe(client, headers=headers, duration=args.duration, concurrency=args.probe_concurrency)
+
+            stop = asyncio.Event()
+            counts: dict[int, int] = {}
+            storm = asyncio.create_task(_login_storm(client, stop=stop, concurrency=args.login_concurrency, counts=counts))
+            await asyncio.sleep(0.5)
+            under_load = await _probe(client, headers=headers, duration=args.duration, concurrency=args.probe_concurrency)
+            stop.set()
+            await storm
+
+    return {
+        "benchmark": "auth_isolation",
+        "login_concurrency": args.login_concurrency,
+        "probe_concurrency": args.probe_concurrency,
+        "notes_baseline": baseline,
+        "notes_during_logins": under_load,
+        "login_status_counts": {str(k): v for k, v in sorted(counts.items())},
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--duration", type=float, default=5.0, help="Seconds per probe phase")
+    parser.add_argument("--probe-concurrency", type=int, default=4)
+    parser.add_argument("--login-concurrency", type=int, default=64)
+    args = parser.parse_args()
+
+    use_temp_sqlite()
+    emit(asyncio.run(_main(args)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""Wire bytes and latency per endpoint for each response content coding.
+
+Seeds a user with large `tasks`/`assessments` blobs and a page of notes, then
+fetches each endpoint sequentially with `Accept-Encoding` set to identity, gzip,
+br and zstd (the latter two only when `brotli`/`zstandard` are installed).
+Latency is measured on loopback, so it shows the server-side compression cost
+rather than the transfer time saved on a real network.
+
+Usage (from `server/`):
+
+    python -m benchmarks.bench_compression --requests 200 --items 500
+"""
+from __future__ import annotations
+
+import argparse
+import time
+
+from benchmarks._common import ServerProcess, emit, summarize, use_temp_sqlite
+
+
+ENDPOINTS = {
+    "user_data_tasks": "/api/v1/user-data/tasks",
+    "user_data_assessments": "/api/v1/user-data/assessments",
+    "notes_page": "/api/v1/notes/?limit=100",
+    "auth_me": "/api/v1/auth/me",
+}
+
+
+def _seed(client, headers: dict, *, items: int) -> None:
+    tasks = [
+        {
+            "id": f"task-{i}",
+            "title": f"Revise chapter {i % 40}",
+            "description": "Summarise key formulas and do the end-of-chapter exercises.",
+            "date": f"2024-03-{1 + i % 28:02d}",
+            "startTime": "09:00",
+            "endTime": "10:30",
+            "priority": ("low", "medium", "high")[i % 3],
+            "progress": i % 100,
+            "category": "study",
+            "repeat": "none",
+        }
+        for i in range(items)
+    ]
+    assessments = [
+        {"id": f"a-{i}", "subject": f"Subject {i % 12}", "date": f"2024-04-{1 + i % 28:02d}", "score": i % 100}
+        for i in range(items)
+    ]
+    client.put(
+        "/api/v1/user-data", json={"values": {"tasks": tasks, "assessments": assessments}}, headers=headers
+    ).raise_for_status()
+    for i in range(100):
+        client.post(
+            "/api/v1/notes/",
+            json={"title": f"Note {i}", "content": "Lecture notes on thermodynamics and entropy. " * 8},
+            headers=headers,
+        ).raise_for_status()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=200, help="Requests per endpoint and encoding")
+    parser.add_argument("--items", type=int, default=500, help="Entries in the tasks/assessments blobs")
+    args = parser.parse_args()
+
+    use_temp_sqlite()
+
+    import httpx
+
+    from app.core.compression import available_encodings
+
+    encodings = ["identity", *(e for e in ("gzip", "br", "zstd") if e in available_encodings())]
+    report: dict = {"benchmark": "compression", "requests": args.requests, "items": args.items, "endpoints": {}}
+
+    with ServerProcess("app.main:create_app") as server:
+        with httpx.Client(base_url=server.base_url, timeout=60) as client:
+            resp = client.post("/api/v1/auth/signup", json={"email": "bench@example.com", "password": "bench-pw"})
+            resp.raise_for_status()
+            headers = {"Authorization": f"Bearer {resp.json()['access_token']}"}
+            _seed(client, headers, items=args.items)
+
+            for name, path in ENDPOINTS.items():
+                results = {}
+                for encoding in encodings:
+                    req_headers = {**headers, "Accept-Encoding": encoding}
+                    samples: list[float] = []
+                    wire_bytes = body_bytes = 0
+                    started = time.perf_counter()
+                    for _ in range(args.requests):
+                        t0 = time.perf_counter()
+                        resp = client.get(path, headers=req_headers)
+                        resp.read()
+                        samples.append(time.perf_counter() - t0)
+                        resp.raise_for_status()
+                        wire_bytes = resp.num_bytes_downloaded
+                        body_bytes = len(resp.content)
+                    result = summarize(samples, elapsed_s=time.perf_counter() - started)
+                    result["content_encoding"] = resp.headers.get("content-encoding", "identity")
+                    result["wire_bytes"] = wire_bytes
+                    result["body_bytes"] = body_bytes
+                    result["ratio"] = round(wire_bytes / body_bytes, 3) if body_bytes else 1.0
+                    results[encoding] = result
+                report["endpoints"][name] = results
+
+    emit(report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,211 @@
+"""Login throughput: the DB side (legacy two-commit path vs one transaction) and end to end.
+
+The `db` phase creates `--users` Google accounts through each path, then times
+returning-user logins in-process, `--concurrency` at a time for `--duration`
+seconds. (Concurrent first logins are not timed: the legacy path's SELECT then
+INSERT fails on the unique constraint when two race.) The legacy path is the pre-change code: SELECT, ORM write,
+commit, refresh, then a second upsert-and-commit for the `user` snapshot. The
+current path is `crud.users.upsert_google_user`. Commits are counted with a
+session hook.
+
+The `http` phase signs up `--users` password accounts on a uvicorn server and
+drives `POST /auth/login` for `--duration` seconds, next to the cost of one
+PBKDF2 verification, which bounds password-login throughput per hashing worker.
+
+Usage (from `server/`):
+
+    python -m benchmarks.bench_login --duration 5 --concurrency 8 --users 200
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import time
+from datetime import datetime, timezone
+
+from benchmarks._common import ServerProcess, emit, summarize, use_temp_sqlite
+
+
+def _profile(i: int) -> dict:
+    return {
+        "sub": f"bench-sub-{i}",
+        "email": f"bench-{i}@example.com",
+        "email_verified": True,
+        "name": f"Bench {i}",
+        "given_name": "Bench",
+        "family_name": str(i),
+        "picture": None,
+        "locale": "en",
+    }
+
+
+async def _legacy_login(db, **profile) -> None:
+    # The pre-change google_login write path.
+    from app.crud.user_data import upsert_value
+    from app.crud.users import get_by_provider_sub
+    from app.models.user import User
+
+    sub = profile.pop("sub")
+    user = await get_by_provider_sub(db, provider="google", provider_sub=sub)
+    if user is None:
+        user = User(provider="google", provider_sub=sub)
+        db.add(user)
+    for field, value in profile.items():
+        setattr(user, field, value)
+    user.last_login_at = datetime.now(timezone.utc)
+    await db.commit()
+    await db.refresh(user)
+    await upsert_value(
+        db,
+        user_id=user.id,
+        key="user",
+        value={
+            "id": user.id,
+            "provider": user.provider,
+            "email": user.email,
+            "name": user.name,
+            "picture": user.picture,
+            "last_login_at": user.last_login_at.isoformat() if user.last_login_at else None,
+        },
+    )
+
+
+async def _current_login(db, **profile) -> None:
+    from app.crud.users import upsert_google_user
+
+    await upsert_google_user(db, **profile)
+
+
+async def _db_phase(login, *, offset: int, users: int, duration: float, concurrency: int) -> dict:
+    from sqlalchemy import event
+    from sqlalchemy.orm import Session
+
+    from app.db.session import AsyncSessionLocal
+
+    commits = 0
+
+    def count_commit(session) -> None:
+        nonlocal commits
+        commits += 1
+
+    samples: list[float] = []
+    counter = iter(range(10**9))
+    deadline = time.perf_counter() + duration
+
+    async def worker() -> None:
+        while time.perf_counter() < deadline:
+            i = next(counter)
+            t0 = time.perf_counter()
+            async with AsyncSessionLocal() as db:
+                await login(db, **_profile(offset + i % users))
+            samples.append(time.perf_counter() - t0)
+
+    for i in range(users):
+        async with AsyncSessionLocal() as db:
+            await login(db, **_profile(offset + i))
+
+    event.listen(Session, "after_commit", count_commit)
+    try:
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+    finally:
+        event.remove(Session, "after_commit", count_commit)
+    return {**summarize(samples, elapsed_s=elapsed), "commits_per_login": round(commits / max(1, len(samples)), 2)}
+
+
+async def _db_main(args) -> dict:
+    from app.db.session import async_engine
+
+    report = {}
+    # Each path gets its own accounts.
+    for offset, (name, login) in enumerate((("legacy", _legacy_login), ("single_transaction", _current_login))):
+        report[name] = await _db_phase(
+            login, offset=offset * args.users, users=args.users, duration=args.duration, concurrency=args.concurrency
+        )
+    await async_engine.dispose()
+    return report
+
+
+async def _http_main(base_url: str, args) -> dict:
+    import httpx
+
+    limits = httpx.Limits(max_connections=args.concurrency + 4)
+    async with httpx.AsyncClient(base_url=base_url, timeout=60, limits=limits) as client:
+        emails = [f"http-{i}@example.com" for i in range(args.users)]
+        sem = asyncio.Semaphore(args.concurrency)
+
+        async def signup(email: str) -> None:
+            async with sem:
+                resp = await client.post("/api/v1/auth/signup", json={"email": email, "password": "bench-pw"})
+                resp.raise_for_status()
+
+        await asyncio.gather(*(signup(email) for email in emails))
+
+        samples: list[float] = []
+        counts: dict[int, int] = {}
+        counter = iter(range(10**9))
+        deadline = time.perf_counter() + args.duration
+
+        async def worker() -> None:
+            while time.perf_counter() < deadline:
+                email = emails[next(counter) % len(emails)]
+                t0 = time.perf_counter()
+                resp = await client.post("/api/v1/auth/login", json={"email": email, "password": "bench-pw"})
+                counts[resp.status_code] = counts.get(resp.status_code, 0) + 1
+                if resp.status_code == 200:
+                    samples.append(time.perf_counter() - t0)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+        elapsed = time.perf_counter() - started
+
+    return {
+        "login": summarize(samples, elapsed_s=elapsed),
+        "login_status_counts": {str(k): v for k, v in sorted(counts.items())},
+    }
+
+
+def _hash_ms(rounds: int = 5) -> float:
+    from app.core.security import hash_password, verify_password
+
+    stored = hash_password("bench-pw")
+    t0 = time.perf_counter()
+    for _ in range(rounds):
+        verify_password("bench-pw", stored)
+    return round((time.perf_counter() - t0) / rounds * 1000, 3)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--duration", type=float, default=5.0, help="Seconds per timed phase")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--users", type=int, default=200, help="Accounts logged in round-robin")
+    args = parser.parse_args()
+
+    use_temp_sqlite()
+
+    from app.db import migrations
+    from app.db.session import engine
+
+    migrations.upgrade(engine)
+    db = asyncio.run(_db_main(args))
+    with ServerProcess("app.main:create_app") as server:
+        http = asyncio.run(_http_main(server.base_url, args))
+
+    legacy, single = db["legacy"]["throughput_rps"], db["single_transaction"]["throughput_rps"]
+    emit(
+        {
+            "benchmark": "login",
+            "concurrency": args.concurrency,
+            "users": args.users,
+            "db": db,
+            "db_speedup": round(single / legacy, 2) if legacy else None,
+            "http": http,
+            "pbkdf2_verify_ms": _hash_ms(),
+        }
+    )
+
+
+if __name__ == "__main__":
+    main()
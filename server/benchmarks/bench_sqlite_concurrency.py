@@ -0,0 +1,121 @@
+"""Mixed read/write concurrency against SQLite: default profile vs tuned WAL profile.
+
+Each client loops over `GET /user-data/tasks` and `PUT /user-data/tasks` (ratio set
+by `--write-ratio`) for its own user, so writers from different users contend on
+SQLite's single write lock. The "default" profile restores SQLite's stock
+rollback journal, synchronous=FULL, small page cache and the stock pool.
+
+Usage (from `server/`):
+
+    python -m benchmarks.bench_sqlite_concurrency --clients 32 --duration 5 --write-ratio 0.3
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import random
+import time
+
+from benchmarks._common import ServerProcess, emit, summarize, use_temp_sqlite
+
+
+PROFILES = {
+    "default": {
+        "SQLITE_JOURNAL_MODE": "DELETE",
+        "SQLITE_SYNCHRONOUS": "FULL",
+        "SQLITE_CACHE_SIZE": "-2000",
+        "SQLITE_MMAP_SIZE": "0",
+        "SQLITE_TEMP_STORE": "DEFAULT",
+        "SQLITE_BUSY_TIMEOUT_MS": "5000",  # pysqlite's implicit 5s timeout
+        "SQLITE_POOL_SIZE": "5",
+        "SQLITE_MAX_OVERFLOW": "10",
+    },
+    # Empty overrides: whatever `Settings` defaults to.
+    "tuned": {},
+}
+
+
+async def _run_profile(base_url: str, *, clients: int, duration: float, write_ratio: float, items: int) -> dict:
+    import httpx
+
+    value = [{"id": str(i), "title": f"Task {i}", "progress": i % 100} for i in range(items)]
+    limits = httpx.Limits(max_connections=clients + 4)
+    async with httpx.AsyncClient(base_url=base_url, timeout=30, limits=limits) as client:
+        tokens = []
+        for i in range(clients):
+            email = f"bench{i}-{random.randrange(1 << 30)}@example.com"
+            resp = await client.post("/api/v1/auth/signup", json={"email": email, "password": "bench-pw"})
+            resp.raise_for_status()
+            headers = {"Authorization": f"Bearer {resp.json()['access_token']}"}
+            (await client.put("/api/v1/user-data/tasks", json={"value": value}, headers=headers)).raise_for_status()
+            tokens.append(headers)
+
+        reads: list[float] = []
+        writes: list[float] = []
+        errors: dict[str, int] = {}
+        deadline = time.perf_counter() + duration
+
+        async def worker(headers: dict) -> None:
+            rng = random.Random()
+            while time.perf_counter() < deadline:
+                is_write = rng.random() < write_ratio
+                t0 = time.perf_counter()
+                try:
+                    if is_write:
+                        resp = await client.put("/api/v1/user-data/tasks", json={"value": value}, headers=headers)
+                    else:
+                        resp = await client.get("/api/v1/user-data/tasks", headers=headers)
+                except httpx.HTTPError as exc:
+                    errors[type(exc).__name__] = errors.get(type(exc).__name__, 0) + 1
+                    continue
+                if resp.status_code != 200:
+                    errors[str(resp.status_code)] = errors.get(str(resp.status_code), 0) + 1
+                    continue
+                (writes if is_write else reads).append(time.perf_counter() - t0)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker(h) for h in tokens))
+        elapsed = time.perf_counter() - started
+
+    return {
+        "reads": summarize(reads, elapsed_s=elapsed),
+        "writes": summarize(writes, elapsed_s=elapsed),
+        "errors": errors,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--clients", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=5.0)
+    parser.add_argument("--write-ratio", type=float, default=0.3)
+    parser.add_argument("--items", type=int, default=100)
+    parser.add_argument("--profile", choices=sorted(PROFILES), action="append", help="Default: all profiles")
+    args = parser.parse_args()
+
+    report = {"benchmark": "sqlite_concurrency", "clients": args.clients, "write_ratio": args.write_ratio}
+    base_env = os.environ.copy()
+    # Measure SQLite itself, not the write-behind buffer in front of it.
+    base_env["USER_DATA_WRITE_BEHIND"] = "false"
+    for name in args.profile or sorted(PROFILES):
+        # Fresh database per profile; journal_mode=WAL is sticky on the file.
+        os.environ.clear()
+        os.environ.update(base_env)
+        os.environ.update(PROFILES[name])
+        use_temp_sqlite(prefix=f"studybuddy-bench-{name}-")
+        with ServerProcess("app.main:create_app") as server:
+            report[name] = asyncio.run(
+                _run_profile(
+                    server.base_url,
+                    clients=args.clients,
+                    duration=args.duration,
+                    write_ratio=args.write_ratio,
+                    items=args.items,
+                )
+            )
+    emit(report)
+
+
+if __name__ == "__main__":
+    main()
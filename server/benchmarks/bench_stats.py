@@ -0,0 +1,95 @@
+"""`GET /stats` latency vs task history size, against fetching every task to count client-side.
+
+For each `--sizes` value a fresh user gets that many tasks (spread over the past
+few years, about half completed) inserted straight into the database, and stats
+are rebuilt for them. Then `GET /stats` and `GET /tasks` (the whole history,
+as the profile page used to need) are timed.
+
+Usage (from `server/`):
+
+    python -m benchmarks.bench_stats --sizes 100 --sizes 10000 --iterations 200
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import datetime as dt
+import time
+
+from benchmarks._common import ServerProcess, emit, summarize, use_temp_sqlite
+
+
+def _seed_tasks(user_id: int, count: int) -> None:
+    from sqlalchemy import insert
+
+    from app.db.session import engine
+    from app.db.stats import rebuild_stats
+    from app.models.task import Task
+
+    today = dt.date.today()
+    rows = [
+        {
+            "user_id": user_id,
+            "title": f"Task {i}",
+            "date": today - dt.timedelta(days=(i * 7) % 1500),
+            "priority": "Medium",
+            "progress": 100 if i % 2 else 40,
+        }
+        for i in range(count)
+    ]
+    with engine.begin() as conn:
+        conn.execute(insert(Task), rows)
+        rebuild_stats(conn, user_id=user_id)
+
+
+async def _time(client, path: str, params: dict, headers: dict, iterations: int) -> dict:
+    samples: list[float] = []
+    started = time.perf_counter()
+    for _ in range(iterations):
+        t0 = time.perf_counter()
+        (await client.get(path, params=params, headers=headers)).raise_for_status()
+        samples.append(time.perf_counter() - t0)
+    return summarize(samples, elapsed_s=time.perf_counter() - started)
+
+
+async def _run(base_url: str, *, sizes: list[int], iterations: int) -> list[dict]:
+    import httpx
+
+    runs = []
+    today = dt.date.today()
+    async with httpx.AsyncClient(base_url=base_url, timeout=60) as client:
+        for size in sizes:
+            resp = await client.post(
+                "/api/v1/auth/signup", json={"email": f"bench-{size}@example.com", "password": "bench-pw"}
+            )
+            resp.raise_for_status()
+            body = resp.json()
+            headers = {"Authorization": f"Bearer {body['access_token']}"}
+            _seed_tasks(body["user"]["id"], size)
+
+            stats_params = {"today": today.isoformat(), "year": today.year}
+            runs.append(
+                {
+                    "tasks": size,
+                    "stats": await _time(client, "/api/v1/stats", stats_params, headers, iterations),
+                    "all_tasks": await _time(client, "/api/v1/tasks/", {}, headers, iterations),
+                }
+            )
+    return runs
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, action="append", help="Tasks per user (repeatable)")
+    parser.add_argument("--iterations", type=int, default=200)
+    args = parser.parse_args()
+
+    use_temp_sqlite()
+
+    with ServerProcess("app.main:create_app") as server:
+        runs = asyncio.run(_run(server.base_url, sizes=args.sizes or [100, 1000, 10000], iterations=args.iterations))
+    emit({"benchmark": "stats", "iterations": args.iterations, "runs": runs})
+
+
+if __name__ == "__main__":
+    main()
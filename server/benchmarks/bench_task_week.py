@@ -0,0 +1,94 @@
+"""Week view cost: one user-data blob holding every task vs a `GET /tasks` date range.
+
+Seeds `--tasks` tasks spread one per day (so a week holds 7) both as a single
+`tasks` user-data value and as rows, then times fetching one week each way. The
+blob path also filters the week out client-side, as the dashboard used to.
+
+Usage (from `server/`):
+
+    python -m benchmarks.bench_task_week --tasks 3000 --iterations 300
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import datetime as dt
+import time
+
+from benchmarks._common import ServerProcess, emit, summarize, use_temp_sqlite
+
+
+async def _run(base_url: str, *, tasks: int, iterations: int) -> dict:
+    import httpx
+
+    first_day = dt.date(2020, 1, 6)
+    items = [
+        {
+            "title": f"Task {i}",
+            "description": "lorem ipsum " * 10,
+            "date": (first_day + dt.timedelta(days=i)).isoformat(),
+            "start_time": "09:00",
+            "priority": "Medium",
+            "progress": i % 100,
+            "category": "HOMEWORK",
+        }
+        for i in range(tasks)
+    ]
+    week_start = first_day + dt.timedelta(days=(tasks // 2) // 7 * 7)
+    week = {"start": week_start.isoformat(), "end": (week_start + dt.timedelta(days=6)).isoformat()}
+
+    async with httpx.AsyncClient(base_url=base_url, timeout=60) as client:
+        resp = await client.post("/api/v1/auth/signup", json={"email": "bench@example.com", "password": "bench-pw"})
+        resp.raise_for_status()
+        headers = {"Authorization": f"Bearer {resp.json()['access_token']}"}
+        (await client.put("/api/v1/user-data/tasks", json={"value": items}, headers=headers)).raise_for_status()
+        for item in items:
+            (await client.post("/api/v1/tasks/", json=item, headers=headers)).raise_for_status()
+
+        async def blob_week() -> int:
+            resp = await client.get("/api/v1/user-data/tasks", headers=headers)
+            resp.raise_for_status()
+            value = resp.json()["value"]
+            return sum(1 for t in value if week["start"] <= t["date"] <= week["end"])
+
+        async def range_week() -> int:
+            resp = await client.get("/api/v1/tasks/", params=week, headers=headers)
+            resp.raise_for_status()
+            return len(resp.json()["items"])
+
+        report = {}
+        for name, fetch in (("blob", blob_week), ("range", range_week)):
+            assert await fetch() == 7
+            samples: list[float] = []
+            started = time.perf_counter()
+            for _ in range(iterations):
+                t0 = time.perf_counter()
+                await fetch()
+                samples.append(time.perf_counter() - t0)
+            report[name] = summarize(samples, elapsed_s=time.perf_counter() - started)
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tasks", type=int, default=2000, help="Tasks in the history")
+    parser.add_argument("--iterations", type=int, default=300)
+    args = parser.parse_args()
+
+    use_temp_sqlite()
+
+    with ServerProcess("app.main:create_app") as server:
+        result = asyncio.run(_run(server.base_url, tasks=args.tasks, iterations=args.iterations))
+    blob, ranged = result["blob"]["p50_ms"], result["range"]["p50_ms"]
+    emit(
+        {
+            "benchmark": "task_week",
+            "tasks": args.tasks,
+            **result,
+            "speedup_p50": round(blob / ranged, 2) if ranged else None,
+        }
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""PUT /user-data write-path benchmark: legacy SELECT+ORM+refresh vs single-statement upsert.
+
+Usage (from `server/`):
+
+    python -m benchmarks.bench_user_data_put --iterations 2000 --items 200
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import time
+
+from benchmarks._common import emit, summarize, use_temp_sqlite
+
+
+def _legacy_put(db, *, user_id: int, key: str, value: object) -> object:
+    # The pre-upsert write path: SELECT, ORM insert/update, commit, refresh, then
+    # the route re-read the value it had just written.
+    from sqlalchemy import select
+
+    from app.models.user_data import UserData
+
+    value_json = json.dumps(value, ensure_ascii=False)
+    row = db.execute(select(UserData).where(UserData.user_id == user_id, UserData.key == key)).scalar_one_or_none()
+    if row is None:
+        row = UserData(user_id=user_id, key=key, value_json=value_json)
+        db.add(row)
+    else:
+        row.value_json = value_json
+    db.commit()
+    db.refresh(row)
+    reread = db.execute(select(UserData).where(UserData.user_id == user_id, UserData.key == key)).scalar_one()
+    return json.loads(reread.value_json)
+
+
+def _upsert_put(db, *, user_id: int, key: str, value: object) -> object:
+    # Same statements crud.user_data.upsert_value runs, on the sync session so both
+    # paths are timed on equal footing.
+    from app.crud.user_data import _UPSERT, _UPSERT_OPTIONS, _seq_stmt, _upsert_params
+
+    seq = db.execute(_seq_stmt(user_id)).scalar_one()
+    params = _upsert_params(user_id=user_id, values={key: value}, first_seq=seq)
+    db.scalars(_UPSERT, params, execution_options=_UPSERT_OPTIONS).one()
+    db.commit()
+    return value
+
+
+def _run(fn, *, user_id: int, iterations: int, value: object) -> dict:
+    from app.db.session import SessionLocal
+
+    samples: list[float] = []
+    started = time.perf_counter()
+    for i in range(iterations):
+        t0 = time.perf_counter()
+        db = SessionLocal()
+        try:
+            fn(db, user_id=user_id, key="tasks", value=value)
+        finally:
+            db.close()
+        samples.append(time.perf_counter() - t0)
+    return summarize(samples, elapsed_s=time.perf_counter() - started)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=1000)
+    parser.add_argument("--items", type=int, default=100, help="Tasks in the PUT payload")
+    args = parser.parse_args()
+
+    db_path = use_temp_sqlite()
+
+    from app.db.base import Base
+    from app.db.session import SessionLocal, engine
+    from app.models import note as _note  # noqa: F401
+    from app.models.user import User
+    from app.models import user_data as _user_data  # noqa: F401
+
+    Base.metadata.create_all(bind=engine)
+    with SessionLocal() as db:
+        user = User(provider="password", provider_sub="bench@example.com", email="bench@example.com")
+        db.add(user)
+        db.commit()
+        user_id = user.id
+
+    value = [
+        {"id": str(i), "title": f"Task {i}", "date": "2024-03-26", "priority": "High", "progress": i % 100}
+        for i in range(args.items)
+    ]
+
+    legacy = _run(_legacy_put, user_id=user_id, iterations=args.iterations, value=value)
+    upsert = _run(_upsert_put, user_id=user_id, iterations=args.iterations, value=value)
+    emit(
+        {
+            "benchmark": "user_data_put",
+            "db_path": str(db_path),
+            "iterations": args.iterations,
+            "items": args.items,
+            "legacy": legacy,
+            "upsert": upsert,
+            "speedup": round(upsert["throughput_rps"] / legacy["throughput_rps"], 2) if legacy["throughput_rps"] else None,
+        }
+    )
+
+
+if __name__ == "__main__":
+    main()
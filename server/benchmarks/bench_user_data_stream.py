@@ -0,0 +1,118 @@
+"""Cost of idle `GET /user-data/stream` connections and fan-out latency per write.
+
+Opens `--streams` Server-Sent Events connections for one user and records the
+server's resident memory before and after. Then it issues `--writes` PUTs and
+measures how long each change event takes to reach every stream.
+
+Usage (from `server/`):
+
+    python -m benchmarks.bench_user_data_stream --streams 2000 --writes 20
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import time
+
+from benchmarks._common import ServerProcess, emit, summarize, use_temp_sqlite
+
+
+def _rss_kib(pid: int) -> int | None:
+    # Linux only; None elsewhere.
+    try:
+        with open(f"/proc/{pid}/status") as fh:
+            for line in fh:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1])
+    except OSError:
+        return None
+    return None
+
+
+async def _run(base_url: str, pid: int, *, streams: int, writes: int) -> dict:
+    import httpx
+
+    limits = httpx.Limits(max_connections=streams + 8, max_keepalive_connections=streams + 8)
+    async with httpx.AsyncClient(base_url=base_url, timeout=60, limits=limits) as client:
+        resp = await client.post("/api/v1/auth/signup", json={"email": "bench@example.com", "password": "bench-pw"})
+        resp.raise_for_status()
+        token = resp.json()["access_token"]
+        headers = {"Authorization": f"Bearer {token}"}
+        resp = await client.post("/api/v1/user-data/stream-ticket", headers=headers)
+        resp.raise_for_status()
+        # Tickets are short-lived but reusable, so every stream can open with this one.
+        ticket = resp.json()["ticket"]
+        rss_before = _rss_kib(pid)
+
+        ready = 0
+        all_ready = asyncio.Event()
+        sent_at: dict[int, float] = {}
+        delays: list[float] = []
+
+        async def listen() -> None:
+            nonlocal ready
+            async with client.stream("GET", "/api/v1/user-data/stream", params={"ticket": ticket}) as r:
+                r.raise_for_status()
+                async for line in r.aiter_lines():
+                    if line == "event: ready":
+                        ready += 1
+                        if ready == streams:
+                            all_ready.set()
+                    elif line.startswith("data: {\"key\""):
+                        version = int(line.rsplit('"version":', 1)[1].split(",", 1)[0])
+                        delays.append(time.perf_counter() - sent_at[version])
+
+        tasks = [asyncio.create_task(listen()) for _ in range(streams)]
+        started = time.perf_counter()
+        await asyncio.wait_for(all_ready.wait(), timeout=120)
+        connect_s = time.perf_counter() - started
+        await asyncio.sleep(1.0)
+        rss_after = _rss_kib(pid)
+
+        with_writes_start = time.perf_counter()
+        for version in range(1, writes + 1):
+            sent_at[version] = time.perf_counter()
+            (await client.put("/api/v1/user-data/tasks", json={"value": version}, headers=headers)).raise_for_status()
+            await asyncio.sleep(0.05)
+        deadline = time.perf_counter() + 30
+        while len(delays) < streams * writes and time.perf_counter() < deadline:
+            await asyncio.sleep(0.05)
+        elapsed = time.perf_counter() - with_writes_start
+
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    report = {
+        "connect_all_s": round(connect_s, 3),
+        "delivery": summarize(delays, elapsed_s=elapsed),
+        "delivered": len(delays),
+        "expected": streams * writes,
+    }
+    if rss_before is not None and rss_after is not None:
+        report["rss_before_kib"] = rss_before
+        report["rss_after_kib"] = rss_after
+        report["kib_per_stream"] = round((rss_after - rss_before) / streams, 2)
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--streams", type=int, default=1000)
+    parser.add_argument("--writes", type=int, default=20)
+    args = parser.parse_args()
+
+    use_temp_sqlite()
+    os.environ["USER_DATA_STREAM_MAX_PER_USER"] = "0"
+    os.environ["USER_DATA_STREAM_MAX_CONNECTIONS"] = "0"
+    # Direct writes, so each PUT's event is timed from a committed write.
+    os.environ["USER_DATA_WRITE_BEHIND"] = "false"
+
+    with ServerProcess("app.main:create_app") as server:
+        result = asyncio.run(_run(server.base_url, server.pid, streams=args.streams, writes=args.writes))
+    emit({"benchmark": "user_data_stream", "streams": args.streams, "writes": args.writes, **result})
+
+
+if __name__ == "__main__":
+    main()
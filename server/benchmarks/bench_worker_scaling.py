@@ -0,0 +1,161 @@
+"""Throughput vs server worker processes on one SQLite WAL database.
+
+Starts `uvicorn --workers N` for each N (default: 1, 2, 4, ... up to the CPU
+count) and drives it from several load-generator processes. Each client loops
+over `GET /user-data/tasks`, `GET /notes` and, with probability `--write-ratio`,
+`PUT /user-data/tasks` for its own user. Reads scale with cores; writes still
+serialize on SQLite's single write lock.
+
+The load generators share the machine with the server, so leave them some cores
+(or run this on a bigger box than the one being measured).
+
+Usage (from `server/`):
+
+    python -m benchmarks.bench_worker_scaling --clients 64 --duration 10
+    python -m benchmarks.bench_worker_scaling --workers 1 --workers 8
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import random
+import time
+
+from benchmarks._common import ServerProcess, emit, summarize, use_temp_sqlite
+
+
+def _default_worker_counts() -> list[int]:
+    cpus = os.cpu_count() or 1
+    counts = [1]
+    while counts[-1] * 2 <= cpus:
+        counts.append(counts[-1] * 2)
+    if counts[-1] != cpus:
+        counts.append(cpus)
+    return counts
+
+
+async def _seed(base_url: str, *, clients: int, items: int) -> list[dict]:
+    import httpx
+
+    value = [{"id": str(i), "title": f"Task {i}", "progress": i % 100} for i in range(items)]
+    notes = [{"title": f"Note {i}", "content": "lorem ipsum " * 20} for i in range(20)]
+    headers_list = []
+    async with httpx.AsyncClient(base_url=base_url, timeout=60) as client:
+        for i in range(clients):
+            email = f"bench{i}-{random.randrange(1 << 30)}@example.com"
+            resp = await client.post("/api/v1/auth/signup", json={"email": email, "password": "bench-pw"})
+            resp.raise_for_status()
+            headers = {"Authorization": f"Bearer {resp.json()['access_token']}"}
+            (await client.put("/api/v1/user-data/tasks", json={"value": value}, headers=headers)).raise_for_status()
+            (await client.post("/api/v1/notes/batch", json={"notes": notes}, headers=headers)).raise_for_status()
+            headers_list.append(headers)
+    return headers_list
+
+
+async def _drive(base_url: str, headers_list: list[dict], *, duration: float, write_ratio: float, items: int):
+    import httpx
+
+    value = [{"id": str(i), "title": f"Task {i}", "progress": i % 100} for i in range(items)]
+    reads: list[float] = []
+    writes: list[float] = []
+    errors = 0
+    deadline = time.perf_counter() + duration
+    limits = httpx.Limits(max_connections=len(headers_list) + 4)
+
+    async with httpx.AsyncClient(base_url=base_url, timeout=30, limits=limits) as client:
+
+        async def worker(headers: dict) -> None:
+            nonlocal errors
+            rng = random.Random()
+            while time.perf_counter() < deadline:
+                is_write = rng.random() < write_ratio
+                t0 = time.perf_counter()
+                try:
+                    if is_write:
+                        resp = await client.put("/api/v1/user-data/tasks", json={"value": value}, headers=headers)
+                    elif rng.random() < 0.5:
+                        resp = await client.get("/api/v1/user-data/tasks", headers=headers)
+                    else:
+                        resp = await client.get("/api/v1/notes/", params={"limit": 20}, headers=headers)
+                except httpx.HTTPError:
+                    errors += 1
+                    continue
+                if resp.status_code != 200:
+                    errors += 1
+                    continue
+                (writes if is_write else reads).append(time.perf_counter() - t0)
+
+        await asyncio.gather(*(worker(h) for h in headers_list))
+    return reads, writes, errors
+
+
+def _drive_process(job: tuple) -> tuple[list[float], list[float], int]:
+    # Entry point for one load-generator process.
+    base_url, headers_list, duration, write_ratio, items = job
+    return asyncio.run(_drive(base_url, headers_list, duration=duration, write_ratio=write_ratio, items=items))
+
+
+def _run(workers: int, args: argparse.Namespace) -> dict:
+    import multiprocessing
+
+    os.environ["WEB_CONCURRENCY"] = str(workers)
+    with ServerProcess("app.main:create_app", extra_args=["--workers", str(workers)]) as server:
+        headers_list = asyncio.run(_seed(server.base_url, clients=args.clients, items=args.items))
+        procs = max(1, min(args.drivers, len(headers_list)))
+        jobs = [
+            (server.base_url, headers_list[i::procs], args.duration, args.write_ratio, args.items)
+            for i in range(procs)
+        ]
+        started = time.perf_counter()
+        with multiprocessing.get_context("spawn").Pool(procs) as pool:
+            results = pool.map(_drive_process, jobs)
+        elapsed = time.perf_counter() - started
+
+    reads = [s for r, _, _ in results for s in r]
+    writes = [s for _, w, _ in results for s in w]
+    total = summarize(reads + writes, elapsed_s=elapsed)
+    return {
+        "workers": workers,
+        "total": total,
+        "reads": summarize(reads, elapsed_s=elapsed),
+        "writes": summarize(writes, elapsed_s=elapsed),
+        "errors": sum(e for _, _, e in results),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", type=int, action="append", help="Worker counts to try (repeatable)")
+    parser.add_argument("--clients", type=int, default=64)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--write-ratio", type=float, default=0.1)
+    parser.add_argument("--items", type=int, default=100, help="Tasks in each stored value")
+    parser.add_argument(
+        "--drivers", type=int, default=max(1, (os.cpu_count() or 1) // 2), help="Load-generator processes"
+    )
+    args = parser.parse_args()
+
+    use_temp_sqlite()
+    # Measure SQLite itself; the write-behind buffer is per process anyway.
+    os.environ["USER_DATA_WRITE_BEHIND"] = "false"
+
+    runs = [_run(n, args) for n in (args.workers or _default_worker_counts())]
+    base = runs[0]["total"]["throughput_rps"] or 1.0
+    for run in runs:
+        run["speedup"] = round(run["total"]["throughput_rps"] / base, 2)
+
+    emit(
+        {
+            "benchmark": "worker_scaling",
+            "cpu_count": os.cpu_count(),
+            "clients": args.clients,
+            "drivers": args.drivers,
+            "write_ratio": args.write_ratio,
+            "runs": runs,
+        }
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""Commits and latency for bursty `PUT /user-data/{key}` edits, with and without write-behind.
+
+Each simulated user drags/ticks tasks: a burst of full-document `PUT /user-data/tasks`
+calls a few ms apart, then a pause. The server counts database commits (an engine
+"commit" listener), and after the run every user's stored value is checked against
+the last one they sent.
+
+Usage (from `server/`):
+
+    python -m benchmarks.bench_write_behind --users 20 --bursts 5 --burst-size 20
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import time
+
+from benchmarks._common import ServerProcess, emit, summarize, use_temp_sqlite
+
+
+def build_app():
+    # App factory for the server process: the real app plus a commit counter.
+    from sqlalchemy import event
+
+    from app.db.session import async_engine
+    from app.main import create_app
+
+    app = create_app()
+    commits = {"count": 0}
+
+    @event.listens_for(async_engine.sync_engine, "commit")
+    def _count_commit(conn) -> None:
+        commits["count"] += 1
+
+    @app.get("/bench/commits")
+    def read_commits() -> dict:
+        return commits
+
+    return app
+
+
+async def _run(base_url: str, *, users: int, bursts: int, burst_size: int, gap_ms: float, items: int) -> dict:
+    import httpx
+
+    async with httpx.AsyncClient(base_url=base_url, timeout=30) as client:
+        tokens = []
+        for i in range(users):
+            resp = await client.post("/api/v1/auth/signup", json={"email": f"u{i}@example.com", "password": "bench-pw"})
+            resp.raise_for_status()
+            tokens.append(resp.json()["access_token"])
+        baseline = (await client.get("/bench/commits")).json()["count"]
+
+        samples: list[float] = []
+        errors = 0
+        last_sent: dict[int, list] = {}
+
+        async def user(idx: int) -> None:
+            nonlocal errors
+            headers = {"Authorization": f"Bearer {tokens[idx]}"}
+            tasks = [{"id": str(i), "title": f"Task {i}", "progress": 0} for i in range(items)]
+            for _ in range(bursts):
+                for step in range(burst_size):
+                    tasks[step % items]["progress"] = (tasks[step % items]["progress"] + 10) % 110
+                    value = [dict(t) for t in tasks]
+                    t0 = time.perf_counter()
+                    resp = await client.put("/api/v1/user-data/tasks", json={"value": value}, headers=headers)
+                    samples.append(time.perf_counter() - t0)
+                    if resp.status_code != 200:
+                        errors += 1
+                    last_sent[idx] = value
+                    await asyncio.sleep(gap_ms / 1000)
+                await asyncio.sleep(0.5)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(user(i) for i in range(users)))
+        report = summarize(samples, elapsed_s=time.perf_counter() - started)
+
+        # Let the buffer drain, then check what actually landed.
+        await asyncio.sleep(3)
+        report["commits"] = (await client.get("/bench/commits")).json()["count"] - baseline
+        report["errors"] = errors
+        mismatched = 0
+        for idx, token in enumerate(tokens):
+            resp = await client.get("/api/v1/user-data/tasks", headers={"Authorization": f"Bearer {token}"})
+            if resp.json()["value"] != last_sent[idx]:
+                mismatched += 1
+        report["final_value_mismatches"] = mismatched
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--bursts", type=int, default=5)
+    parser.add_argument("--burst-size", type=int, default=20)
+    parser.add_argument("--gap-ms", type=float, default=20.0, help="Delay between edits within a burst")
+    parser.add_argument("--items", type=int, default=50, help="Tasks in the stored value")
+    args = parser.parse_args()
+
+    report = {
+        "benchmark": "write_behind",
+        "users": args.users,
+        "puts": args.users * args.bursts * args.burst_size,
+    }
+    base_env = os.environ.copy()
+    for mode, flag in (("direct", "false"), ("write_behind", "true")):
+        os.environ.clear()
+        os.environ.update(base_env)
+        os.environ["USER_DATA_WRITE_BEHIND"] = flag
+        # Write-behind needs to know it's the only worker.
+        os.environ["WEB_CONCURRENCY"] = "1"
+        use_temp_sqlite(prefix=f"studybuddy-bench-{mode}-")
+        with ServerProcess("benchmarks.bench_write_behind:build_app") as server:
+            report[mode] = asyncio.run(
+                _run(
+                    server.base_url,
+                    users=args.users,
+                    bursts=args.bursts,
+                    burst_size=args.burst_size,
+                    gap_ms=args.gap_ms,
+                    items=args.items,
+                )
+            )
+
+    emit(report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,309 @@
+"""Load-test the real API: seeded users, notes and user-data, per-endpoint latency JSON.
+
+Boots `app.main:create_app` under uvicorn against a throwaway SQLite file, seeds
+`--users` accounts (each with `--notes` notes and `tasks`/`assessments` blobs of
+`--items` entries), then runs each scenario for `--duration` seconds at
+`--concurrency` in-flight requests. Every scenario reports count, throughput and
+p50/p95/p99 latency; `mixed` also breaks results down per endpoint.
+
+The report carries the git commit and run parameters. Save it with `--output`
+and pass an older report to `--compare` to get per-metric deltas. Server settings
+come from the environment as usual, e.g. `USER_DATA_WRITE_BEHIND=false`.
+
+Usage (from `server/`):
+
+    python -m benchmarks.loadtest --concurrency 50 --duration 10 --output before.json
+    python -m benchmarks.loadtest --concurrency 50 --duration 10 --compare before.json
+    python -m benchmarks.loadtest --scenario auth_me --scenario user_data_get
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import platform
+import random
+import subprocess
+import time
+from datetime import datetime, timezone
+from typing import Awaitable, Callable
+
+from benchmarks._common import SERVER_DIR, ServerProcess, emit, summarize, use_temp_sqlite
+
+
+PASSWORD = "loadtest-password"
+
+
+def _tasks(n: int, seed: int) -> list[dict]:
+    rnd = random.Random(seed)
+    return [
+        {
+            "id": f"t{seed}-{i}",
+            "title": f"Study block {i}",
+            "description": "Revise lecture slides and finish the problem set.",
+            "date": f"2024-{1 + i % 12:02d}-{1 + i % 28:02d}",
+            "startTime": "09:00",
+            "endTime": "10:00",
+            "priority": rnd.choice(["low", "medium", "high"]),
+            "progress": rnd.randrange(0, 101, 10),
+            "completedOn": None,
+            "category": rnd.choice(["study", "exam", "project"]),
+            "repeat": "none",
+        }
+        for i in range(n)
+    ]
+
+
+def _assessments(n: int, seed: int) -> list[dict]:
+    rnd = random.Random(seed)
+    return [
+        {"id": f"a{seed}-{i}", "subject": f"Subject {i % 8}", "date": f"2024-05-{1 + i % 28:02d}", "score": rnd.randint(0, 100)}
+        for i in range(n)
+    ]
+
+
+class _Ctx:
+    """Seeded accounts shared by the scenarios."""
+
+    def __init__(self, client, emails: list[str], tokens: list[str], items: int) -> None:
+        self.client = client
+        self.emails = emails
+        self.tokens = tokens
+        self.items = items
+        self._signup_seq = itertools.count()
+        self._rnd = random.Random(0)
+
+    def user(self) -> tuple[int, dict]:
+        idx = self._rnd.randrange(len(self.tokens))
+        return idx, {"Authorization": f"Bearer {self.tokens[idx]}"}
+
+
+async def _signup(ctx: _Ctx):
+    n = next(ctx._signup_seq)
+    return await ctx.client.post(
+        "/api/v1/auth/signup", json={"email": f"new{n}-{os.getpid()}@example.com", "password": PASSWORD}
+    )
+
+
+async def _login(ctx: _Ctx):
+    idx, _ = ctx.user()
+    return await ctx.client.post("/api/v1/auth/login", json={"email": ctx.emails[idx], "password": PASSWORD})
+
+
+async def _auth_me(ctx: _Ctx):
+    _, headers = ctx.user()
+    return await ctx.client.get("/api/v1/auth/me", headers=headers)
+
+
+async def _notes_list(ctx: _Ctx):
+    _, headers = ctx.user()
+    return await ctx.client.get("/api/v1/notes/", params={"limit": 50}, headers=headers)
+
+
+async def _notes_create(ctx: _Ctx):
+    _, headers = ctx.user()
+    return await ctx.client.post(
+        "/api/v1/notes/", json={"title": "Load test", "content": "Quick note written during a load test."}, headers=headers
+    )
+
+
+async def _user_data_get(ctx: _Ctx):
+    _, headers = ctx.user()
+    return await ctx.client.get("/api/v1/user-data/tasks", headers=headers)
+
+
+async def _user_data_put(ctx: _Ctx):
+    idx, headers = ctx.user()
+    value = _tasks(ctx.items, seed=idx * 7919 + int(time.perf_counter() * 1000) % 1000)
+    return await ctx.client.put("/api/v1/user-data/tasks", json={"value": value}, headers=headers)
+
+
+SCENARIOS: dict[str, Callable[[_Ctx], Awaitable]] = {
+    "signup": _signup,
+    "login": _login,
+    "auth_me": _auth_me,
+    "notes_list": _notes_list,
+    "notes_create": _notes_create,
+    "user_data_get": _user_data_get,
+    "user_data_put": _user_data_put,
+}
+
+# Weights for the `mixed` scenario: mostly reads, like the web client.
+MIX = {
+    "auth_me": 10,
+    "user_data_get": 40,
+    "user_data_put": 20,
+    "notes_list": 20,
+    "notes_create": 7,
+    "login": 3,
+}
+
+
+async def _drive(ctx: _Ctx, pick: Callable[[], str], *, concurrency: int, duration: float) -> tuple[dict, dict]:
+    samples: dict[str, list[float]] = {}
+    errors: dict[str, int] = {}
+    deadline = time.perf_counter() + duration
+
+    async def worker() -> None:
+        while time.perf_counter() < deadline:
+            name = pick()
+            t0 = time.perf_counter()
+            try:
+                resp = await SCENARIOS[name](ctx)
+                ok = resp.status_code < 400
+            except Exception:
+                ok = False
+            elapsed = time.perf_counter() - t0
+            if ok:
+                samples.setdefault(name, []).append(elapsed)
+            else:
+                errors[name] = errors.get(name, 0) + 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed_s = time.perf_counter() - started
+
+    total = summarize([s for v in samples.values() for s in v], elapsed_s=elapsed_s)
+    total["errors"] = sum(errors.values())
+    per_endpoint = {}
+    for name in sorted(set(samples) | set(errors)):
+        stats = summarize(samples.get(name, []), elapsed_s=elapsed_s)
+        stats["errors"] = errors.get(name, 0)
+        per_endpoint[name] = stats
+    return total, per_endpoint
+
+
+async def _seed(client, *, users: int, notes: int, items: int, concurrency: int) -> _Ctx:
+    emails = [f"user{i}@example.com" for i in range(users)]
+    tokens: list[str] = [""] * users
+    sem = asyncio.Semaphore(concurrency)
+
+    async def seed_user(i: int) -> None:
+        async with sem:
+            resp = await client.post("/api/v1/auth/signup", json={"email": emails[i], "password": PASSWORD, "name": f"User {i}"})
+            resp.raise_for_status()
+            tokens[i] = resp.json()["access_token"]
+            headers = {"Authorization": f"Bearer {tokens[i]}"}
+            resp = await client.put(
+                "/api/v1/user-data",
+                json={"values": {"tasks": _tasks(items, i), "assessments": _assessments(items, i)}},
+                headers=headers,
+            )
+            resp.raise_for_status()
+            for n in range(notes):
+                resp = await client.post(
+                    "/api/v1/notes/",
+                    json={"title": f"Note {n}", "content": f"Seeded note {n} for user {i}. " * 4},
+                    headers=headers,
+                )
+                resp.raise_for_status()
+
+    await asyncio.gather(*(seed_user(i) for i in range(users)))
+    return _Ctx(client, emails, tokens, items)
+
+
+async def _run(base_url: str, args: argparse.Namespace) -> tuple[float, dict]:
+    import httpx
+
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=base_url, timeout=60, limits=limits) as client:
+        t0 = time.perf_counter()
+        ctx = await _seed(client, users=args.users, notes=args.notes, items=args.items, concurrency=min(args.concurrency, 16))
+        seed_seconds = round(time.perf_counter() - t0, 2)
+        results: dict = {}
+
+        rnd = random.Random(1)
+        names, weights = zip(*MIX.items())
+        for scenario in args.scenario or [*SCENARIOS, "mixed"]:
+            if scenario == "mixed":
+                pick = lambda: rnd.choices(names, weights)[0]  # noqa: E731
+            else:
+                pick = lambda s=scenario: s  # noqa: E731
+            total, per_endpoint = await _drive(ctx, pick, concurrency=args.concurrency, duration=args.duration)
+            if scenario == "mixed":
+                total["endpoints"] = per_endpoint
+            results[scenario] = total
+    return seed_seconds, results
+
+
+_METRICS = ("throughput_rps", "p50_ms", "p95_ms", "p99_ms")
+
+
+def _compare(current: dict, baseline: dict) -> dict:
+    """Per-scenario relative change (percent) of throughput and latency percentiles."""
+
+    def delta(now: dict, before: dict) -> dict:
+        out = {}
+        for m in _METRICS:
+            if before.get(m):
+                out[m] = round((now.get(m, 0.0) - before[m]) / before[m] * 100, 1)
+        return out
+
+    report = {"baseline_commit": baseline.get("commit"), "scenarios": {}}
+    for name, stats in current["scenarios"].items():
+        before = baseline.get("scenarios", {}).get(name)
+        if before is None:
+            continue
+        entry = delta(stats, before)
+        if "endpoints" in stats:
+            entry["endpoints"] = {
+                ep: delta(s, before.get("endpoints", {}).get(ep, {})) for ep, s in stats["endpoints"].items()
+            }
+        report["scenarios"][name] = entry
+    return report
+
+
+def _git_commit() -> str | None:
+    try:
+        out = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=SERVER_DIR, capture_output=True, text=True, timeout=10
+        )
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return out.stdout.strip() or None
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scenario", choices=[*SCENARIOS, "mixed"], action="append", help="Default: all, then mixed")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=5.0, help="Seconds per scenario")
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--notes", type=int, default=20, help="Notes seeded per user")
+    parser.add_argument("--items", type=int, default=200, help="Entries in each seeded tasks/assessments blob")
+    parser.add_argument("--output", help="Also write the JSON report to this file")
+    parser.add_argument("--compare", help="Earlier report to compute deltas against")
+    args = parser.parse_args()
+
+    use_temp_sqlite(prefix="studybuddy-loadtest-")
+
+    report = {
+        "benchmark": "loadtest",
+        "commit": _git_commit(),
+        "started_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "cpu_count": os.cpu_count(),
+        "params": {
+            "concurrency": args.concurrency,
+            "duration": args.duration,
+            "users": args.users,
+            "notes": args.notes,
+            "items": args.items,
+        },
+    }
+    with ServerProcess("app.main:create_app") as server:
+        report["seed_seconds"], report["scenarios"] = asyncio.run(_run(server.base_url, args))
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as fh:
+            report["delta_pct"] = _compare(report, json.load(fh))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as fh:
+            json.dump(report, fh, indent=2, sort_keys=True)
+    emit(report)
+
+
+if __name__ == "__main__":
+    main()
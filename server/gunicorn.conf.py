@@ -0,0 +1,32 @@
+"""gunicorn settings for multi-process deployments (Linux/macOS).
+
+From `server/`:
+
+    gunicorn -c gunicorn.conf.py app.main:app
+
+Runs one uvicorn worker per CPU unless WEB_CONCURRENCY is set, and applies
+schema migrations once in the master process before any worker is forked.
+"""
+from __future__ import annotations
+
+import os
+
+bind = os.environ.get("BIND", "127.0.0.1:8000")
+workers = int(os.environ.get("WEB_CONCURRENCY") or 0) or os.cpu_count() or 1
+# From the `uvicorn-worker` package; `uvicorn.workers` is deprecated.
+worker_class = "uvicorn_worker.UvicornWorker"
+# Workers read it through `settings.web_concurrency`.
+os.environ["WEB_CONCURRENCY"] = str(workers)
+
+# Slow PBKDF2 bursts shouldn't get a worker killed as unresponsive.
+timeout = 60
+graceful_timeout = 30
+
+
+def on_starting(server) -> None:
+    from app.db import migrations
+    from app.db.session import engine
+
+    migrations.upgrade(engine)
+    # Don't hand pooled connections down to forked workers.
+    engine.dispose()
@@ -0,0 +1,75 @@
+"""Shared fixtures: the app runs against a throwaway SQLite file, migrated once per session.
+
+The environment is set before anything imports `app.core.config`, so the engines
+in `app.db.session` point at the temporary database.
+"""
+from __future__ import annotations
+
+import asyncio
+import itertools
+import os
+import tempfile
+import time
+
+_tmp = tempfile.mkdtemp(prefix="server-tests-")
+os.environ["SQLITE_PATH"] = os.path.join(_tmp, "test.db")
+os.environ["BLOB_DIR"] = os.path.join(_tmp, "blobs")
+
+import jwt
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import insert
+
+from app.core.config import settings
+from app.db import migrations
+from app.db.session import async_engine, engine
+from app.main import create_app
+from app.models.user import User
+
+
+_user_subs = itertools.count(1)
+
+
+@pytest.fixture(scope="session")
+def migrated():
+    migrations.upgrade(engine)
+    return engine
+
+
+@pytest.fixture
+def user_id(migrated) -> int:
+    """A fresh user, so tests sharing the database don't see each other's rows."""
+    with migrated.begin() as conn:
+        return conn.execute(
+            insert(User).values(provider="test", provider_sub=f"user-{next(_user_subs)}").returning(User.id)
+        ).scalar_one()
+
+
+@pytest.fixture
+def run(migrated):
+    """Runs a coroutine on a new event loop, then drops the async pool bound to it."""
+
+    def run(coro):
+        async def main():
+            try:
+                return await coro
+            finally:
+                await async_engine.dispose()
+
+        return asyncio.run(main())
+
+    return run
+
+
+@pytest.fixture
+def auth_headers(user_id) -> dict:
+    now = int(time.time())
+    claims = {"sub": str(user_id), "iat": now, "exp": now + 600, "typ": "access"}
+    return {"Authorization": f"Bearer {jwt.encode(claims, settings.secret_key, algorithm='HS256')}"}
+
+
+@pytest.fixture
+def client(migrated):
+    with TestClient(create_app()) as client:
+        yield client
+    asyncio.run(async_engine.dispose())
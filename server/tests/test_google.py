@@ -0,0 +1,215 @@
+"""GoogleTokenVerifier against a stubbed Google (httpx.MockTransport); no network.
+
+Run from `server/`: `python -m pytest tests`.
+"""
+from __future__ import annotations
+
+import asyncio
+import datetime
+import time
+import types
+from urllib.parse import parse_qs
+
+import httpx
+import jwt
+import pytest
+
+pytest.importorskip("cryptography")
+from cryptography import x509
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from cryptography.x509.oid import NameOID
+
+from app.core import google
+from app.core.google import GoogleTokenVerifier, GoogleUnavailableError, InvalidGoogleToken
+
+
+CLIENT_ID = "test-client.apps.googleusercontent.com"
+CERTS_URL = "https://google.test/oauth2/v1/certs"
+TOKEN_URL = "https://google.test/token"
+
+
+def _signing_key() -> tuple[rsa.RSAPrivateKey, str]:
+    key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, "stub")])
+    now = datetime.datetime.now(datetime.timezone.utc)
+    cert = (
+        x509.CertificateBuilder()
+        .subject_name(name)
+        .issuer_name(name)
+        .public_key(key.public_key())
+        .serial_number(1)
+        .not_valid_before(now - datetime.timedelta(days=1))
+        .not_valid_after(now + datetime.timedelta(days=1))
+        .sign(key, hashes.SHA256())
+    )
+    return key, cert.public_bytes(serialization.Encoding.PEM).decode()
+
+
+KEYS = {kid: _signing_key() for kid in ("k1", "k2")}
+
+
+def _id_token(kid: str, **claims) -> str:
+    now = int(time.time())
+    payload = {
+        "iss": "https://accounts.google.com",
+        "aud": CLIENT_ID,
+        "sub": "google-sub-1",
+        "email": "user@example.com",
+        "iat": now,
+        "exp": now + 600,
+        **claims,
+    }
+    return jwt.encode(payload, KEYS[kid][0], algorithm="RS256", headers={"kid": kid})
+
+
+class StubGoogle:
+    """Serves the published certs (for `published` key ids) and the token endpoint."""
+
+    def __init__(self, *, published: list[str], max_age: int = 300) -> None:
+        self.published = published
+        self.max_age = max_age
+        self.cert_requests = 0
+        self.token_response = httpx.Response(200, json={"id_token": _id_token("k1")})
+        self.token_forms: list[dict] = []
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        if request.url == CERTS_URL:
+            self.cert_requests += 1
+            return httpx.Response(
+                200,
+                json={kid: KEYS[kid][1] for kid in self.published},
+                headers={"Cache-Control": f"public, max-age={self.max_age}, must-revalidate"},
+            )
+        if request.url == TOKEN_URL:
+            self.token_forms.append({k: v[0] for k, v in parse_qs(request.content.decode()).items()})
+            return self.token_response
+        return httpx.Response(404)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Replaces the verifier's monotonic clock; advance it with `clock.now += seconds`."""
+    fake = types.SimpleNamespace(now=1000.0)
+    monkeypatch.setattr(google, "time", types.SimpleNamespace(monotonic=lambda: fake.now))
+    return fake
+
+
+def _verifier(handler) -> GoogleTokenVerifier:
+    return GoogleTokenVerifier(
+        client_id=CLIENT_ID,
+        client_secret="test-secret",
+        certs_url=CERTS_URL,
+        token_url=TOKEN_URL,
+        transport=httpx.MockTransport(handler),
+    )
+
+
+def _run(verifier: GoogleTokenVerifier, coro):
+    async def run():
+        try:
+            return await coro
+        finally:
+            await verifier.close()
+
+    return asyncio.run(run())
+
+
+def test_certs_are_cached_for_max_age(clock):
+    stub = StubGoogle(published=["k1"], max_age=3600)
+    verifier = _verifier(stub)
+
+    async def scenario():
+        claims = await verifier.verify(_id_token("k1"))
+        assert claims["sub"] == "google-sub-1"
+        clock.now += 3599
+        await verifier.verify(_id_token("k1"))
+        assert stub.cert_requests == 1
+        clock.now += 2
+        await verifier.verify(_id_token("k1"))
+        assert stub.cert_requests == 2
+
+    _run(verifier, scenario())
+
+
+def test_concurrent_verifications_share_one_cert_fetch(clock):
+    stub = StubGoogle(published=["k1"])
+    verifier = _verifier(stub)
+
+    async def scenario():
+        await asyncio.gather(*(verifier.verify(_id_token("k1")) for _ in range(5)))
+        assert stub.cert_requests == 1
+
+    _run(verifier, scenario())
+
+
+def test_unknown_kid_refetches_certs(clock):
+    stub = StubGoogle(published=["k1"])
+    verifier = _verifier(stub)
+
+    async def scenario():
+        await verifier.verify(_id_token("k1"))
+        # Google rotates in k2 while the cached certs are still fresh.
+        stub.published = ["k1", "k2"]
+        clock.now += verifier.min_refresh_interval_seconds
+        claims = await verifier.verify(_id_token("k2"))
+        assert claims["sub"] == "google-sub-1"
+        assert stub.cert_requests == 2
+
+    _run(verifier, scenario())
+
+
+def test_unknown_kid_refetch_is_rate_limited(clock):
+    stub = StubGoogle(published=["k1"])
+    verifier = _verifier(stub)
+
+    async def scenario():
+        await verifier.verify(_id_token("k1"))
+        clock.now += 1
+        with pytest.raises(InvalidGoogleToken):
+            await verifier.verify(_id_token("k2"))
+        assert stub.cert_requests == 1
+
+    _run(verifier, scenario())
+
+
+def test_verify_rejects_wrong_audience(clock):
+    verifier = _verifier(StubGoogle(published=["k1"]))
+    with pytest.raises(InvalidGoogleToken):
+        _run(verifier, verifier.verify(_id_token("k1", aud="someone-else")))
+
+
+def test_exchange_code_returns_id_token():
+    stub = StubGoogle(published=["k1"])
+    verifier = _verifier(stub)
+    token = _run(verifier, verifier.exchange_code("auth-code", "https://app.test/callback"))
+    assert token == stub.token_response.json()["id_token"]
+    (form,) = stub.token_forms
+    assert form["code"] == "auth-code"
+    assert form["grant_type"] == "authorization_code"
+    assert form["redirect_uri"] == "https://app.test/callback"
+
+
+@pytest.mark.parametrize(
+    "response",
+    [
+        httpx.Response(400, json={"error": "invalid_grant"}),
+        httpx.Response(200, json={"access_token": "no-id-token"}),
+        httpx.Response(200, content=b"not json"),
+    ],
+)
+def test_exchange_code_rejected(response):
+    stub = StubGoogle(published=["k1"])
+    stub.token_response = response
+    verifier = _verifier(stub)
+    with pytest.raises(InvalidGoogleToken):
+        _run(verifier, verifier.exchange_code("bad-code", "https://app.test/callback"))
+
+
+def test_exchange_code_unreachable():
+    def down(request: httpx.Request) -> httpx.Response:
+        raise httpx.ConnectError("connection refused", request=request)
+
+    verifier = _verifier(down)
+    with pytest.raises(GoogleUnavailableError):
+        _run(verifier, verifier.exchange_code("auth-code", "https://app.test/callback"))
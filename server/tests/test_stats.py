@@ -0,0 +1,141 @@
+"""Incremental dashboard stats (app.crud.stats) against a full rebuild from the tasks table.
+
+Run from `server/`: `python -m pytest tests`.
+"""
+from __future__ import annotations
+
+import asyncio
+import datetime as dt
+import random
+
+from sqlalchemy import insert, text
+
+from app.crud import tasks as crud_tasks
+from app.crud.stats import get_stats
+from app.db.session import AsyncSessionLocal
+from app.db.stats import rebuild_stats
+from app.models.task import Task
+from app.schemas.task import TaskCreate
+
+
+DAY = dt.date(2024, 3, 4)
+
+
+def _snapshot(conn, user_id: int) -> dict:
+    params = {"user_id": user_id}
+    return {
+        "counters": conn.execute(
+            text("SELECT tasks_total, tasks_completed, assessments_total FROM user_stats WHERE user_id = :user_id"),
+            params,
+        ).all(),
+        "days": conn.execute(
+            text("SELECT day, completed FROM task_days WHERE user_id = :user_id ORDER BY day"), params
+        ).all(),
+        "runs": conn.execute(
+            text("SELECT start_day, end_day, length FROM streak_runs WHERE user_id = :user_id ORDER BY start_day"),
+            params,
+        ).all(),
+    }
+
+
+def _assert_matches_rebuild(engine, user_id: int) -> dict:
+    with engine.connect() as conn:
+        maintained = _snapshot(conn, user_id)
+        rebuild_stats(conn, user_id=user_id)
+        rebuilt = _snapshot(conn, user_id)
+        conn.rollback()
+    assert maintained == rebuilt
+    return maintained
+
+
+async def _create(user_id: int, day: dt.date, progress: int = 0) -> int:
+    async with AsyncSessionLocal() as db:
+        payload = TaskCreate(title="t", date=day, progress=progress)
+        return (await crud_tasks.create_task(db, user_id=user_id, payload=payload)).id
+
+
+async def _update(user_id: int, task_id: int, **changes) -> None:
+    async with AsyncSessionLocal() as db:
+        assert await crud_tasks.update_task(db, user_id=user_id, task_id=task_id, changes=changes) is not None
+
+
+async def _delete(user_id: int, task_id: int) -> None:
+    async with AsyncSessionLocal() as db:
+        assert await crud_tasks.delete_task(db, user_id=user_id, task_id=task_id)
+
+
+def test_stats_follow_task_writes(migrated, user_id, run):
+    first = run(_create(user_id, DAY, progress=100))
+    second = run(_create(user_id, DAY + dt.timedelta(days=2)))
+    third = run(_create(user_id, DAY + dt.timedelta(days=2), progress=100))
+    _assert_matches_rebuild(migrated, user_id)
+
+    # Completing the task on the middle day joins the two runs into one.
+    middle = run(_create(user_id, DAY + dt.timedelta(days=1)))
+    run(_update(user_id, middle, progress=100))
+    stats = _assert_matches_rebuild(migrated, user_id)
+    assert [run_.length for run_ in stats["runs"]] == [3]
+
+    run(_update(user_id, second, progress=100))
+    run(_update(user_id, third, date=DAY + dt.timedelta(days=5)))
+    run(_update(user_id, first, progress=40))
+    run(_update(user_id, middle, title="renamed"))
+    _assert_matches_rebuild(migrated, user_id)
+
+    run(_delete(user_id, middle))
+    stats = _assert_matches_rebuild(migrated, user_id)
+    assert stats["counters"] == [(3, 2, 0)]
+
+
+def test_concurrent_completions_count_once(migrated, user_id, run):
+    task_id = run(_create(user_id, DAY))
+
+    async def complete_twice():
+        await asyncio.gather(*(_update(user_id, task_id, progress=100) for _ in range(2)))
+
+    run(complete_twice())
+    stats = _assert_matches_rebuild(migrated, user_id)
+    assert stats["counters"] == [(1, 1, 0)]
+    assert [completed for _, completed in stats["days"]] == [1]
+
+
+def _client_streaks(active: set[dt.date], start: dt.date, end: dt.date) -> tuple[int, int, int]:
+    # computeStreaksInRange from client/pages/Profile.tsx.
+    day, current = end, 0
+    while day >= start and day in active:
+        current, day = current + 1, day - dt.timedelta(days=1)
+    while day >= start and day not in active:
+        day -= dt.timedelta(days=1)
+    previous = 0
+    while day >= start and day in active:
+        previous, day = previous + 1, day - dt.timedelta(days=1)
+    best = run_ = 0
+    day = end
+    while day >= start:
+        run_ = run_ + 1 if day in active else 0
+        best = max(best, run_)
+        day -= dt.timedelta(days=1)
+    return current, previous, best
+
+
+def test_streaks_stay_within_the_requested_year(migrated, user_id, run):
+    rng = random.Random(24)
+    # Dense enough that runs cross 1 January and `today`.
+    active = {dt.date(2023, 12, 1) + dt.timedelta(days=n) for n in range(500) if rng.random() < 0.7}
+    with migrated.begin() as conn:
+        conn.execute(
+            insert(Task),
+            [{"user_id": user_id, "title": "t", "date": day, "progress": 100} for day in sorted(active)],
+        )
+        rebuild_stats(conn, user_id=user_id)
+
+    async def stats(today: dt.date, year: int) -> dict:
+        async with AsyncSessionLocal() as db:
+            return await get_stats(db, user_id=user_id, today=today, year=year)
+
+    for today in [dt.date(2024, 1, 1), dt.date(2024, 1, 9), dt.date(2024, 7, 14), dt.date(2025, 2, 3)]:
+        for year in {today.year - 1, today.year}:
+            last = today if year == today.year else dt.date(year, 12, 31)
+            got = run(stats(today, year))
+            expected = _client_streaks(active, dt.date(year, 1, 1), last)
+            assert (got["current_streak"], got["previous_streak"], got["best_streak"]) == expected, (today, year)
@@ -0,0 +1,107 @@
+"""`/api/v1/user-data/{key}` over HTTP: ETag / If-None-Match / If-Match, and JSON Patch `test`.
+
+Run from `server/`: `python -m pytest tests`.
+"""
+from __future__ import annotations
+
+import pytest
+
+from app.db.write_behind import user_data_writer
+
+
+URL = "/api/v1/user-data/prefs"
+JSON_PATCH = {"Content-Type": "application/json-patch+json"}
+
+
+def _put(client, headers, value, **extra_headers):
+    return client.put(URL, json={"value": value}, headers={**headers, **extra_headers})
+
+
+def _patch(client, headers, operations, **extra_headers):
+    return client.patch(URL, json=operations, headers={**headers, **JSON_PATCH, **extra_headers})
+
+
+def test_get_revalidates_with_if_none_match(client, auth_headers):
+    etag = _put(client, auth_headers, {"theme": "dark"}).headers["etag"]
+
+    got = client.get(URL, headers=auth_headers)
+    assert got.status_code == 200
+    assert got.headers["etag"] == etag
+    assert client.get(URL, headers={**auth_headers, "If-None-Match": etag}).status_code == 304
+    # If-None-Match uses the weak comparison.
+    assert client.get(URL, headers={**auth_headers, "If-None-Match": f"W/{etag}"}).status_code == 304
+
+    changed = _put(client, auth_headers, {"theme": "light"}).headers["etag"]
+    assert changed != etag
+    revalidated = client.get(URL, headers={**auth_headers, "If-None-Match": etag})
+    assert revalidated.status_code == 200
+    assert revalidated.json()["value"] == {"theme": "light"}
+
+
+def test_if_match_guards_put_and_patch(client, auth_headers):
+    first = _put(client, auth_headers, {"n": 1}).headers["etag"]
+    second = _put(client, auth_headers, {"n": 2}, **{"If-Match": first})
+    assert second.status_code == 200
+    assert second.json()["version"] == 2
+
+    stale = _put(client, auth_headers, {"n": 3}, **{"If-Match": first})
+    assert stale.status_code == 412
+    # The current ETag comes back so the client can refetch and retry.
+    assert stale.headers["etag"] == second.headers["etag"]
+    # If-Match uses the strong comparison, so a weak tag never matches.
+    assert _put(client, auth_headers, {"n": 3}, **{"If-Match": f"W/{second.headers['etag']}"}).status_code == 412
+
+    patched = _patch(client, auth_headers, [{"op": "replace", "path": "/n", "value": 3}], **{"If-Match": first})
+    assert patched.status_code == 412
+    patched = _patch(
+        client, auth_headers, [{"op": "replace", "path": "/n", "value": 3}], **{"If-Match": second.headers["etag"]}
+    )
+    assert patched.status_code == 200
+    assert patched.json()["value"] == {"n": 3}
+    assert client.get(URL, headers=auth_headers).headers["etag"] == patched.headers["etag"]
+
+    assert _put(client, auth_headers, {"n": 4}, **{"If-Match": "*"}).status_code == 200
+
+
+def test_if_match_on_a_missing_key_fails(client, auth_headers):
+    assert _put(client, auth_headers, {"n": 1}, **{"If-Match": "*"}).status_code == 412
+
+
+def test_buffered_put_etag_matches_reads_and_if_match(client, user_id, auth_headers, monkeypatch):
+    monkeypatch.setattr(user_data_writer, "enabled", True)
+    put = _put(client, auth_headers, {"n": 1})
+    assert user_data_writer.peek(user_id, "prefs") is not None
+    assert client.get(URL, headers=auth_headers).headers["etag"] == put.headers["etag"]
+
+    replaced = _put(client, auth_headers, {"n": 2}, **{"If-Match": put.headers["etag"]})
+    assert replaced.status_code == 200
+    assert replaced.json()["version"] == put.json()["version"] + 1
+
+
+@pytest.mark.parametrize(
+    "path, value, passes",
+    [
+        ("/done", True, True),
+        ("/done", 1, False),
+        ("/n", 1.0, True),
+        ("/n", True, False),
+        ("/n", "1", False),
+        ("/items", [1.0, 2], True),
+        ("/items", [True, 2], False),
+        ("/meta", {"tags": ["a"], "score": 0.0}, True),
+        ("/meta", {"tags": ["a"], "score": False}, False),
+    ],
+)
+def test_patch_test_op(client, auth_headers, path, value, passes):
+    _put(client, auth_headers, {"done": True, "n": 1, "items": [1, 2], "meta": {"tags": ["a"], "score": 0}})
+    response = _patch(
+        client,
+        auth_headers,
+        [{"op": "test", "path": path, "value": value}, {"op": "replace", "path": "/n", "value": 5}],
+    )
+    if passes:
+        assert response.status_code == 200
+        assert response.json()["value"]["n"] == 5
+    else:
+        assert response.status_code == 422
+        assert client.get(URL, headers=auth_headers).json()["value"]["n"] == 1
@@ -0,0 +1,138 @@
+"""UserDataWriteBehind against the test database: predicted versions, flushing, direct writes.
+
+Run from `server/`: `python -m pytest tests`.
+"""
+from __future__ import annotations
+
+import asyncio
+
+from app.crud.user_data import get_value, upsert_value
+from app.db.session import AsyncSessionLocal
+from app.db.write_behind import UserDataWriteBehind
+
+
+def _writer(**overrides) -> UserDataWriteBehind:
+    # Long delays by default, so nothing flushes unless a test asks for it.
+    options = {
+        "session_factory": AsyncSessionLocal,
+        "enabled": True,
+        "debounce_seconds": 60.0,
+        "max_delay_seconds": 60.0,
+        "max_pending": 100,
+    }
+    return UserDataWriteBehind(**{**options, **overrides})
+
+
+async def _stored(user_id: int, key: str) -> tuple[object, int] | None:
+    async with AsyncSessionLocal() as db:
+        found, value, row = await get_value(db, user_id=user_id, key=key)
+    return (value, row.version) if found else None
+
+
+async def _upsert(user_id: int, key: str, value: object) -> None:
+    async with AsyncSessionLocal() as db:
+        await upsert_value(db, user_id=user_id, key=key, value=value)
+
+
+def test_buffered_puts_continue_the_stored_version(user_id, run):
+    async def scenario():
+        await _upsert(user_id, "k", "v1")
+        writer = _writer()
+        try:
+            versions = [(await writer.put(user_id=user_id, key="k", value=f"v{n}")).version for n in (2, 3, 4)]
+            assert versions == [2, 3, 4]
+            assert writer.peek(user_id, "k").value == "v4"
+            assert await _stored(user_id, "k") == ("v1", 1)
+
+            await writer.flush_keys(user_id, ["k"])
+            assert await _stored(user_id, "k") == ("v4", 4)
+            assert writer.peek(user_id, "k") is None
+            stats = writer.stats()
+            assert (stats["writes"], stats["flushes"], stats["rows_flushed"], stats["pending"]) == (3, 1, 1, 0)
+        finally:
+            await writer.close()
+
+    run(scenario())
+
+
+def test_idle_key_flushes_after_the_debounce(user_id, run):
+    async def scenario():
+        writer = _writer(debounce_seconds=0.05)
+        try:
+            assert (await writer.put(user_id=user_id, key="k", value="a")).version == 1
+            await asyncio.sleep(0.3)
+            assert await _stored(user_id, "k") == ("a", 1)
+            assert writer.stats()["pending"] == 0
+        finally:
+            await writer.close()
+
+    run(scenario())
+
+
+def test_full_buffer_flushes_at_once(user_id, run):
+    async def scenario():
+        writer = _writer(max_pending=2)
+        try:
+            await writer.put(user_id=user_id, key="a", value=1)
+            await writer.put(user_id=user_id, key="b", value=2)
+            await asyncio.sleep(0.1)
+            assert await _stored(user_id, "a") == (1, 1)
+            assert await _stored(user_id, "b") == (2, 1)
+        finally:
+            await writer.close()
+
+    run(scenario())
+
+
+def test_close_flushes_everything(user_id, run):
+    async def scenario():
+        writer = _writer()
+        await writer.put(user_id=user_id, key="k", value="last")
+        await writer.close()
+        assert await _stored(user_id, "k") == ("last", 1)
+
+    run(scenario())
+
+
+def test_direct_write_flushes_and_holds_off_predictions(user_id, run):
+    async def scenario():
+        writer = _writer()
+        try:
+            await writer.put(user_id=user_id, key="k", value="buffered")
+            async with AsyncSessionLocal() as db:
+                async with writer.direct_write(db, user_id, ["k"]):
+                    assert await _stored(user_id, "k") == ("buffered", 1)
+                    late = asyncio.create_task(writer.put(user_id=user_id, key="k", value="late"))
+                    await asyncio.sleep(0.05)
+                    # A version predicted now could collide with the direct write below.
+                    assert not late.done()
+                    await upsert_value(db, user_id=user_id, key="k", value="direct")
+            assert (await late).version == 3
+            await writer.flush_keys(user_id, ["k"])
+            assert await _stored(user_id, "k") == ("late", 3)
+        finally:
+            await writer.close()
+
+    run(scenario())
+
+
+def test_failed_flush_keeps_the_value_for_a_retry(user_id, run):
+    def broken_session():
+        raise RuntimeError("database unavailable")
+
+    async def scenario():
+        writer = _writer()
+        try:
+            await writer.put(user_id=user_id, key="k", value="kept")
+            writer.session_factory = broken_session
+            await writer.flush_keys(user_id, ["k"])
+            assert writer.stats()["errors"] == 1
+            assert writer.peek(user_id, "k").value == "kept"
+
+            writer.session_factory = AsyncSessionLocal
+            await writer.flush_keys(user_id, ["k"])
+            assert await _stored(user_id, "k") == ("kept", 1)
+        finally:
+            await writer.close()
+
+    run(scenario())